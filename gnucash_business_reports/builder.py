@@ -1,3 +1,5 @@
+import json
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
@@ -5,16 +7,42 @@ from uuid import uuid4
 
 import pandas as pd
 import pd_db_wrangler
-from dateutil.relativedelta import relativedelta
+from sqlalchemy import inspect
+from sqlalchemy.sql import bindparam, text
 
+from . import farm_pipeline
+from .cache import QueryCache, get_file_version, get_sqlite_path
 from .config import (
     get_config,
     get_datadir,
-    get_gnucash_file_path,
     get_excel_formatting,
 )
-from .helpers import get_keys, nearest, parse_toml
+from .connections import ConnectionRegistry, get_reporting_config
+from .depreciation import DepreciationSchedules
+from .export import ExportSink
+from .guids import GuidCodes
+from .helpers import build_account_hierarchy, expand_toml
+from .ledger import Ledger, to_units
 from .logger import log
+from .price_index import PriceIndex
+from .reclassification import RuleSet, get_rules_version, load_rules
+from .report_plan import CASH_DATASETS, ReportPlan, uses
+from .snapshot import BookSnapshot
+
+# identifiers bound per statement by lookup_records on non-SQLite databases
+LOOKUP_CHUNK_SIZE = 500
+# a column, optionally aliased, in lookup_records' select
+SELECT_ITEM = re.compile(r"\s*([A-Za-z_]\w*)(?:\s+as\s+([A-Za-z_]\w*))?\s*", re.I)
+# year each row was posted in, added by reports that support trend_years
+TREND_COLUMN = "trend_year"
+
+
+def tags_trend_year(func: Callable) -> Callable:
+    """Marks a report that tags its rows with TREND_COLUMN while trend_years
+    is set, get_multi_year_data evaluates those in a single pass
+    """
+    func.tags_trend_year = True
+    return func
 
 
 class GnuCash_Data_Analysis:
@@ -22,16 +50,51 @@ class GnuCash_Data_Analysis:
         self.data_directory = get_datadir()
         # Set Reporting year constant
         self.year = datetime.now().year  # defaults to current year
+        # (first, last) years evaluated in one pass by get_trend_data
+        self.trend_years = None
         self.all_accounts = None
         self.cash_accounts = ["RECEIVABLE", "PAYABLE", "BANK", "CREDIT", "CASH"]
+        self.balance_sheet_accounts = {
+            "Assets": ["ASSET"],
+            "Cash": ["BANK", "CASH"],
+            "Liabilities": ["LIABILITY", "CREDIT", "PAYABLE"],
+        }
         self.excel_formatting = get_excel_formatting()
         # Suppress warnings, format numbers
         pd.options.mode.chained_assignment = None  # default='warn'
         pd.set_option("display.float_format", lambda x: "%.2f" % x)
         self.date_format = "%Y-%m-%d %H:%M:%S"
-        self.pdw = pd_db_wrangler.Pandas_DB_Wrangler(get_gnucash_file_path())
+        self.connections = ConnectionRegistry()
+        # reports read through a read-only connection, see [Reporting]
+        self.pdw = self.connections.get("reporting")
         # Unix/Mac - 4 initial slashes in total
-        self.engine = self.pdw.engine
+        # writes go through the read-write engine
+        self.engine = self.connections.get("business").engine
+        self.query_cache = QueryCache()
+        # intermediate CSV/Parquet dumps, opt-in per dataset in [Exports]
+        self.exports = ExportSink()
+        self.use_snapshot = get_config().get("Snapshot", {}).get("enabled", False)
+        # "pyarrow": query results use Arrow backed dtypes, see df_fetch
+        self.dtype_backend = get_reporting_config()["dtype_backend"]
+        # "polars" runs the farm cash summaries as one lazy polars plan,
+        # see farm_pipeline.py. Can be switched per instance
+        self.frame_engine = get_reporting_config()["frame_engine"]
+        self.book_snapshot = None
+        self.ledger = None
+        self.ledger_version = None
+        # session GUID dictionary when [Reporting] intern_guids is on
+        if get_reporting_config()["intern_guids"]:
+            self.guid_codes = GuidCodes()
+        else:
+            self.guid_codes = None
+        self.price_index = None
+        self.price_index_version = None
+        self.depreciation_schedules = DepreciationSchedules()
+        # datasets shared between reports, see report_plan.py
+        self.report_plan = ReportPlan(self)
+        self.invoices = None
+        self.invoice_quantities = None
+        self.invoice_period = None
 
     def filter_by_year(
         self, df: pd.DataFrame, column: str, all_years_plus_specified: bool = False
@@ -53,17 +116,203 @@ class GnuCash_Data_Analysis:
             if all_years_plus_specified:
                 return df[df[column].dt.year <= self.year]
             else:
-                return df[df[column].dt.year == self.year]
+                return df[df[column].dt.year.between(self.get_first_year(), self.year)]
         else:
             return df
 
+    def get_period_filter(
+        self, column: str, all_years_plus_specified: bool = False
+    ) -> str:
+        """SQL counterpart to filter_by_year, builds the predicate injected
+        into the {period_filter} placeholders of the sql files so only rows
+        in the reporting period are pulled from the database.
+        GnuCash stores dates as text, so the bounds are compared as strings
+
+        Args:
+            column (str): date column in the query, e.g. "t.post_date"
+            all_years_plus_specified (bool, optional): whether to be all inclusive
+            leading up to the specified year or just filter entries on the
+            year itself. Defaults to False.
+
+        Returns:
+            str: where clause predicate. If year = 0, the predicate matches
+            every row
+        """
+        period_start, period_end = self.get_period_bounds(all_years_plus_specified)
+        predicates = []
+        if period_start is not None:
+            predicates.append(f"{column} >= '{period_start.strftime(self.date_format)}'")
+        if period_end is not None:
+            predicates.append(f"{column} < '{period_end.strftime(self.date_format)}'")
+        return " AND ".join(predicates) or "1 = 1"
+
+    def get_period_bounds(self, all_years_plus_specified: bool = False) -> tuple:
+        """Start and end of the reporting period
+
+        Args:
+            all_years_plus_specified (bool, optional): whether to be all inclusive
+            leading up to the specified year or just filter entries on the
+            year itself. Defaults to False.
+
+        Returns:
+            tuple: (start, end) datetimes, end is exclusive. Either is None
+            when the period is open on that side
+        """
+        if self.year <= 0:
+            return None, None
+        period_end = datetime(self.year + 1, 1, 1)
+        if all_years_plus_specified:
+            return None, period_end
+        return datetime(self.get_first_year(), 1, 1), period_end
+
+    def get_first_year(self) -> int:
+        """First year of the reporting period, self.year unless get_trend_data
+        is evaluating several years at once (see trend_years)
+        """
+        if self.trend_years is None:
+            return self.year
+        return self.trend_years[0]
+
+    def read_sql_file(
+        self, filename: str, pdw: pd_db_wrangler.Pandas_DB_Wrangler = None
+    ) -> tuple:
+        """Reads a query from sql/ along with the pandas options of its
+        /*pandas* header, to hand to df_fetch
+
+        Args:
+            filename (str): sql file, e.g. "sql/prices.sql"
+            pdw (Pandas_DB_Wrangler, optional): database the query is for.
+            Defaults to the business books.
+
+        Returns:
+            tuple: (sql, options), options a copy of the header's dtype,
+            timezone etc.
+        """
+        if pdw is None:
+            pdw = self.pdw
+        sql = pdw.read_sql_file(filename)
+        return sql, dict(pdw.options)
+
+    def df_fetch(
+        self,
+        sql: str,
+        parse_dates: dict = None,
+        pdw: pd_db_wrangler.Pandas_DB_Wrangler = None,
+        options: dict = None,
+    ) -> pd.DataFrame:
+        """Runs a query through the session query cache so each distinct
+        query only hits the database once per run. The cache is cleared
+        as soon as the database file changes
+
+        Args:
+            sql (str): SQL to run, usually from read_sql_file
+            parse_dates (dict, optional): date columns to parse. Defaults to None.
+            pdw (Pandas_DB_Wrangler, optional): database to run the query
+            against. Defaults to the business books.
+            options (dict, optional): pandas options of the sql file header,
+            see read_sql_file. Defaults to None (none).
+
+        Returns:
+            pd.DataFrame: query results, a copy that is safe to modify
+        """
+        if pdw is None:
+            pdw = self.pdw
+        options = dict(options or {})
+        key = self.query_cache.make_key(pdw.connect_string, sql, parse_dates, options)
+        df = self.query_cache.get(key)
+        if df is None:
+            # the wrangler applies the header options of the last file it
+            # read to queries with the same select, pin them to this call's
+            pdw.sql, pdw.options = sql, dict(options)
+            df = self.to_dtype_backend(pdw.df_fetch(sql, parse_dates=parse_dates))
+            self.query_cache.put(key, df)
+        return df
+
+    def to_dtype_backend(self, df: pd.DataFrame) -> pd.DataFrame:
+        """With [Reporting] dtype_backend = "pyarrow" converts a frame to
+        Arrow backed dtypes (string, timestamp, int64/double...), so the
+        .str predicates of the reports run on Arrow compute kernels rather
+        than Python loops over object columns. No-op otherwise
+
+        Args:
+            df (pd.DataFrame): query results
+
+        Returns:
+            pd.DataFrame: df, with Arrow dtypes if enabled
+        """
+        if self.dtype_backend != "pyarrow":
+            return df
+        return df.convert_dtypes(dtype_backend="pyarrow")
+
+    def get_book_snapshot(self, load: bool = True) -> BookSnapshot:
+        """Columnar snapshot of the books kept in the data directory,
+        refreshed incrementally when the GnuCash file changes
+
+        Args:
+            load (bool, optional): read the tables into memory, see
+            BookSnapshot.refresh. Defaults to True.
+
+        Returns:
+            BookSnapshot: snapshot with the accounts, commodities,
+            transactions, splits, prices and invoices tables
+        """
+        if self.book_snapshot is None:
+            self.book_snapshot = BookSnapshot(
+                self.pdw,
+                self.data_directory
+                / "snapshot"
+                / (
+                    get_sqlite_path(self.pdw.connect_string)
+                    or Path(self.pdw.connect_string)
+                ).stem,
+                self.dtype_backend,
+            )
+        self.book_snapshot.refresh(load=load)
+        return self.book_snapshot
+
+    def get_ledger(self) -> Ledger:
+        """Every split in the books, loaded once and reloaded only when the
+        GnuCash file changes. Served from the columnar snapshot when enabled
+
+        Returns:
+            Ledger: in-memory ledger the transaction reports are views of
+        """
+        version = get_file_version(self.pdw.connect_string)
+        if self.ledger is None or version != self.ledger_version:
+            if self.use_snapshot:
+                split_detail = self.get_book_snapshot().get_split_detail()
+            else:
+                sql, options = self.read_sql_file("sql/ledger.sql")
+                split_detail = self.df_fetch(
+                    sql,
+                    parse_dates={
+                        "post_date": {
+                            "format": self.date_format,
+                            "errors": "coerce",
+                            "exact": False,
+                        },
+                        "enter_date": self.date_format,
+                        "reconcile_date": self.date_format,
+                    },
+                    options=options,
+                )
+            self.ledger = Ledger(self.to_dtype_backend(split_detail), self.guid_codes)
+            self.ledger_version = version
+        return self.ledger
+
+    def close(self):
+        """Writes out pending exports and closes the connections to the
+        books and the Joplin database"""
+        self.exports.flush()
+        self.connections.close()
+
     def db_locked(self) -> bool:
         """Checks to see if database is in use prior to performing
             any write operations
         Returns:
             bool: True if locked, False if not locked.
         """
-        df_lock = self.pdw.df_fetch("SELECT * FROM gnclock")
+        df_lock = self.connections.get("business").df_fetch("SELECT * FROM gnclock")
         if len(df_lock) > 0:
             log.warning("DATABASE IS LOCKED BY %s", df_lock["Hostname"])
             return True
@@ -93,46 +342,23 @@ class GnuCash_Data_Analysis:
     def get_all_accounts(self) -> pd.DataFrame:
         """Get all accounts from the database"""
         if self.all_accounts is None:
-            df = self.pdw.df_fetch(
-                self.pdw.read_sql_file("sql/all_accounts.sql"),
-            )
+            sql, options = self.read_sql_file("sql/all_accounts.sql")
+            df = self.df_fetch(sql, options=options)
             log.info(df.dtypes)
-            df.to_csv(f"{self.data_directory}/ALL_ACCOUNTS.csv", index=False)
+            self.exports.export(
+                "accounts", df, self.data_directory / "ALL_ACCOUNTS.csv", index=False
+            )
 
             # all_account_types = df["account_type"].unique().tolist()
-            id_name_dict = dict(zip(df["guid"], df["name"]))
-            parent_dict = dict(zip(df["guid"], df["parent_guid"]))
-
-            def find_parent(x) -> str:
-                """Function to recursively determine parents for accounts"""
-                value = parent_dict.get(x, None)
-                if value is None:
-                    return ""
-                else:
-                    # In case there is a id without name.
-                    if id_name_dict.get(value, None) is None:
-                        return "" + find_parent(value)
-                    return str(id_name_dict.get(value)) + ">" + find_parent(value)
-
-            def get_level(x: str, level: int) -> str:
-                """
-                Pass in the string to split (acct heirarchy) and the level
-                we're looking for.
-                For the Finpack report, we want the 4th Level of acct categories
-                """
-                parents = x.split(">")
-                level_count = len(parents)
-                if level_count > level - 1:
-                    return str(parents[level_count - level])
-                else:
-                    return ""
-
-            df["parent_accounts"] = (
-                df["guid"].apply(lambda x: find_parent(x)).str.rstrip(">")
-            )
-            df["finpack_account"] = df["parent_accounts"].apply(
-                lambda x: get_level(x, 4)
+            # 2026-10-17 replaced the recursive find_parent / get_level
+            # with a hierarchy built for the whole tree in one pass,
+            # adds depth and account_level_N (counted from the root) columns
+            hierarchy = build_account_hierarchy(
+                df["guid"].tolist(), df["parent_guid"].tolist(), df["name"].tolist()
             )
+            df = df.join(self.to_dtype_backend(hierarchy), on="guid")
+            # For the Finpack report, we want the 4th Level of acct categories
+            df["finpack_account"] = df.get("account_level_4", "")
             df.loc[df["finpack_account"] == "", "finpack_account"] = df["name"]
 
             df.set_index("guid", drop=True, inplace=True)
@@ -143,7 +369,11 @@ class GnuCash_Data_Analysis:
             df = self.add_descriptor_column(df, "name")
 
             # Create CSV with Parental Tree for reporting
-            df.to_csv(f"{self.data_directory}/ALL_ACCOUNTS_W_PARENTS.csv")
+            self.exports.export(
+                "accounts_w_parents",
+                df,
+                self.data_directory / "ALL_ACCOUNTS_W_PARENTS.csv",
+            )
             self.all_accounts = df
         return self.all_accounts
 
@@ -153,33 +383,57 @@ class GnuCash_Data_Analysis:
 
         Make sure to pass a unique and meaningful index for the toml series
 
+        2026-10-17 every distinct note is parsed once (and remembered, see
+        helpers.load_toml) instead of once per key, and the columns are the
+        keys of all matched notes rather than just the first one
+
         Returns:
             pd.DataFrame: a dataframe with the matched accounts
         """
         toml_series = toml_series.dropna()
-        column_name = toml_series.name
         matched_series = toml_series[toml_series.str.contains(str_to_match)]
-        first_toml_str = matched_series.iloc[0]
-        keys = get_keys(
-            first_toml_str, str_to_match
-        )  # this assumes the first matched row will have all the keys
-        df = matched_series.to_frame()
-        # populate columns into dataframe using keys from get_keys
-        for key in keys:
-            df[key] = df[column_name].apply(lambda x: parse_toml(x, str_to_match, key))
-        return df
+        return matched_series.to_frame().join(
+            expand_toml(matched_series, str_to_match)
+        )
 
     def get_commodity_prices(self) -> pd.DataFrame:
         dates = {"date": self.date_format}
 
-        prices = self.pdw.df_fetch(
-            self.pdw.read_sql_file("sql/prices.sql"), parse_dates=dates
+        sql, options = self.read_sql_file("sql/prices.sql")
+        prices = self.df_fetch(
+            sql.format(period_filter=self.get_period_filter("prices.date")),
+            parse_dates=dates,
+            options=options,
         )
-        prices.to_csv(f"{self.data_directory}/PRICES.csv")
-        return self.filter_by_year(prices, "date")
+        self.exports.export("prices", prices, self.data_directory / "PRICES.csv")
+        return prices
+
+    def get_price_index(self) -> PriceIndex:
+        """Every price in the book (not just the reporting year) indexed for
+        date lookups, rebuilt when the prices change. Writing transactions
+        (e.g. importing elevator loads) keeps the index
+
+        Returns:
+            PriceIndex: prices by commodity, type and date
+        """
+        version = self.df_fetch(
+            "SELECT count(*) AS prices, max(date) AS latest, "
+            "total(value_num) AS value_num FROM prices"
+        ).to_dict("records")
+        if self.price_index is None or version != self.price_index_version:
+            sql, options = self.read_sql_file("sql/prices.sql")
+            prices = self.df_fetch(
+                sql.format(period_filter="1 = 1"),
+                parse_dates={"date": self.date_format},
+                options=options,
+            )
+            self.price_index = PriceIndex(prices)
+            self.price_index_version = version
+        return self.price_index
 
     def get_nearest_commodity_bid(self, commodity: str, date: datetime) -> float:
-        """Get the nearest bid for a given commodity (e.g. Corn, Soybeans)
+        """Get the nearest bid for a given commodity (e.g. Corn, Soybeans),
+        KeyError when no commodity in the price database matches
 
         Args:
             commodity (str): Commodity by which to filter, may pass a guid or name
@@ -188,26 +442,34 @@ class GnuCash_Data_Analysis:
         Returns:
             float: price of the commodity around that date
         """
-        # not using the get_commodity_prices function because we don't want to
-        # filter on date by year
-        dates = {"date": self.date_format}
-        prices = self.pdw.df_fetch(
-            self.pdw.read_sql_file("sql/prices.sql"), parse_dates=dates
-        ).set_index("date")
-        bids_mask = prices["type"].str.match("bid")
-        # guid_list = type(prices["commodity_guid"].drop_duplicates().tolist())
-        if commodity in (prices["commodity_guid"].drop_duplicates().tolist()):
-            commodity_mask = prices["commodity_guid"].str.match(commodity)
-        else:
-            commodity_mask = prices["fullname"].str.match(commodity.title())
-        prices = prices[bids_mask & commodity_mask]
-        nearest_bid_date = nearest(prices.index.tolist(), date)
-        log.info(f"found a nearby date: {nearest_bid_date}")
-        return round(
-            prices.loc[nearest_bid_date]["value_num"]
-            / prices.loc[nearest_bid_date]["value_denom"],
-            2,
-        )
+        # 2026-10-17 binary search in the price index instead of re-running
+        # prices.sql and scanning every date, see get_commodity_bids_at for
+        # pricing many dates at once
+        price_index = self.get_price_index()
+        if price_index.resolve(commodity) is None:
+            raise KeyError(f"No commodity matching {commodity} in the price database")
+        bid = price_index.lookup([commodity], [date])
+        log.info(f"found a nearby date: {bid['price_date'].iloc[0]}")
+        return round(bid["price"].iloc[0], 2)
+
+    def get_commodity_bids_at(
+        self, commodities, dates, how: str = "nearest"
+    ) -> pd.DataFrame:
+        """Bids for many (commodity, date) pairs in one call, e.g. every
+        elevator load or inventory snapshot of a year
+
+        Args:
+            commodities (array-like): commodity guids or names, one per date,
+            or a single commodity for all of them
+            dates (array-like): dates to price
+            how (str, optional): "nearest", "as_of" or "previous", see
+            PriceIndex.lookup. Defaults to "nearest".
+
+        Returns:
+            pd.DataFrame: commodity_guid, currency_guid, price_date and price
+            per pair in the order passed
+        """
+        return self.get_price_index().lookup(commodities, dates, how)
 
     def get_commodity_bids(self, how: str = "mean") -> pd.DataFrame:
         """gets the commodity bids from the price database in GnuCash
@@ -271,94 +533,12 @@ class GnuCash_Data_Analysis:
             ).join(self.all_accounts, rsuffix="_acct")
             return depreciation_accounts
 
-        def build_depreciation_schedule(
-            account, amount, sec_179, method, term, date_in_service
-        ):
-            def get_deduction_month_frequency(method):
-                if method in ("MO S/L",):  # "HY 200DB"):
-                    return 6
-                else:
-                    return 12
-
-            def get_amount_per_term(method: str):
-                if method == "MO S/L":
-                    depreciation = basis / (term * 2)
-                elif method == "HY 200DB":
-                    if loop_counter == (term):
-                        depreciation = amount_left
-                    elif loop_counter == 1:
-                        depreciation_rate = ((basis / (term * 2)) / basis) * 2
-                        depreciation = depreciation_rate * amount_left
-                    else:
-                        depreciation_rate = ((basis / (term)) / basis) * 2
-                        depreciation = depreciation_rate * amount_left
-                    # log.info(f"Depreciation= {depreciation}")
-                else:
-                    depreciation = round(basis / term, 2)
-                return depreciation
-
-            basis = amount - sec_179
-            depreciation_codes = []
-            accounts = []
-            dates = []
-            amounts = []
-            descriptions = []
-            date_in_service = datetime(date_in_service.year, 12, 31)
-            amount_left = basis
-            deduction_month_frequency = get_deduction_month_frequency(method)
-            loop_counter = 0
-            if sec_179 > 0:
-                depreciation_codes.append("801")
-                accounts.append(account)
-                dates.append(date_in_service)
-                amounts.append(sec_179 * -1)
-                descriptions.append("Section 179")
-            while amount_left > 0.5:
-                loop_counter += 1
-                if amount_left == basis:
-                    dates.append(date_in_service)
-                    new_date = date_in_service
-                else:
-                    new_date = new_date + relativedelta(
-                        months=deduction_month_frequency
-                    )
-                    dates.append(new_date)
-                depreciation_codes.append("800")
-                accounts.append(account)
-                descriptions.append("Regular Depreciation")
-                amount_per_term = get_amount_per_term(method)
-                amounts.append(amount_per_term * -1)
-                amount_left -= amount_per_term
-            depreciation_dict = {
-                "depreciation_codes": depreciation_codes,
-                "account_guid": accounts,
-                "post_date": dates,
-                "amt": amounts,
-                "description": descriptions,
-            }
-            df = pd.DataFrame.from_dict(depreciation_dict)
-            df["post_date"] = df["post_date"].astype("datetime64[ns]")
-            return df
-
         def build_dataframe(df: pd.DataFrame()) -> pd.DataFrame:
-            i = 0
-            depreciation_schedule = pd.DataFrame()
-            while i < len(df):
-                depreciation_schedule = pd.concat(
-                    [
-                        depreciation_schedule,
-                        build_depreciation_schedule(
-                            df.index[i],
-                            df["Cost"].iloc[i],
-                            df["Sec_179"].iloc[i],
-                            df["Method"].iloc[i],
-                            df["Years"].iloc[i],
-                            df["Date_in_Service"].iloc[i],
-                        ),
-                    ]
-                )
-                i += 1
-
+            # 2026-10-17 schedules for every asset computed together, and
+            # only for assets whose notes changed, see depreciation.py
+            depreciation_schedule = self.depreciation_schedules.get_schedules(
+                df, "account_notes"
+            )
             # depreciation_schedule.reset_index(drop=True, inplace=True)
             depreciation_schedule = depreciation_schedule.join(
                 df, on="account_guid", rsuffix="_acct"
@@ -375,15 +555,13 @@ class GnuCash_Data_Analysis:
             depreciation_schedule["currency_guid"] = ""
             depreciation_schedule["currency_guid"] = uuid4().hex
             depreciation_schedule["tx_num"] = depreciation_schedule.index
-            depreciation_schedule["tx_guid"] = ""
-            depreciation_schedule["tx_guid"] = depreciation_schedule["tx_guid"].apply(
-                lambda v: uuid4().hex
-            )
+            depreciation_schedule["tx_guid"] = [
+                uuid4().hex for _ in range(len(depreciation_schedule))
+            ]
             depreciation_schedule["split_action"] = "DEPR"
-            depreciation_schedule["split_guid"] = ""
-            depreciation_schedule["split_guid"] = depreciation_schedule[
-                "split_guid"
-            ].apply(lambda v: uuid4().hex)
+            depreciation_schedule["split_guid"] = [
+                uuid4().hex for _ in range(len(depreciation_schedule))
+            ]
             depreciation_schedule["enter_date"] = datetime.now()
             depreciation_schedule["reconcile_date"] = datetime.now()
             depreciation_schedule["reconcile_state"] = ""
@@ -456,81 +634,99 @@ class GnuCash_Data_Analysis:
         return filtered_accounts.index.tolist()
 
     def fetch_transactions(
-        self, acct_types: list = [], inverse_multiplier: bool = True
+        self,
+        acct_types: list = [],
+        inverse_multiplier: bool = True,
+        all_years_plus_specified: bool = None,
     ) -> pd.DataFrame:
-        def get_transactions_from_db(guids=[], inverse_multiplier=True) -> pd.DataFrame:
-            """
-            Pass a list of Account GUIDs and whether to pull by Source Accounts for cash accounting
-            or main account for accrual
-            When passing True, it will need to multiply the account totals by -1 to invert
-            """
-            if inverse_multiplier is True:
-                multiplier = "* -1"
-                inner_where = """
-                where
-                    accounts.guid in ('{}')
-                """
-                main_where = """ where a.guid not in ('{}')"""
-            else:
-                multiplier = "* 1"
-                inner_where = """
-                where
-                    accounts.guid not in ('{}')
-                """
-                main_where = """ where a.guid in ('{}')"""
+        """Fetches transactions for the account types passed in
 
-            """
-            This gives us everything for each acct, not filtered by
-            year, allowing us to get current balances for sanity checking
-            2023-04-16 - explicitly attempting to coerce errors for post_date
-            there seems to be som normalization issues in GNUCash so it'd be
-            good to do some database fixing to normalize the precision of the
-            data in SQLite
-            """
-            sql = self.pdw.read_sql_file("sql/transactions_master.sql")
-            dates = {
-                # 2023-04-17 I don't think I need to be this specific
-                # after running the post_date_fixer.sql
-                "post_date": {
-                    "format": self.date_format,
-                    "errors": "coerce",
-                    "exact": False,
-                },
-                "enter_date": self.date_format,
-                "reconcile_date": self.date_format,
-            }
-            for guid in guids:
-                query = sql.format(
-                    inner_where.format(guid), main_where.format(guid), multiplier
+        Args:
+            acct_types (list): account types, e.g. ["BANK", "CASH"]
+            inverse_multiplier (bool, optional): pull by source accounts for
+            cash accounting. Defaults to True.
+            all_years_plus_specified (bool, optional): pushes the reporting
+            period into the query, see get_period_filter. Defaults to None,
+            which fetches the full history.
+
+        Returns:
+            pd.DataFrame: transactions indexed by tx_guid and account_guid
+        """
+        return self.fetch_transaction_groups(
+            {"transactions": acct_types}, inverse_multiplier, all_years_plus_specified
+        )["transactions"]
+
+    def fetch_transaction_groups(
+        self,
+        groups: dict,
+        inverse_multiplier: bool = True,
+        all_years_plus_specified: bool = None,
+    ) -> dict:
+        """Fetches several groups of account types in one pass over the
+        ledger and splits the result afterwards, e.g. the Assets, Cash and
+        Liabilities of the balance sheet. Each group gets the same rows
+        fetch_transactions would return for its account types.
+
+        2026-10-17 the components used to be fetched one after another,
+        each pairing and joining the whole ledger again.
+
+        Args:
+            groups (dict): name -> account types, e.g.
+            {"Cash": ["BANK", "CASH"]}
+            inverse_multiplier (bool, optional): pull by source accounts for
+            cash accounting. Defaults to True.
+            all_years_plus_specified (bool, optional): see fetch_transactions.
+            Defaults to None.
+
+        Returns:
+            dict: name -> transactions indexed by tx_guid and account_guid
+        """
+        acct_types = list(dict.fromkeys(t for types in groups.values() for t in types))
+        if all_years_plus_specified is None:
+            period_start, period_end = None, None
+        else:
+            period_start, period_end = self.get_period_bounds(all_years_plus_specified)
+        # Rows of sql/transactions_master.sql built from the in-memory ledger
+        # (see Ledger.get_transactions), so the book is read once per session
+        # no matter how many reports run. Everything for each acct, not
+        # filtered by year unless a period is passed, allowing us to get
+        # current balances for sanity checking
+        tx = self.get_ledger().get_transactions(
+            self.get_guid_list(acct_types),
+            inverse_multiplier,
+            period_start,
+            period_end,
+        )
+        # the account in the requested set is the source account when inverted
+        type_column = "src_type" if inverse_multiplier is True else "account_type"
+        if self.exports.is_enabled("account_types"):
+            for account in acct_types:
+                self.exports.export(
+                    "account_types",
+                    tx[tx[type_column] == account],
+                    self.data_directory / f"{account}.csv",
+                    index=False,
                 )
-                tx = self.pdw.df_fetch(query, parse_dates=dates)
-                if guid == guids[0]:
-                    all_tx = tx
-                else:
-                    if not tx.empty:
-                        all_tx = pd.concat([all_tx, tx])
-            return all_tx
-
-        for account in acct_types:
-            guids = self.get_guid_list([account])
-            csv_export = get_transactions_from_db(guids, inverse_multiplier)
-            csv_export.to_csv(f"{self.data_directory}/{account}.csv", index=False)
-            if account == acct_types[0]:
-                tx = csv_export
-            else:
-                tx = pd.concat([tx, csv_export])
         tx = tx.join(
             self.all_accounts[["finpack_account", "parent_accounts"]],
             on="account_guid",
         )
-        invoices = (
-            self.get_invoices()
-            .groupby(["tx_guid", "account_guid"])
-            .sum(numeric_only=True)
-        )
         tx.set_index(["tx_guid", "account_guid"], inplace=True)
-        tx = tx.join(invoices[["quantity"]])
-        return tx.fillna(0)
+        tx = tx.join(self.get_invoice_quantities())
+        # interned GUID columns are categoricals, which can't take a 0
+        tx = tx.fillna(
+            {
+                column: 0
+                for column in tx.columns
+                if not isinstance(tx[column].dtype, pd.CategoricalDtype)
+            }
+        )
+        if len(groups) == 1:
+            return {name: tx for name in groups}
+        return {
+            name: tx[tx[type_column].isin(types)].copy()
+            for name, types in groups.items()
+        }
 
     def get_assets(self) -> pd.DataFrame:
         """calls fetch transactions with ASSETS as parameter
@@ -538,8 +734,8 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.Dataframe: dataframe containing asset transactions
         """
-        return self.filter_by_year(
-            self.fetch_transactions(["ASSET"], True), "post_date", True
+        return self.fetch_transactions(
+            self.balance_sheet_accounts["Assets"], True, all_years_plus_specified=True
         )
 
     def get_cash(self) -> pd.DataFrame:
@@ -548,8 +744,8 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.Dataframe: dataframe containing cash transactions
         """
-        return self.filter_by_year(
-            self.fetch_transactions(["BANK", "CASH"], True), "post_date", True
+        return self.fetch_transactions(
+            self.balance_sheet_accounts["Cash"], True, all_years_plus_specified=True
         )
 
     def get_liabilities(self) -> pd.DataFrame:
@@ -558,10 +754,10 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.Dataframe: dataframe containing liability transactions
         """
-        return self.filter_by_year(
-            self.fetch_transactions(["LIABILITY", "CREDIT", "PAYABLE"], True),
-            "post_date",
+        return self.fetch_transactions(
+            self.balance_sheet_accounts["Liabilities"],
             True,
+            all_years_plus_specified=True,
         )
 
     def get_stock(self) -> pd.DataFrame:
@@ -573,9 +769,7 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.Dataframe: dataframe containing stock transactions
         """
-        return self.filter_by_year(
-            self.fetch_transactions(["STOCK"], False), "post_date", True
-        )
+        return self.fetch_transactions(["STOCK"], False, all_years_plus_specified=True)
 
     def get_commodity_stock_values(
         self, groupby: list = ["commodity_guid"]
@@ -588,7 +782,7 @@ class GnuCash_Data_Analysis:
         """
         df = (
             self.add_descriptor_column(self.get_stock(), "parent_accounts")
-            .groupby(groupby)
+            .groupby(groupby, observed=True)
             .sum(numeric_only=True)
             .join(self.get_commodity_bids(how="last").set_index("commodity_guid"))
         )
@@ -597,19 +791,12 @@ class GnuCash_Data_Analysis:
         return df.drop(columns=["quantity", "cash"])
 
     def get_balance_sheet_details(self) -> pd.DataFrame:
-        assets = self.get_assets()
-        assets["balance_sheet_category"] = "Assets"
-        cash = self.get_cash()
-        cash["balance_sheet_category"] = "Cash"
-        liabilities = self.get_liabilities()
-        liabilities["balance_sheet_category"] = "Liabilities"
-        return pd.concat(
-            [
-                assets,
-                cash,
-                liabilities,
-            ]
+        components = self.fetch_transaction_groups(
+            self.balance_sheet_accounts, True, all_years_plus_specified=True
         )
+        for category, df in components.items():
+            df["balance_sheet_category"] = category
+        return pd.concat(components.values())
 
     def get_balance_sheet(self) -> pd.DataFrame:
         balance_sheet = (
@@ -627,6 +814,67 @@ class GnuCash_Data_Analysis:
         # balance_sheet.loc["Grain"] = (grain["value"][0], grain["qty"][0])
         return pd.concat([balance_sheet, grain])
 
+    def get_account_balances(
+        self, acct_types: list, as_of: list = None, units: bool = False
+    ) -> pd.DataFrame:
+        """Balances of the accounts of the given types at one or more dates,
+        looked up in the ledger's balance index rather than re-summing
+        the splits for every date
+
+        Args:
+            acct_types (list): account types, e.g. ["BANK", "CASH"]
+            as_of (list, optional): dates, balances include everything
+            posted before them. Defaults to the end of the reporting year.
+            units (bool, optional): exact int64 amounts in units of the
+            ledger's value_scale (cents). Defaults to False.
+
+        Returns:
+            pd.DataFrame: as_of, account_guid, amt and qty per account and date
+            with the account's type, finpack_account and parent_accounts
+        """
+        if as_of is None:
+            as_of = [self.get_period_bounds(True)[1] or pd.Timestamp.max]
+        balances = (
+            self.get_ledger()
+            .get_balance_index()
+            .get_balances(self.get_guid_list(acct_types), as_of, units)
+        )
+        return balances.join(
+            self.all_accounts[["account_type", "finpack_account", "parent_accounts"]],
+            on="account_guid",
+        )
+
+    def get_balance_sheet_history(self, months: int = 120) -> pd.DataFrame:
+        """Month end balances of the Assets, Cash and Liabilities
+        categories of the balance sheet, for the months leading up to the
+        end of the reporting year (ten years by default)
+
+        Args:
+            months (int, optional): number of month ends. Defaults to 120.
+
+        Returns:
+            pd.DataFrame: indexed by month end, a column per category
+        """
+        period_end = self.get_period_bounds(True)[1] or (
+            pd.Timestamp.now().normalize() + pd.offsets.MonthBegin()
+        )
+        # each month end balance includes everything before the next month
+        month_starts = pd.date_range(end=period_end, periods=months, freq="MS")
+        history = []
+        for category, acct_types in self.balance_sheet_accounts.items():
+            balances = self.get_account_balances(acct_types, month_starts)
+            balances["balance_sheet_category"] = category
+            history.append(balances)
+        history = pd.concat(history)
+        history["month_end"] = history["as_of"] - pd.Timedelta(days=1)
+        return history.pivot_table(
+            index="month_end",
+            columns="balance_sheet_category",
+            values="amt",
+            aggfunc="sum",
+            fill_value=0,
+        )
+
     def get_all_transactions(self) -> pd.DataFrame:
         """2024-09-16 JRK
         don't use this for much! it's just a mess of transactions
@@ -637,19 +885,42 @@ class GnuCash_Data_Analysis:
             pd.Dataframe: dataframe containing desired transactions
             sorted by post dates
         """
-        sql = self.pdw.read_sql_file("sql/all_transactions.sql")
-        return self.pdw.df_fetch(sql).reset_index().sort_values(by=["post_date"])
+        df = self.get_ledger().get_split_detail()
+        # same column types as the query in sql/all_transactions.sql
+        _, options = self.read_sql_file("sql/all_transactions.sql")
+        df = df.astype(options["dtype"])
+        df = self.pdw.timezone_setter(df, options["timezone"])
+        return df.reset_index().sort_values(by=["post_date"])
+
+    def get_all_cash_transactions(
+        self, all_years_plus_specified: bool = None
+    ) -> pd.DataFrame:
+        """actual cash transactions throughout the accounting period.
+        2026-10-17 evaluated once per book version and period and shared
+        between reports, see report_plan.py
 
-    def get_all_cash_transactions(self) -> pd.DataFrame:
-        """calls fetch transactions passing the necessary account types
-        to retrieve actual cash transactions throughout the accounting period
+        Args:
+            all_years_plus_specified (bool, optional): reporting period to
+            push into the query, see get_period_filter. Defaults to None,
+            which fetches the full history, with the invoice quantities of
+            every year whatever the reporting period.
 
         Returns:
             pd.Dataframe: dataframe containing desired transactions
             sorted by post dates
         """
+        return self.report_plan.get(CASH_DATASETS[all_years_plus_specified])
+
+    def fetch_cash_transactions(
+        self, all_years_plus_specified: bool = None
+    ) -> pd.DataFrame:
+        """calls fetch transactions passing the necessary account types
+        to retrieve actual cash transactions, see get_all_cash_transactions
+        """
         return (
-            self.fetch_transactions(self.cash_accounts, True)
+            self.fetch_transactions(
+                self.cash_accounts, True, all_years_plus_specified
+            )
             .reset_index()
             .sort_values(by=["post_date"])
         )
@@ -663,7 +934,9 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.Dataframe: dataframe containing desired transactions
         """
-        tx = self.get_all_cash_transactions().drop(columns="qty")
+        tx = self.get_all_cash_transactions(all_years_plus_specified=False).drop(
+            columns="qty"
+        )
 
         # Remove the acct-to-acct entries (e.g. AP to Checking, etc)
         guid_mask = (
@@ -672,12 +945,25 @@ class GnuCash_Data_Analysis:
         # Remove Payment entries for Bills/Invoices.
         action_mask = tx["split_action"].isin(["Payment"]) == False
 
-        # Filter to transactions from a given year if provided
-        return self.filter_by_year(tx[guid_mask & action_mask], "post_date")
+        # Transactions from a given year if provided were filtered in the query
+        return tx[guid_mask & action_mask]
 
     def get_farm_cash_transactions(
         self, include_depreciation: bool = False
     ) -> pd.DataFrame:
+        """Farm cash transactions of the reporting period, shared between
+        reports through the report plan
+
+        Returns:
+            pd.DataFrame: DataFrame containing farm expenses
+        """
+        df = self.report_plan.get("farm_cash_transactions")
+        if include_depreciation:
+            return pd.concat([df, self.get_depreciation_schedule()])
+        else:
+            return df
+
+    def build_farm_cash_transactions(self) -> pd.DataFrame:
         """_summary_
 
         Returns:
@@ -693,56 +979,99 @@ class GnuCash_Data_Analysis:
                 pd.DataFrame: dataframe containing filtered transactions
             """
 
-            # Remove Harvest Income, which gets posted to inventory from AR
-            # These accounts aren't actually cash entries
-            # Order matters here! Need to do this before reclassification
-            account_mask = tx["account_code"].isin(["301c", "303b"]) == False
-            # Apply Mask
-            tx = tx[account_mask]
-
-            # Income accounts filtered out, now re-classify inventory accounts
-            # as income
-            tx.loc[tx["account_code"].str.startswith("133"), "account_name"] = "Corn"
-            tx.loc[tx["account_code"].str.startswith("134"), "account_name"] = (
-                "Soybeans"
-            )
-            tx.loc[tx["account_code"].str.match("133|134"), "account_type"] = "INCOME"
-            tx.loc[tx["account_code"].str.startswith("133"), "account_code"] = "301c"
-            tx.loc[tx["account_code"].str.startswith("134"), "account_code"] = "303b"
-
-            # Classify Prepaids as Expense
-            tx.loc[tx["account_code"].str.match("146|147"), "account_type"] = "EXPENSE"
+            # 2026-10-17 Harvest Income entries are dropped, inventory
+            # reclassified as income etc. by the farm_cash rules, see
+            # templates/reclassification.toml
+            tx = self.get_reclassification_rules("farm_cash").apply(tx)
 
-            # Classify Non-Taxable Expenses
-            tx.loc[tx["account_code"].str.startswith("9"), "account_type"] = (
-                "NF EXPENSE"
+            self.exports.export(
+                "farm_transactions", tx, self.data_directory / "FARM_TRANSACTIONS.csv"
             )
 
-            tx.to_csv(f"{self.data_directory}/FARM_TRANSACTIONS.csv")
-
             return tx.sort_values(by=["account_code", "post_date"])
 
-        df = filter_and_reclassify_farm_transactions(
+        return filter_and_reclassify_farm_transactions(
             self.get_cleaned_cash_transactions()
         )
-        if include_depreciation:
-            return pd.concat([df, self.get_depreciation_schedule()])
-        else:
-            return df
 
-    def get_invoices(self):
+    def get_reclassification_rules(self, name: str) -> RuleSet:
+        """Rule set from the [Reporting] reclassification_rules file, edits
+        to the file apply from the next call
+
+        Args:
+            name (str): rule set, e.g. "farm_cash"
+
+        Returns:
+            RuleSet: rules compiled into an account code lookup table
+        """
+        return load_rules(get_reporting_config()["reclassification_rules"])[name]
+
+    def get_reclassification_rules_version(self) -> int:
+        """Version of the [Reporting] reclassification_rules file, changes
+        whenever the file is edited, see ReportPlan.get_key
+        """
+        return get_rules_version(get_reporting_config()["reclassification_rules"])
+
+    def get_invoices(self) -> pd.DataFrame:
+        """Invoice and bill entries for the reporting period.
+        2026-10-17 computed once per reporting period and book version and
+        shared by every report, see refresh_invoices
+
+        Returns:
+            pd.DataFrame: invoice entries, post_txn renamed to tx_guid
+        """
+        self.refresh_invoices(force=False)
+        return self.invoices.copy()
+
+    def get_invoice_quantities(self) -> pd.DataFrame:
+        """Invoice quantities summed per transaction and account, the
+        aggregate fetch_transactions joins on
+
+        Returns:
+            pd.DataFrame: indexed by tx_guid and account_guid
+        """
+        self.refresh_invoices(force=False)
+        return self.invoice_quantities
+
+    def refresh_invoices(self, force: bool = True):
+        """(Re)builds the invoice facts: the entries from
+        sql/invoices_master.sql and their quantities per transaction and
+        account. Happens automatically when the reporting period or the book
+        changes, call it directly to force a reload.
+
+        Args:
+            force (bool, optional): reload even if nothing changed.
+            Defaults to True.
+        """
+        period = (self.get_period_bounds(), get_file_version(self.pdw.connect_string))
+        if not force and self.invoices is not None and self.invoice_period == period:
+            return
         # bring in invoices for quantities
         dates = {
             "date_posted": self.date_format,
             "date_opened": self.date_format,
             "entry_date": self.date_format,
         }
-        invoices_sql = self.pdw.read_sql_file("sql/invoices_master.sql")
-        invoices = self.pdw.df_fetch(invoices_sql, parse_dates=dates)
-        invoices.to_csv("export/invoices.csv")
-        return self.filter_by_year(
-            invoices.rename(columns={"post_txn": "tx_guid"}), "date_posted"
+        if self.connections.sidecar is not None:
+            # materialized entries and indexed slots, see sidecar.py. Brought
+            # up to date here, once per book version
+            self.connections.sidecar.refresh()
+            invoices_sql, options = self.read_sql_file("sql/invoices_analytics.sql")
+        else:
+            invoices_sql, options = self.read_sql_file("sql/invoices_master.sql")
+        invoices = self.df_fetch(
+            invoices_sql.format(
+                period_filter=self.get_period_filter("invoices.date_posted")
+            ),
+            parse_dates=dates,
+            options=options,
         )
+        self.exports.export("invoices", invoices, Path("export/invoices.csv"))
+        self.invoices = invoices.rename(columns={"post_txn": "tx_guid"})
+        self.invoice_quantities = self.invoices.groupby(["tx_guid", "account_guid"])[
+            ["quantity"]
+        ].sum(numeric_only=True)
+        self.invoice_period = period
 
     def get_corporation_value(self):
         balance_sheet = self.get_balance_sheet()
@@ -757,6 +1086,42 @@ class GnuCash_Data_Analysis:
         balance_sheet.loc["Total"] = balance_sheet.sum(numeric_only=True).to_list()
         return balance_sheet.drop(columns=["qty"])
 
+    def get_multi_year_data(self, func: Callable, years_to_go_back: int) -> pd.DataFrame:
+        """Output of a report function for each of the last years_to_go_back
+        years, tagged with a "year" column.
+
+        2026-10-17 reports marked with tags_trend_year (everything built on
+        get_summary) are evaluated once over the whole span and aggregated
+        per year in the same groupby. Anything else, and every report when
+        year is 0 (all years), runs once per year.
+
+        Args:
+            func (function): function to pass
+            years_to_go_back (int): how many years to go back
+
+        Returns:
+            pd.DataFrame: func's rows for every year with a year column
+        """
+        original_year = self.year
+        first_year = original_year - years_to_go_back + 1
+        if original_year > 0 and getattr(func, "tags_trend_year", False):
+            self.trend_years = (first_year, original_year)
+            try:
+                df = func()
+            finally:
+                self.trend_years = None
+            return df.rename(columns={TREND_COLUMN: "year"})
+        years = []
+        try:
+            for year in range(first_year, original_year + 1):
+                self.year = year
+                df = func()
+                df["year"] = year
+                years.append(df)
+        finally:
+            self.year = original_year
+        return pd.concat(years)
+
     def get_trend_data(
         self, func: Callable, years_to_go_back: int, index_cols: list, trend_col: str
     ) -> pd.DataFrame:
@@ -773,19 +1138,18 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.DataFrame: a pivoted dataframe where columns are years
         """
-        original_year = self.year
-        for x in range(years_to_go_back):
-            self.year = original_year - years_to_go_back + x + 1
-            df = func()
-            df["year"] = self.year
-            if x == 0:
-                trend_df = df.set_index(["year"] + index_cols)
-            else:
-                trend_df = pd.concat([trend_df, df.set_index(["year"] + index_cols)])
-        self.year = original_year
+        return self.pivot_trend_data(
+            self.get_multi_year_data(func, years_to_go_back), index_cols, trend_col
+        )
 
+    def pivot_trend_data(
+        self, df: pd.DataFrame, index_cols: list, trend_col: str
+    ) -> pd.DataFrame:
         return pd.pivot_table(
-            trend_df, values=trend_col, index=index_cols, columns="year"
+            df.set_index(["year"] + index_cols),
+            values=trend_col,
+            index=index_cols,
+            columns="year",
         ).fillna(0)
 
     def trendsetter(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -799,10 +1163,14 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.DataFrame: dataframe going back out with only one column
         """
-        for col in df.columns:
-            df[col] = df[col].astype(str)
-        df["Trend"] = df[df.columns.values].agg(" ".join, axis=1)
-        return df["Trend"]
+        strings = df.astype(str)
+        if strings.columns.empty:
+            return pd.Series("", index=df.index, name="Trend")
+        # one vectorized concatenation per column rather than a join per row
+        trend = strings.iloc[:, 0]
+        for col in range(1, strings.shape[1]):
+            trend = trend + " " + strings.iloc[:, col]
+        return trend.rename("Trend")
 
     def get_df_with_trend_data(
         self, func: Callable, years_to_go_back: int, index_col: str, trend_col: str
@@ -819,24 +1187,73 @@ class GnuCash_Data_Analysis:
         Returns:
             pd.DataFrame: a dataframe with trend data
         """
-        trend = self.trendsetter(
-            self.get_trend_data(func, years_to_go_back, index_col, trend_col)
-        )
-        df = func().set_index(index_col)
-        return df.join(trend)
+        years = self.get_multi_year_data(func, years_to_go_back)
+        trend = self.trendsetter(self.pivot_trend_data(years, index_col, trend_col))
+        if self.year <= 0:
+            # every year of the span is the full history
+            df = func()
+        else:
+            # the main report is the last year of the span
+            df = years[years["year"] == self.year].drop(columns="year")
+        return df.set_index(index_col).join(trend)
 
     def iconize(self, column):
         return column.str.lower() + ".png"
 
+    def get_farm_cash_plan(self, include_depreciation=False, columns: list = []):
+        """get_farm_cash_transactions as a polars LazyFrame for the
+        "polars" frame_engine, scanning the Arrow files of the book snapshot
+        (built on first use even with [Snapshot] off), see
+        farm_pipeline.get_farm_cash_plan
+
+        Args:
+            include_depreciation (bool, optional): add the depreciation
+            schedule. Defaults to False.
+            columns (list, optional): columns needed besides post_date and
+            the amounts. Defaults to [].
+
+        Returns:
+            pl.LazyFrame: farm cash transactions, not yet collected
+        """
+        snapshot = self.get_book_snapshot(load=False)
+        return farm_pipeline.get_farm_cash_plan(
+            farm_pipeline.scan_table(
+                snapshot.get_path("transactions"), farm_pipeline.TRANSACTION_COLUMNS
+            ),
+            farm_pipeline.scan_table(
+                snapshot.get_path("splits"), farm_pipeline.SPLIT_COLUMNS
+            ),
+            self.get_all_accounts(),
+            self.get_guid_list(self.cash_accounts),
+            self.get_reclassification_rules("farm_cash"),
+            self.get_invoice_quantities(),
+            self.get_period_bounds(),
+            self.get_depreciation_schedule() if include_depreciation else None,
+            columns,
+        )
+
+    @tags_trend_year
+    @uses("farm_cash_transactions")
     def get_summary(self, groupby: list, include_depreciation=False):
+        if self.frame_engine == "polars":
+            return farm_pipeline.summarize(
+                self.get_farm_cash_plan(include_depreciation, groupby),
+                groupby,
+                TREND_COLUMN if self.trend_years is not None else None,
+            )
+        tx = self.get_farm_cash_transactions(include_depreciation=include_depreciation)
+        if self.trend_years is not None:
+            tx[TREND_COLUMN] = tx["post_date"].dt.year
+            groupby = [TREND_COLUMN] + groupby
         return (
-            self.get_farm_cash_transactions(include_depreciation=include_depreciation)
-            .sort_values("account_code")
+            tx.sort_values("account_code")
             .groupby(groupby)
             .sum(numeric_only=True)
             .reset_index()
         )
 
+    @tags_trend_year
+    @uses("farm_cash_transactions")
     def get_summary_by_account(self, include_depreciation=False):
         return self.get_summary(
             groupby=["account_code", "account_name"],
@@ -848,10 +1265,10 @@ class GnuCash_Data_Analysis:
                 "amt": "Amount",
                 "quantity": "Quantity",
             }
-        )[
-            ["Code", "Account", "Quantity", "Amount"]
-        ]
+        ).filter(items=[TREND_COLUMN, "Code", "Account", "Quantity", "Amount"])
 
+    @tags_trend_year
+    @uses("farm_cash_transactions")
     def get_summary_by_finpack_account(self, include_depreciation=False):
         return self.get_summary(
             groupby=["account_type", "finpack_account"],
@@ -863,19 +1280,31 @@ class GnuCash_Data_Analysis:
                 "amt": "Amount",
                 "quantity": "Quantity",
             }
-        )[
-            ["Type", "Account", "Quantity", "Amount"]
-        ]
+        ).filter(items=[TREND_COLUMN, "Type", "Account", "Quantity", "Amount"])
 
+    @uses("farm_cash_transactions")
     def get_executive_summary(self, include_depreciation=False):
-        df = (
-            self.get_farm_cash_transactions(include_depreciation=include_depreciation)
-            .reset_index(drop=True)
-            .sort_values(by=["account_code", "post_date"])
-            .groupby("account_type")
-            .sum(numeric_only=True)
-            .drop(columns="quantity")
-        )
+        if self.frame_engine == "polars":
+            # grouped on account_type alone, trend_years or not
+            df = (
+                farm_pipeline.summarize(
+                    self.get_farm_cash_plan(include_depreciation, ["account_type"]),
+                    ["account_type"],
+                )
+                .set_index("account_type")
+                .drop(columns="quantity")
+            )
+        else:
+            df = (
+                self.get_farm_cash_transactions(
+                    include_depreciation=include_depreciation
+                )
+                .reset_index(drop=True)
+                .sort_values(by=["account_code", "post_date"])
+                .groupby("account_type")
+                .sum(numeric_only=True)
+                .drop(columns="quantity")
+            )
         df["order"] = 100
         df.loc["INCOME", "order"] = 10
         df.loc["EXPENSE", "order"] = 20
@@ -902,11 +1331,15 @@ class GnuCash_Data_Analysis:
         dates = {
             "post_date": self.date_format,
         }
-        tax_1099_vendors = self.pdw.read_sql_file("sql/1099_vendors.sql")
-        vendors = self.pdw.df_fetch(tax_1099_vendors, parse_dates=dates)
-
+        tax_1099_vendors, options = self.read_sql_file("sql/1099_vendors.sql")
         # Filter to transactions from a given year
-        vendors = vendors[vendors["post_date"].dt.year == self.year]
+        vendors = self.df_fetch(
+            tax_1099_vendors.format(
+                period_filter=self.get_period_filter("invoices.date_posted")
+            ),
+            parse_dates=dates,
+            options=options,
+        )
         # Drop the time, not needed
         vendors["post_date"] = vendors["post_date"].dt.date
 
@@ -963,19 +1396,20 @@ class GnuCash_Data_Analysis:
         dates = {
             "post_date": self.date_format,
         }
-        pdw_personal = pd_db_wrangler.Pandas_DB_Wrangler(
-            connect_string=get_gnucash_file_path(books="personal")
-        )
-        sql = pdw_personal.read_sql_file("sql/personal_business_expenses.sql")
-        business_expenses = pdw_personal.df_fetch(
-            sql.format(self.year), parse_dates=dates
+        pdw_personal = self.connections.get("personal")
+        sql, options = self.read_sql_file(
+            "sql/personal_business_expenses.sql", pdw_personal
         )
-
         # Filter to transactions from a given year
-        year_mask = business_expenses["post_date"].dt.year == self.year
-        # Apply the filter to the dataframe
+        business_expenses = self.df_fetch(
+            sql.format(
+                period_filter=self.get_period_filter("transactions.post_date")
+            ),
+            parse_dates=dates,
+            pdw=pdw_personal,
+            options=options,
+        )
         business_expenses.dropna(inplace=True)
-        business_expenses = business_expenses[year_mask]
         # Drop the time, not needed
         business_expenses["post_date"] = business_expenses["post_date"].dt.date
         business_expenses["Deduct_Total"] = round(
@@ -989,17 +1423,20 @@ class GnuCash_Data_Analysis:
         dates = {
             "post_date": self.date_format,
         }
-        pdw_personal = pd_db_wrangler.Pandas_DB_Wrangler(
-            get_gnucash_file_path(books="personal")
-        )
-
-        tax_1099_vendors = pdw_personal.read_sql_file("sql/1099_vendors_personal.sql")
-        personal_vendors = pdw_personal.df_fetch(tax_1099_vendors, parse_dates=dates)
+        pdw_personal = self.connections.get("personal")
 
+        tax_1099_vendors, options = self.read_sql_file(
+            "sql/1099_vendors_personal.sql", pdw_personal
+        )
         # Filter to transactions from a given year
-        year_mask = personal_vendors["post_date"].dt.year == self.year
-        # Apply the filter to the dataframe
-        personal_vendors = personal_vendors[year_mask]
+        personal_vendors = self.df_fetch(
+            tax_1099_vendors.format(
+                period_filter=self.get_period_filter("transactions.post_date")
+            ),
+            parse_dates=dates,
+            pdw=pdw_personal,
+            options=options,
+        )
         # Drop the time, not needed
         personal_vendors["post_date"] = personal_vendors["post_date"].dt.date
 
@@ -1030,21 +1467,20 @@ class GnuCash_Data_Analysis:
             details_sheet.write(0, col, value, fmt_header)
 
         details_sheet.set_column("D:D", 10, fmt_currency)
-        del pdw_personal
         writer.close()
 
     def generate_wage_reports(self):
         dates = {
             "post_date": self.date_format,
         }
-        sql = self.pdw.read_sql_file("sql/w-2_employees.sql")
-        df = self.pdw.df_fetch(sql.format(self.year), parse_dates=dates)
+        period_filter = self.get_period_filter("transactions.post_date")
+        sql, options = self.read_sql_file("sql/w-2_employees.sql")
+        # Filter to transactions from a given year
+        df = self.df_fetch(
+            sql.format(period_filter=period_filter), parse_dates=dates, options=options
+        )
 
         df["month"] = df["post_date"].dt.month
-        # Filter to transactions from a given year
-        year_mask = df["post_date"].dt.year == self.year
-        # Apply the filter to the dataframe
-        df = df[year_mask]
         # Drop the time, not needed
         df["post_date"] = df["post_date"].dt.date
 
@@ -1083,12 +1519,13 @@ class GnuCash_Data_Analysis:
         wages_sheet.set_column("G:G", 10, fmt_currency)
 
         # LABOR DEPOSITS
-        labor_sql = self.pdw.read_sql_file("sql/federal_labor_deposits.sql")
-        labor_deposits = self.pdw.df_fetch(labor_sql, parse_dates=dates)
-
+        labor_sql, options = self.read_sql_file("sql/federal_labor_deposits.sql")
         # Filter to transactions from a given year
-        year_mask = labor_deposits["post_date"].dt.year == self.year
-        labor_deposits = labor_deposits[year_mask]
+        labor_deposits = self.df_fetch(
+            labor_sql.format(period_filter=period_filter),
+            parse_dates=dates,
+            options=options,
+        )
         # Drop the time, not needed
         labor_deposits["post_date"] = labor_deposits["post_date"].dt.date
         labor_deposits.to_excel(writer, index=False, sheet_name="Labor_Deposits")
@@ -1121,7 +1558,10 @@ class GnuCash_Data_Analysis:
             .join(self.get_all_accounts(), on="account_guid", rsuffix="_acct")
         )
 
-        cash_rent = df["account_code"].isin(["424b", "424c"])
+        account_groups = self.get_reclassification_rules("account_groups")
+        cash_rent = (
+            account_groups.lookup(df["account_code"])["account_group"] == "cash_rent"
+        )
 
         base_only = df["quantity_type"] == "Project"
         df = (
@@ -1280,43 +1720,145 @@ class GnuCash_Data_Analysis:
             },
         )
 
+    def lookup_records(
+        self,
+        identifiers: list,
+        table: str,
+        column: str,
+        select: str = "*",
+        pdw: pd_db_wrangler.Pandas_DB_Wrangler = None,
+    ) -> pd.DataFrame:
+        """Rows of a table whose column matches any of the identifiers, in
+        one round trip. The values are never formatted into the SQL: on
+        SQLite the whole set is bound as one JSON array and matched through
+        json_each (works on the read-only connection, where temp tables
+        can't be created), other databases get the values bound in chunks.
+        Table and column names can't be bound, they're checked against the
+        database schema first, see get_lookup_sql
+
+        Args:
+            identifiers (list): values to look for, compared as strings
+            table (str): table to search
+            column (str): column the identifiers are matched against
+            select (str, optional): "*" or comma separated columns of the
+            table, each optionally "column as alias". Defaults to "*".
+            pdw (Pandas_DB_Wrangler, optional): database. Defaults to the
+            business books.
+
+        Returns:
+            pd.DataFrame: matching rows
+        """
+        if pdw is None:
+            pdw = self.pdw
+        identifiers = sorted({str(x) for x in identifiers})
+        key = self.query_cache.make_key(
+            pdw.connect_string, f"{select}|{table}|{column}", params=identifiers
+        )
+        df = self.query_cache.get(key)
+        if df is not None:
+            return df
+        sql = self.get_lookup_sql(pdw, table, column, select)
+        if pdw.engine.dialect.name == "sqlite":
+            queries = [
+                (
+                    text(sql + "(SELECT value FROM json_each(:identifiers))"),
+                    {"identifiers": json.dumps(identifiers)},
+                )
+            ]
+        else:
+            query = text(sql + ":identifiers").bindparams(
+                bindparam("identifiers", expanding=True)
+            )
+            queries = [
+                (query, {"identifiers": identifiers[i : i + LOOKUP_CHUNK_SIZE]})
+                for i in range(0, max(len(identifiers), 1), LOOKUP_CHUNK_SIZE)
+            ]
+        with pdw.engine.connect() as conn:
+            frames = [
+                pd.read_sql(query, conn, params=params) for query, params in queries
+            ]
+        # chunks with no matches would turn every column to object
+        df = pd.concat(
+            [frame for frame in frames if len(frame)] or frames[:1], ignore_index=True
+        )
+        self.query_cache.put(key, df)
+        return df
+
+    def get_lookup_sql(
+        self,
+        pdw: pd_db_wrangler.Pandas_DB_Wrangler,
+        table: str,
+        column: str,
+        select: str,
+    ) -> str:
+        """Start of lookup_records' query, SELECT ... FROM table WHERE
+        column IN, with the names taken from the database schema (matched
+        case-insensitively) and quoted by the dialect. ValueError for a table
+        or column not in the database, or a select item that isn't a plain
+        (aliased) column
+
+        Returns:
+            str: start of the query, the IN list is added by the caller
+        """
+        inspector = inspect(pdw.engine)
+        tables = {name.lower(): name for name in inspector.get_table_names()}
+        if table.lower() not in tables:
+            raise ValueError(f"Unknown table {table!r}")
+        table = tables[table.lower()]
+        columns = {c["name"].lower(): c["name"] for c in inspector.get_columns(table)}
+        quote = pdw.engine.dialect.identifier_preparer.quote
+
+        def get_column(name: str) -> str:
+            if name.lower() not in columns:
+                raise ValueError(f"Unknown column {name!r} in {table}")
+            return quote(columns[name.lower()])
+
+        if select.strip() == "*":
+            selected = "*"
+        else:
+            items = []
+            for item in select.split(","):
+                match = SELECT_ITEM.fullmatch(item)
+                if match is None:
+                    raise ValueError(f"Unsupported select item {item.strip()!r}")
+                name, alias = match.groups()
+                if alias:
+                    items.append(f"{get_column(name)} AS {quote(alias)}")
+                else:
+                    items.append(get_column(name))
+            selected = ", ".join(items)
+        return f"SELECT {selected} FROM {quote(table)} WHERE {get_column(column)} IN "
+
     def get_existing_records(
         self, identifiers: list, table: str = "TRANSACTIONS", column: str = "num"
-    ) -> list:
-        sql = f"""SELECT * FROM {table} WHERE {column} IN {[str(x) for x in identifiers]}""".replace(
-            "[",
-            "(",
-        ).replace(
-            "]", ")"
-        )
-        return self.pdw.df_fetch(sql).set_index(column)
+    ) -> pd.DataFrame:
+        """Records already in the books, e.g. scale tickets by transaction num
+
+        Returns:
+            pd.DataFrame: matching rows indexed by column, the index is the
+            set of identifiers that exist
+        """
+        return self.lookup_records(identifiers, table, column).set_index(column)
         # return [x for x in existing_records.index.to_list()]
 
     def get_joplin_notes(self, ticket_nums: list):
         self.joplin = get_config()["Joplin"]
-        pdw_joplin = pd_db_wrangler.Pandas_DB_Wrangler(
-            connect_string=self.joplin["joplin_db"]
-        )
-        sql = "SELECT id as joplin_id, title FROM notes"
-        sql += f""" WHERE title IN {["Scale Ticket " + str(x) for x in ticket_nums]}""".replace(
-            "[",
-            "(",
-        ).replace(
-            "]", ")"
+        joplin_notes = self.lookup_records(
+            ["Scale Ticket " + str(x) for x in ticket_nums],
+            table="notes",
+            column="title",
+            select="id as joplin_id, title",
+            pdw=self.connections.get("joplin"),
         )
-        joplin_notes = pdw_joplin.df_fetch(sql)
         joplin_notes["num"] = joplin_notes["title"].str.replace("Scale Ticket ", "")
-        del pdw_joplin
         return joplin_notes.set_index("num").drop(columns="title")
 
     def joplin_note_query(self, where_clause=""):
         self.joplin = get_config()["Joplin"]
-        pdw_joplin = pd_db_wrangler.Pandas_DB_Wrangler(
-            connect_string=self.joplin["joplin_db"]
-        )
-        sql = pdw_joplin.read_sql_file("sql/joplin_base_query.sql")
+        pdw_joplin = self.connections.get("joplin")
+        sql, options = self.read_sql_file("sql/joplin_base_query.sql", pdw_joplin)
         sql += where_clause
-        return pdw_joplin.df_fetch(sql)
+        return self.df_fetch(sql, pdw=pdw_joplin, options=options)
 
     def get_associated_uris(self, tx_df: pd.DataFrame):
         """find existing assoc_uris from db"""
@@ -1378,18 +1920,48 @@ class GnuCash_Data_Analysis:
         )
         df.loc[df["Crop Description"].str.match("CORN"), "crop"] = "Corn"
         df.loc[df["Crop Description"].str.match("BEANS"), "crop"] = "Soybeans"
-        commodities = self.get_commodity_bids().set_index("crop")
-        price_count = len(commodities)
-        log.info(f"{price_count} commodity price entries for {self.year}")
-        if price_count < 1:
-            log.warning(
-                "No prices exist for commodity, this is likely to cause problems"
-            )
-        df = df.join(commodities, on="crop")
+        if self.elevator.get("valuation", "period_average") == "as_of":
+            df = self.value_loads_as_of(df)
+        else:
+            commodities = self.get_commodity_bids().set_index("crop")
+            price_count = len(commodities)
+            log.info(f"{price_count} commodity price entries for {self.year}")
+            if price_count < 1:
+                log.warning(
+                    "No prices exist for commodity, this is likely to cause problems"
+                )
+            df = df.join(commodities, on="crop")
         df["enter_date"] = datetime.now()
         df["description"] = self.elevator["elevator_name"]
         return df
 
+    def value_loads_as_of(self, loads: pd.DataFrame) -> pd.DataFrame:
+        """Values each load at the bid in effect when it was weighed (the
+        last bid on or before its post_date) rather than the year's average
+        bid. One batched binary search in the price index, which is kept
+        between load files
+
+        Args:
+            loads (pd.DataFrame): loads with crop and post_date columns
+
+        Returns:
+            pd.DataFrame: loads with commodity_guid, currency_guid, bid_date
+            and cash (the bid) columns
+        """
+        bids = self.get_commodity_bids_at(loads["crop"], loads["post_date"], "as_of")
+        bids.index = loads.index
+        unpriced = bids["price"].isna().sum()
+        if unpriced > 0:
+            log.warning(
+                f"No bid on or before the load date for {unpriced} loads, "
+                "this is likely to cause problems"
+            )
+        loads["commodity_guid"] = bids["commodity_guid"]
+        loads["currency_guid"] = bids["currency_guid"]
+        loads["bid_date"] = bids["price_date"]
+        loads["cash"] = bids["price"]
+        return loads
+
     def get_split_accounts(self, search_term: str) -> pd.Series:
         """Function to find split accounts for a given search term
         refactored 2025-05-23 to handle renamed tree structure
@@ -1554,10 +2126,16 @@ class GnuCash_Data_Analysis:
             "enter_date": self.date_format,
             "reconcile_date": self.date_format,
         }
-        invoice_query = self.pdw.read_sql_file("sql/invoices_master.sql")
+        invoice_query, options = self.read_sql_file("sql/invoices_master.sql")
 
-        # fetch invoices
-        all_inv = self.pdw.df_fetch(invoice_query, parse_dates=dates)
+        # fetch invoices, filtered to the given year in the query
+        all_inv = self.df_fetch(
+            invoice_query.format(
+                period_filter=self.get_period_filter("invoices.date_posted")
+            ),
+            parse_dates=dates,
+            options=options,
+        )
         # format date
         all_inv["date_posted"] = pd.to_datetime(
             all_inv["date_posted"], utc=True, yearfirst=True, errors="coerce"
@@ -1576,15 +2154,19 @@ class GnuCash_Data_Analysis:
             ],
             inplace=True,
         )
-        year_mask = all_inv["date_posted"].dt.year == self.year
-        code_mask = all_inv["account_code"].str.match("133|134")
+        code_mask = (
+            self.get_reclassification_rules("account_groups").lookup(
+                all_inv["account_code"]
+            )["account_group"]
+            == "grain"
+        )
         inv_mask = all_inv["inv_type"] == "INVOICE"
-        invoices = all_inv[year_mask & inv_mask & code_mask].join(
+        invoices = all_inv[inv_mask & code_mask].join(
             self.get_all_accounts()["crop"], on="account_guid", rsuffix="_acct"
         )
         # Calculate the discounts using by getting inverse code matches
         grain_invoice_list = invoices["inv_id"].to_list()
-        inverse_code_mask = ~all_inv["account_code"].str.match("133|134")
+        inverse_code_mask = ~code_mask
         grain_mask = all_inv["inv_id"].isin(grain_invoice_list)
         discounts = (
             all_inv[grain_mask & inverse_code_mask & inv_mask][["inv_id", "amount"]]
@@ -1611,8 +2193,10 @@ class GnuCash_Data_Analysis:
         grain = grain.join(discounts["discount_amt"], on="inv_id").fillna(0)
         grain["Price"] = round(grain["amount"] / grain["quantity"], 2)
         # 2024-09-13 added payment status
-        payment_query = self.pdw.read_sql_file("sql/payments.sql")
-        payments = self.pdw.df_fetch(payment_query).groupby("lot_guid").sum()
+        payment_query, options = self.read_sql_file("sql/payments.sql")
+        payments = (
+            self.df_fetch(payment_query, options=options).groupby("lot_guid").sum()
+        )
         grain = grain.join(payments, on="post_lot")
         grain["paid"] = abs(grain["amount"] 
                             + grain["discount_amt"] 
@@ -1642,14 +2226,18 @@ class GnuCash_Data_Analysis:
     def get_config(self):
         return get_config()
 
+    @uses("cash_transactions_to_date", "farm_cash_transactions")
     def sanity_checker(self) -> bool:
-        all_tx = self.get_all_cash_transactions()
+        all_tx = self.get_all_cash_transactions(all_years_plus_specified=True)
         tx = self.get_farm_cash_transactions()
 
         # *** TOTALS ***
         account_totals = tx.groupby(["account_type"]).sum(numeric_only=True)
-        net_cash_flow = round(account_totals.sum(numeric_only=True).iloc[0], 2)
-        account_totals.loc["TOTAL (NET)"] = net_cash_flow
+        # 2026-10-17 totals are added up in int64 cents and only turned
+        # back into dollars for display, no rounding before comparing
+        scale = self.get_ledger().value_scale
+        net_cash_flow = to_units(tx["amt"], scale).sum()
+        account_totals.loc["TOTAL (NET)"] = net_cash_flow / scale
 
         last_year_mask = all_tx["post_date"].dt.year < self.year
         year_mask = all_tx["post_date"].dt.year <= self.year
@@ -1661,48 +2249,63 @@ class GnuCash_Data_Analysis:
         all_tx[chk_mask & last_year_mask].groupby(["src_code", "src_name"]).sum(
             numeric_only=True
         ).to_csv(f"export/{self.year - 1}-cash.csv")
-        ar_mask = all_tx["src_type"].str.match("RECEIVABLE")
-        ap_mask = all_tx["src_type"].str.match("PAYABLE")
 
         # Get ending checking balances, ensure consistency with
         # Balance Sheet from GNUCash
-        ending_chk_bal = round(all_tx[chk_mask & year_mask]["amt"].sum(), 2)
-        ending_ap_bal = round(all_tx[ap_mask & year_mask]["amt"].sum(), 2)
-        ending_ar_bal = round(all_tx[ar_mask & year_mask]["amt"].sum(), 2)
-        last_year_bal = round(all_tx[chk_mask & last_year_mask]["amt"].sum(), 2)
-        last_year_ar_ap_bal = round(
-            all_tx[(ar_mask | ap_mask) & last_year_mask]["amt"].sum(),
-            2,
-        )
-        net_ar_ap = round(ending_ap_bal + ending_ar_bal, 2)
-        net = round(net_cash_flow + last_year_ar_ap_bal + last_year_bal - net_ar_ap, 2)
+        # 2026-10-17 the inverted source rows of an account add up to its
+        # own balance, so look the balances up in the balance index
+        year_end = datetime(self.year + 1, 1, 1)
+        last_year_end = datetime(self.year, 1, 1)
+
+        def ending_balance(acct_types: list, as_of: datetime) -> int:
+            return self.get_account_balances(acct_types, [as_of], units=True)[
+                "amt"
+            ].sum()
+
+        ending_chk_bal = ending_balance(["BANK", "CREDIT", "CASH"], year_end)
+        ending_ap_bal = ending_balance(["PAYABLE"], year_end)
+        ending_ar_bal = ending_balance(["RECEIVABLE"], year_end)
+        last_year_bal = ending_balance(["BANK", "CREDIT", "CASH"], last_year_end)
+        last_year_ar_ap_bal = ending_balance(["RECEIVABLE", "PAYABLE"], last_year_end)
+        net_ar_ap = ending_ap_bal + ending_ar_bal
+        net = net_cash_flow + last_year_ar_ap_bal + last_year_bal - net_ar_ap
+        sanity = net == ending_chk_bal
+
+        def dollars(units: int) -> float:
+            """back to dollars for display"""
+            return round(units / scale, 2)
 
         log.warning(
             "{} Ending cash balance was:                   {}".format(
-                self.year - 1, last_year_bal
+                self.year - 1, dollars(last_year_bal)
             )
         )
         log.warning(
             "{} Ending AR/AP balance was:                 {}".format(
-                self.year - 1, last_year_ar_ap_bal
+                self.year - 1, dollars(last_year_ar_ap_bal)
             )
         )
-        sanity = net == ending_chk_bal
         log.warning(
             "{} Finpack net inflows and outflows:  (+){}".format(
-                self.year, net_cash_flow
+                self.year, dollars(net_cash_flow)
             )
         )
         log.warning(
-            "{} ending AR/AP balance:              (+){}".format(self.year, net_ar_ap)
+            "{} ending AR/AP balance:              (+){}".format(
+                self.year, dollars(net_ar_ap)
+            )
         )
         log.warning(
-            "{} Finpack net minus AR/AP balance:   (=){}".format(self.year, net)
+            "{} Finpack net minus AR/AP balance:   (=){}".format(
+                self.year, dollars(net)
+            )
         )
         log.warning("-----------------------------------------------------")
         log.warning(
-            "{} Ending balance sheet balance was: {}".format(self.year, ending_chk_bal)
+            "{} Ending balance sheet balance was: {}".format(
+                self.year, dollars(ending_chk_bal)
+            )
         )
         log.warning(" -- We balance, right? ----------------- {}".format(sanity))
-        log.warning("Difference = {}".format(round(net - ending_chk_bal, 2)))
-        return sanity
+        log.warning("Difference = {}".format(dollars(net - ending_chk_bal)))
+        return bool(sanity)
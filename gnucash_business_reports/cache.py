@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from .logger import log
+
+
+def get_sqlite_path(connect_string: str) -> Path:
+    """Database file of a SQLite connect string, including URI filenames
+    such as sqlite:///file:books.gnucash?mode=ro&uri=true
+
+    Args:
+        connect_string (str): sqlalchemy connect string
+
+    Returns:
+        Path: path to the database, None if it isn't a SQLite file
+    """
+    if not connect_string.startswith("sqlite:///"):
+        return None
+    path = connect_string[len("sqlite:///") :].split("?")[0]
+    return Path(path[len("file:") :] if path.startswith("file:") else path)
+
+
+def get_file_version(connect_string: str) -> tuple:
+    """Fingerprint of a SQLite database file, used to notice when GnuCash
+    (or this module) has written to the book
+
+    Args:
+        connect_string (str): sqlalchemy connect string, e.g. sqlite:///books.gnucash
+
+    Returns:
+        tuple: modified time and size of the database and its journal files.
+        None if the connect string doesn't point to a local file
+    """
+    path = get_sqlite_path(connect_string)
+    if path is None:
+        return None
+    version = []
+    for suffix in ("", "-wal", "-journal"):
+        try:
+            stat = path.with_name(path.name + suffix).stat()
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+
+class QueryCache:
+    """Per-session LRU cache of query results, sits in front of
+    Pandas_DB_Wrangler.df_fetch
+
+    Results are keyed on the connect string, the SQL text, parse_dates
+    and the pandas options parsed from the SQL file. Frames are copied on
+    the way in and out so callers are free to modify them in place.
+    All entries for a database are dropped once its file changes.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024**2, max_entries: int = 64):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.versions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(
+        self, connect_string: str, sql: str, parse_dates=None, params=None
+    ) -> tuple:
+        return (connect_string, sql, repr(parse_dates), repr(params))
+
+    def check_version(self, connect_string: str):
+        """Invalidates every entry for a database whose file has changed"""
+        version = get_file_version(connect_string)
+        if self.versions.get(connect_string, version) != version:
+            log.info(f"{connect_string} changed, clearing cached queries")
+            for key in [k for k in self.entries if k[0] == connect_string]:
+                self.evict(key)
+        self.versions[connect_string] = version
+
+    def evict(self, key: tuple):
+        df, size = self.entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key: tuple) -> pd.DataFrame:
+        self.check_version(key[0])
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0].copy()
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, df: pd.DataFrame):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            log.info(f"Query result of {size} bytes is too large to cache")
+            return
+        if key in self.entries:
+            self.evict(key)
+        self.entries[key] = (df.copy(), size)
+        self.total_bytes += size
+        # least recently used entries are at the front
+        while self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries:
+            self.evict(next(iter(self.entries)))
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+        self.versions.clear()
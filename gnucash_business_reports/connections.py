@@ -0,0 +1,194 @@
+import atexit
+import sqlite3
+
+import pd_db_wrangler
+from sqlalchemy import event
+
+from .cache import get_file_version, get_sqlite_path
+from .config import get_config, get_datadir, get_gnucash_file_path
+from .logger import log
+from .sidecar import AnalyticsSidecar
+
+
+def get_connect_string(name: str) -> str:
+    """Where a named database lives according to config.toml
+
+    Args:
+        name (str): "business" or "personal" books, or "joplin"
+
+    Returns:
+        str: path or connect string for Pandas_DB_Wrangler
+    """
+    if name == "joplin":
+        return get_config()["Joplin"]["joplin_db"]
+    return get_gnucash_file_path(books=name)
+
+
+def get_reporting_config() -> dict:
+    """[Reporting] section of config.toml with defaults filled in"""
+    reporting = {
+        "read_only": True,
+        "immutable": False,
+        "mmap_size": 256 * 1024**2,
+        "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MiB
+        "sidecar": False,
+        "intern_guids": False,
+        "dtype_backend": "numpy",
+        "frame_engine": "pandas",
+        "reclassification_rules": "templates/reclassification.toml",
+    }
+    reporting.update(get_config().get("Reporting", {}))
+    return reporting
+
+
+class ConnectionRegistry:
+    """One Pandas_DB_Wrangler (and its pooled engine) per configured
+    database, opened on first use and kept for the life of the process.
+    Engines are disposed of on close() or when the interpreter exits.
+
+    "reporting" is a read-only view of the business books for the
+    reports, see open_read_only. It has the analytics sidecar attached
+    when that is enabled.
+    """
+
+    def __init__(self):
+        self.connections = {}
+        self.copy_versions = {}
+        self.reporting = None
+        self.sidecar = None
+        atexit.register(self.close)
+
+    def get(self, name: str = "business") -> pd_db_wrangler.Pandas_DB_Wrangler:
+        """
+        Args:
+            name (str, optional): "business", "personal", "joplin" or
+            "reporting". Defaults to "business".
+
+        Returns:
+            Pandas_DB_Wrangler: wrangler for the database, shared by every
+            caller
+        """
+        if name == "reporting":
+            return self.get_reporting()
+        if name not in self.connections:
+            log.info(f"Opening {name} database")
+            self.connections[name] = pd_db_wrangler.Pandas_DB_Wrangler(
+                connect_string=get_connect_string(name)
+            )
+        return self.connections[name]
+
+    def get_reporting(self) -> pd_db_wrangler.Pandas_DB_Wrangler:
+        """Wrangler the reports read through. Falls back to the business
+        books when read-only access is turned off or the books aren't a
+        SQLite file
+        """
+        business = self.get("business")
+        source = get_sqlite_path(business.connect_string)
+        if self.reporting is None:
+            self.reporting = get_reporting_config()
+        reporting = self.reporting
+        if not reporting["read_only"] or source is None:
+            return business
+        if "reporting" not in self.connections:
+            if reporting["sidecar"]:
+                self.sidecar = AnalyticsSidecar(
+                    source, get_datadir() / "analytics" / f"{source.stem}.sqlite"
+                )
+                # the file has to exist before connections ATTACH it, later
+                # refreshes happen once per book version, see
+                # GnuCash_Data_Analysis.refresh_invoices
+                self.sidecar.refresh()
+            if reporting["immutable"]:
+                # later copies happen once per report run, see refresh_reporting
+                self.refresh_copy(source)
+            self.connections["reporting"] = self.open_read_only(source, reporting)
+        return self.connections["reporting"]
+
+    def refresh_reporting(self):
+        """Brings the immutable copy of the books up to date, if reports
+        read through one. Called at the start of a report run, every query
+        of the run then reads the same copy
+        """
+        pdw = self.get_reporting()
+        source = get_sqlite_path(self.get("business").connect_string)
+        if pdw is not self.connections.get("business") and self.reporting["immutable"]:
+            self.refresh_copy(source)
+
+    def get_copy_path(self, source):
+        return get_datadir() / "reporting" / source.name
+
+    def open_read_only(
+        self, source, reporting: dict
+    ) -> pd_db_wrangler.Pandas_DB_Wrangler:
+        """Opens the books through a read-only SQLite URI (mode=ro) with
+        query_only set and a large mmap and page cache, reports can never
+        write to the file or hold a write lock GnuCash would wait on.
+        With immutable, queries go to a copy of the books opened with
+        immutable=1, which skips file locking altogether
+
+        Args:
+            source (Path): the books
+            reporting (dict): [Reporting] settings
+
+        Returns:
+            Pandas_DB_Wrangler: read-only wrangler
+        """
+        if reporting["immutable"]:
+            path = self.get_copy_path(source)
+            query = "immutable=1"
+        else:
+            path = source
+            query = "mode=ro"
+        log.info(f"Opening {path} read-only for reporting")
+        pdw = pd_db_wrangler.Pandas_DB_Wrangler(
+            connect_string=f"sqlite:///file:{path.resolve()}?{query}&uri=true"
+        )
+
+        @event.listens_for(pdw.engine, "connect")
+        def set_reporting_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if self.sidecar is not None:
+                cursor.execute(
+                    "ATTACH DATABASE ? AS analytics",
+                    (f"file:{self.sidecar.path.resolve()}?mode=ro",),
+                )
+            cursor.execute("PRAGMA query_only = ON")
+            cursor.execute(f"PRAGMA mmap_size = {int(reporting['mmap_size'])}")
+            cursor.execute(f"PRAGMA cache_size = {int(reporting['cache_size'])}")
+            cursor.close()
+
+        return pdw
+
+    def refresh_copy(self, source):
+        """Copies the books (through the SQLite backup API, so the copy is
+        consistent even mid-write) when they've changed since the last copy
+        """
+        version = get_file_version(f"sqlite:///{source}")
+        if self.copy_versions.get(source) == version:
+            return
+        pdw = self.connections.get("reporting")
+        if pdw is not None:
+            # immutable connections must not see the file change under them
+            pdw.engine.dispose()
+        log.info(f"Copying {source} for reporting")
+        path = self.get_copy_path(source)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        books = sqlite3.connect(f"file:{source.resolve()}?mode=ro", uri=True)
+        copy = sqlite3.connect(path)
+        with copy:
+            books.backup(copy)
+        copy.close()
+        books.close()
+        self.copy_versions[source] = version
+
+    def close(self, name: str = None):
+        """Disposes of the engine for one database, or all of them
+
+        Args:
+            name (str, optional): database to close. Defaults to None (all).
+        """
+        names = list(self.connections) if name is None else [name]
+        for name in names:
+            pdw = self.connections.pop(name, None)
+            if pdw is not None and pdw.engine is not None:
+                pdw.engine.dispose()
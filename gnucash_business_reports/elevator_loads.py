@@ -54,31 +54,18 @@ class Elevator:
         gnuc = GnuCash_Data_Analysis()
         x = 2
         exception_count = 0
+        # row in the loads table -> scale ticket number
+        scale_tickets = {}
         while x < 500:
             # arbitrary upper limit. Will exit loop when there's an exception
             try:
-                scale_tickets = []
-                scale_tickets.append(
-                    int(
-                        self.driver.find_element(
-                            By.XPATH,
-                            f"/html/body/div[2]/div[2]/div[2]/table/tbody/tr[{x}]/td[2]/a",
-                        ).text
-                    )
-                )
-                log.info(f"Found Scale Ticket {scale_tickets[0]}")
-                existing_ticket = gnuc.get_existing_records(scale_tickets)
-                if len(existing_ticket) < 1:
-                    count += 1
-                    log.info(f"Downloading Scale Ticket {scale_tickets[0]}")
+                scale_tickets[x] = int(
                     self.driver.find_element(
                         By.XPATH,
-                        f"/html/body/div[2]/div[2]/div[2]/table/tbody/tr[{x}]/td[13]/a"
-                    ).click()
-                else:
-                    log.info(
-                        f"Scale Ticket {existing_ticket.index.values[0]} exists in db"
-                    )
+                        f"/html/body/div[2]/div[2]/div[2]/table/tbody/tr[{x}]/td[2]/a",
+                    ).text
+                )
+                log.info(f"Found Scale Ticket {scale_tickets[x]}")
             except NoSuchElementException:
                 log.info(f"No such element at index {x}")
                 exception_count += 1
@@ -86,6 +73,20 @@ class Elevator:
                     log.info("End of list")
                     break
             x += 1
+        # one lookup for every ticket on the page
+        existing_tickets = set(
+            gnuc.get_existing_records(list(scale_tickets.values())).index
+        )
+        for x, scale_ticket in scale_tickets.items():
+            if str(scale_ticket) not in existing_tickets:
+                count += 1
+                log.info(f"Downloading Scale Ticket {scale_ticket}")
+                self.driver.find_element(
+                    By.XPATH,
+                    f"/html/body/div[2]/div[2]/div[2]/table/tbody/tr[{x}]/td[13]/a"
+                ).click()
+            else:
+                log.info(f"Scale Ticket {scale_ticket} exists in db")
         log.info(f"{count} new scale tickets found!")
         return count
 
@@ -0,0 +1,116 @@
+import atexit
+import queue
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from .config import get_config
+from .logger import log
+
+# intermediate frames written for inspection, see [Exports] in config.toml
+DATASETS = (
+    "accounts",
+    "accounts_w_parents",
+    "prices",
+    "account_types",
+    "farm_transactions",
+    "invoices",
+)
+
+
+def get_export_config() -> dict:
+    """[Exports] section of config.toml with defaults filled in"""
+    exports = {"datasets": [], "format": "csv"}
+    exports.update(get_config().get("Exports", {}))
+    return exports
+
+
+class ExportSink:
+    """Writes the intermediate frames the reports produce (accounts,
+    prices, transactions per account type, ...) to disk on a background
+    thread, so report latency doesn't include serializing them.
+
+    Only the datasets listed in [Exports] are written. Frames are copied
+    when queued and skipped when the file already holds the same data.
+    The queue is flushed when the interpreter exits.
+    """
+
+    def __init__(self, datasets: list = None, format: str = None):
+        """
+        Args:
+            datasets (list, optional): datasets to write, see DATASETS.
+            Defaults to [Exports] datasets.
+            format (str, optional): "csv" or "parquet". Defaults to
+            [Exports] format.
+        """
+        exports = get_export_config()
+        self.datasets = set(exports["datasets"] if datasets is None else datasets)
+        self.format = format or exports["format"]
+        if self.format not in ("csv", "parquet"):
+            raise ValueError(f"Unknown export format {self.format}")
+        for dataset in self.datasets - set(DATASETS):
+            log.warning(f"Unknown export dataset {dataset}")
+        # path -> hash of the last frame written there
+        self.written = {}
+        self.queue = queue.Queue()
+        self.writer = None
+        atexit.register(self.flush)
+
+    def is_enabled(self, dataset: str) -> bool:
+        return dataset in self.datasets
+
+    def export(self, dataset: str, df: pd.DataFrame, path, index: bool = True):
+        """Queues a frame to be written if its dataset is enabled
+
+        Args:
+            dataset (str): one of DATASETS
+            df (pd.DataFrame): frame to write, copied before this returns
+            path (str | Path): file to write, the suffix follows the format
+            index (bool, optional): write the index. Defaults to True.
+        """
+        if not self.is_enabled(dataset):
+            return
+        if self.writer is None:
+            self.writer = threading.Thread(
+                target=self.run, name="export-sink", daemon=True
+            )
+            self.writer.start()
+        self.queue.put((Path(path).with_suffix(f".{self.format}"), df.copy(), index))
+
+    def run(self):
+        while True:
+            path, df, index = self.queue.get()
+            try:
+                self.write(path, df, index)
+            except Exception as e:
+                log.error(f"Export of {path} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def write(self, path: Path, df: pd.DataFrame, index: bool):
+        try:
+            checksum = (
+                tuple(df.columns.astype(str)),
+                int(pd.util.hash_pandas_object(df, index=index).sum()),
+            )
+        except TypeError:  # unhashable cells, always write
+            checksum = None
+        if checksum is not None and self.written.get(path) == checksum:
+            if path.exists():
+                return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.format == "parquet":
+            # parquet needs unique string column names, joined queries repeat guid
+            columns = pd.Series(df.columns.astype(str))
+            repeat = columns.groupby(columns).cumcount()
+            columns[repeat > 0] += "_" + repeat[repeat > 0].astype(str)
+            df.set_axis(columns, axis=1).to_parquet(path, index=index)
+        else:
+            df.to_csv(path, index=index)
+        self.written[path] = checksum
+
+    def flush(self):
+        """Blocks until every queued frame has been written"""
+        if self.writer is not None:
+            self.queue.join()
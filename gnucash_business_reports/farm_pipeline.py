@@ -0,0 +1,200 @@
+import pandas as pd
+
+from .reclassification import RuleSet
+
+# snapshot columns the plan reads, renamed to the names of the sql files
+TRANSACTION_COLUMNS = {
+    "guid": "tx_guid",
+    "post_date": "post_date",
+    "description": "description",
+}
+SPLIT_COLUMNS = {
+    "tx_guid": "tx_guid",
+    "account_guid": "account_guid",
+    "action": "split_action",
+    "memo": "memo",
+    "value_num": "value_num",
+    "value_denom": "value_denom",
+}
+# get_all_accounts columns the plan joins on
+ACCOUNT_COLUMNS = {
+    "code": "account_code",
+    "name": "account_name",
+    "account_type": "account_type",
+    "finpack_account": "finpack_account",
+    "parent_accounts": "parent_accounts",
+}
+# columns the summaries can group on
+PLAN_COLUMNS = {
+    *ACCOUNT_COLUMNS.values(),
+    "description",
+    "memo",
+    "split_action",
+    "post_date",
+}
+# numeric columns of the farm cash transactions, summed by the summaries
+AMOUNT_COLUMNS = ["amt", "quantity"]
+
+
+def scan_table(path, columns: dict):
+    """Lazy scan of a BookSnapshot Arrow file, only the columns the plan
+    uses end up being read
+
+    Args:
+        path (Path): snapshot file, see BookSnapshot.get_path
+        columns (dict): file column -> plan column
+
+    Returns:
+        pl.LazyFrame: the renamed columns
+    """
+    import polars as pl
+
+    return pl.scan_ipc(path).select(
+        pl.col(column).alias(name) for column, name in columns.items()
+    )
+
+
+def get_farm_cash_plan(
+    transactions,
+    splits,
+    accounts: pd.DataFrame,
+    cash_guids: list,
+    rules: RuleSet,
+    invoice_quantities: pd.DataFrame,
+    period: tuple = (None, None),
+    depreciation: pd.DataFrame = None,
+    columns: list = [],
+):
+    """The get_all_cash_transactions -> get_cleaned_cash_transactions ->
+    get_farm_cash_transactions chain as one polars LazyFrame over the book
+    snapshot. The period predicate is pushed into the transactions scan and
+    only the columns the caller asks for are read. Rows match
+    Ledger.get_transactions with the cash accounts as source accounts.
+
+    Args:
+        transactions (pl.LazyFrame): scan_table of the transactions,
+        TRANSACTION_COLUMNS
+        splits (pl.LazyFrame): scan_table of the splits, SPLIT_COLUMNS
+        accounts (pd.DataFrame): get_all_accounts
+        cash_guids (list): cash account guids, the source accounts.
+        Transfers between them are dropped
+        rules (RuleSet): the farm_cash reclassification rules
+        invoice_quantities (pd.DataFrame): get_invoice_quantities
+        period (tuple, optional): (start, end) post dates, end exclusive,
+        either None when open. Defaults to (None, None).
+        depreciation (pd.DataFrame, optional): get_depreciation_schedule rows
+        to add after the reclassification. Defaults to None.
+        columns (list, optional): further columns to keep, e.g. groupby
+        columns, see PLAN_COLUMNS. Defaults to [].
+
+    Returns:
+        pl.LazyFrame: farm cash transactions, not yet collected
+    """
+    import polars as pl
+
+    unknown = set(columns) - PLAN_COLUMNS
+    if unknown:
+        raise ValueError(f"Can't build {sorted(unknown)} in the farm cash plan")
+    keep = list(dict.fromkeys(["post_date"] + columns + AMOUNT_COLUMNS))
+    cash_guids = list(cash_guids)
+    start, end = period
+    if start is not None:
+        transactions = transactions.filter(pl.col("post_date") >= start)
+    if end is not None:
+        transactions = transactions.filter(pl.col("post_date") < end)
+    in_period = splits.join(transactions, on="tx_guid")
+    # every transaction is paired with each cash account it touches
+    sources = (
+        in_period.filter(pl.col("account_guid").is_in(cash_guids))
+        .select("tx_guid", pl.col("account_guid").alias("src_guid"))
+        .unique()
+    )
+    account_table = (
+        pl.from_pandas(
+            accounts[list(ACCOUNT_COLUMNS)]
+            .rename(columns=ACCOUNT_COLUMNS)
+            .reset_index(names="account_guid")
+        )
+        .lazy()
+        .with_columns(pl.col("account_guid").cast(pl.String))
+    )
+    quantities = (
+        pl.from_pandas(
+            invoice_quantities.reset_index()[["tx_guid", "account_guid", "quantity"]]
+        )
+        .lazy()
+        .with_columns(pl.col(["tx_guid", "account_guid"]).cast(pl.String))
+    )
+    # the rules' lookup table over the account codes, joined once
+    lookup = (
+        pl.from_pandas(rules.compile(accounts["code"]).reset_index(names="rule_code"))
+        .lazy()
+        .with_columns(pl.col(["rule_code"] + rules.columns).cast(pl.String))
+    )
+    plan = (
+        in_period.join(sources, on="tx_guid")
+        # cleaned: no transfers between cash accounts, no invoice payments
+        .filter(
+            (pl.col("account_guid") != pl.col("src_guid"))
+            & ~pl.col("account_guid").is_in(cash_guids)
+            & (pl.col("split_action").fill_null("") != "Payment")
+        )
+        .join(account_table, on="account_guid")
+        .join(quantities, on=["tx_guid", "account_guid"], how="left")
+        .with_columns(
+            # inverted for cash accounting, see Ledger.get_transactions
+            pl.when(pl.col("value_denom") > 0)
+            .then(-(pl.col("value_num") / pl.col("value_denom")))
+            .otherwise(0.0)
+            .alias("amt"),
+            pl.col("quantity").fill_null(0),
+        )
+        .join(
+            lookup,
+            left_on="account_code",
+            right_on="rule_code",
+            how="left",
+            suffix="_rule",
+        )
+        .filter(~pl.col("drop").fill_null(False))
+        .with_columns(
+            pl.coalesce(column + "_rule", column).alias(column)
+            for column in rules.columns
+            if column in keep
+        )
+        .select(keep)
+    )
+    if depreciation is not None:
+        plan = pl.concat(
+            [plan, pl.from_pandas(depreciation.filter(items=keep)).lazy()],
+            how="diagonal_relaxed",
+        )
+    return plan
+
+
+def summarize(plan, groupby: list, year_column: str = None) -> pd.DataFrame:
+    """Sums of the farm cash amounts per group, same rows as
+    GnuCash_Data_Analysis.get_summary
+
+    Args:
+        plan (pl.LazyFrame): see get_farm_cash_plan
+        groupby (list): columns to group on
+        year_column (str, optional): also group on the year posted, in a
+        column of this name. Defaults to None.
+
+    Returns:
+        pd.DataFrame: groupby columns and summed amounts, sorted by group
+    """
+    import polars as pl
+
+    if year_column is not None:
+        plan = plan.with_columns(pl.col("post_date").dt.year().alias(year_column))
+        groupby = [year_column] + groupby
+    return (
+        plan.drop_nulls(groupby)
+        .group_by(groupby)
+        .agg(pl.col(AMOUNT_COLUMNS).sum())
+        .sort(groupby)
+        .collect()
+        .to_pandas()
+    )
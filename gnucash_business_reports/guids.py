@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+
+class GuidCodes:
+    """Session wide dictionary of GnuCash GUIDs to dense int32 codes.
+
+    Frames built on it carry GUID columns as pandas Categoricals that all
+    share one CategoricalDtype: 4 bytes per cell instead of a pointer to
+    a 32 character string, and joins and isin between them compare
+    integer codes. Writing them out (CSV, Parquet, to_sql) writes the hex
+    strings, decode_frame turns them back into plain object columns.
+
+    The dictionary only grows, a GUID keeps its code for the life of the
+    session.
+    """
+
+    def __init__(self):
+        self.guids = pd.Index([], dtype=object)
+        self.dtype = None
+
+    def __len__(self) -> int:
+        return len(self.guids)
+
+    def encode(self, values) -> np.ndarray:
+        """
+        Args:
+            values (array-like): GUIDs, None/NaN allowed
+
+        Returns:
+            np.ndarray: int32 codes, -1 for missing values
+        """
+        values = pd.Index(np.asarray(values, dtype=object))
+        codes = self.guids.get_indexer(values)
+        new = values[(codes < 0) & values.notna()].unique()
+        if len(new):
+            self.guids = self.guids.append(new)
+            self.dtype = None
+            codes = self.guids.get_indexer(values)
+        return codes.astype(np.int32)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        codes = np.asarray(codes)
+        guids = self.guids.to_numpy()[np.maximum(codes, 0)]
+        guids[codes < 0] = None
+        return guids
+
+    def get_dtype(self) -> pd.CategoricalDtype:
+        """CategoricalDtype over every GUID seen so far"""
+        if self.dtype is None:
+            self.dtype = pd.CategoricalDtype(self.guids)
+        return self.dtype
+
+    def categorical(self, values) -> pd.Categorical:
+        codes = self.encode(values)
+        return pd.Categorical.from_codes(codes, dtype=self.get_dtype())
+
+    def encode_frames(self, frames: list, columns: list):
+        """Replaces the GUID columns of several frames in place, encoding
+        everything first so all of them end up with the same dtype
+
+        Args:
+            frames (list): DataFrames
+            columns (list): GUID column names, missing ones are skipped
+        """
+        found = [(df, c) for df in frames for c in columns if c in df.columns]
+        codes = [self.encode(df[c]) for df, c in found]
+        dtype = self.get_dtype()
+        for (df, column), column_codes in zip(found, codes):
+            df[column] = pd.Categorical.from_codes(column_codes, dtype=dtype)
+
+    @staticmethod
+    def decode_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of df with categorical columns and index levels back to
+        plain strings, e.g. before writing it to the books
+        """
+        df = df.copy()
+        for column in df.columns[df.dtypes == "category"]:
+            df[column] = df[column].astype(object)
+        if isinstance(df.index, pd.MultiIndex):
+            df.index = df.index.set_levels(
+                [level.astype(object) for level in df.index.levels]
+            )
+        elif isinstance(df.index, pd.CategoricalIndex):
+            df.index = df.index.astype(object)
+        return df
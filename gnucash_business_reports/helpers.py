@@ -1,5 +1,7 @@
 from datetime import datetime
-from pandas import DataFrame
+from functools import lru_cache
+import numpy as np
+from pandas import DataFrame, Series, unique
 import tomli
 
 
@@ -117,13 +119,53 @@ def parse_toml(toml_string: str, section: str, key: str) -> dict:
     Returns:
         dict: dict containing toml
     """
+    toml_dict = load_toml(toml_string)
+    if toml_dict is None:
+        return None
+    return toml_dict[section][key]
+
+
+@lru_cache(maxsize=4096)
+def load_toml(toml_string: str) -> dict:
+    """Parses a toml string once, later calls with the same string
+    (e.g. the same notes on many accounts or vendors) are answered from
+    a cache. The dict returned is shared, don't modify it
+
+    Args:
+        toml_string (str): string containing toml
+
+    Returns:
+        dict: parsed toml, None if it isn't valid toml
+    """
     try:
-        toml_dict = tomli.loads(toml_string)
-        return toml_dict[section][key]
+        return tomli.loads(toml_string)
     except tomli.TOMLDecodeError:
         return None
 
 
+def expand_toml(toml_series: Series, section: str) -> DataFrame:
+    """Expands one section of the toml in a series into columns,
+    one per key found in any of the strings
+
+    Args:
+        toml_series (Series): strings containing toml
+        section (str): Section of toml to expand e.g. "Depreciation"
+
+    Returns:
+        DataFrame: the keys of the section, indexed like toml_series.
+        Keys a string doesn't have are left empty, as are all keys of
+        strings that aren't valid toml
+    """
+    # each distinct string is parsed (at most) once
+    strings = unique(toml_series.to_numpy())
+    sections = []
+    for toml_string in strings:
+        toml_dict = load_toml(toml_string)
+        sections.append({} if toml_dict is None else toml_dict.get(section, {}))
+    keys = DataFrame(sections, index=strings)
+    return keys.reindex(toml_series.to_numpy()).set_axis(toml_series.index)
+
+
 def nearest(items: list, pivot: datetime) -> datetime:
     """Function to find the nearest date in a list of dates
     Obligatory hat tip to StackOverflow
@@ -139,3 +181,85 @@ def nearest(items: list, pivot: datetime) -> datetime:
         datetime: the date nearest, which can then be used for indexing purposes.
     """
     return min(items, key=lambda x: abs(x - pivot))
+
+
+def build_account_hierarchy(
+    guids: list, parent_guids: list, names: list, separator: str = ">"
+) -> DataFrame:
+    """Builds the ancestry of every account in the tree at once.
+    Walks up one level per pass by gathering the parent of every
+    account's current ancestor, so the work grows with the depth of
+    the tree rather than the number of accounts, without recursion.
+    Ancestors without a name are skipped, as are parents that aren't
+    in the list of accounts (the walk stops there)
+
+    Args:
+        guids (list): account guids
+        parent_guids (list): parent guid of each account, None for the root
+        names (list): account names
+        separator (str, optional): separator of the names in the
+        ancestor path. Defaults to ">".
+
+    Returns:
+        DataFrame: indexed by guid, containing
+            depth: number of named ancestors
+            parent_accounts: ancestor names, nearest parent first,
+            e.g. "Fuel>Expenses>Root Account"
+            account_level_N: name of the Nth ancestor counted from the
+            root, e.g. account_level_1 = "Root Account", "" past depth
+    """
+    position = {guid: i for i, guid in enumerate(guids)}
+    parents = np.array([position.get(p, -1) for p in parent_guids], dtype=np.int64)
+    names = np.array(names, dtype=object)
+    named = np.array([name is not None for name in names], dtype=bool)
+    count = len(guids)
+
+    # ancestors[k][i] = position of the k+1th named ancestor of account i
+    ancestors = []
+    ancestor = parents.copy()
+    for _ in range(count):  # at most one pass per account, guards cycles
+        walking = ancestor >= 0
+        if not walking.any():
+            break
+        found = np.full(count, -1, dtype=np.int64)
+        found[walking] = np.where(named[ancestor[walking]], ancestor[walking], -1)
+        ancestors.append(found)
+        ancestor = np.where(walking, parents[np.maximum(ancestor, 0)], -1)
+    if ancestors:
+        # drop the unnamed hops so every account's named ancestors are
+        # packed at the front, nearest first
+        ancestors = np.stack(ancestors, axis=1)
+        order = np.argsort(ancestors < 0, axis=1, kind="stable")
+        ancestors = np.take_along_axis(ancestors, order, axis=1)
+    else:
+        ancestors = np.full((count, 0), -1, dtype=np.int64)
+    depth = (ancestors >= 0).sum(axis=1)
+
+    lookup = np.append(names.astype(str), "")  # -1 gathers ""
+    ancestor_names = lookup[ancestors]
+    # joined one ancestor level at a time, for every account at once
+    parent_accounts = np.full(count, "", dtype=lookup.dtype)
+    for level in range(ancestor_names.shape[1]):
+        joined = np.char.add(
+            np.char.add(parent_accounts, separator if level else ""),
+            ancestor_names[:, level],
+        )
+        parent_accounts = np.where(level < depth, joined, parent_accounts)
+    hierarchy = DataFrame(
+        {"depth": depth, "parent_accounts": parent_accounts.astype(object)},
+        index=list(guids),
+    )
+    # levels from the root: the root is the last named ancestor
+    levels = np.arange(1, ancestor_names.shape[1] + 1)
+    from_root = depth[:, None] - levels[None, :]
+    level_names = np.take_along_axis(
+        ancestor_names, np.maximum(from_root, 0), axis=1
+    ).astype(object)
+    level_names[from_root < 0] = ""
+    return hierarchy.join(
+        DataFrame(
+            level_names,
+            index=hierarchy.index,
+            columns=[f"account_level_{level}" for level in levels],
+        )
+    )
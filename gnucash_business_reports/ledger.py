@@ -0,0 +1,329 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .guids import GuidCodes
+from .logger import log
+
+ACCOUNT_COLUMNS = [
+    "account_type",
+    "account_desc",
+    "parent_guid",
+    "commodity_guid",
+    "account_name",
+    "account_code",
+    "account_guid",
+]
+TRANSACTION_COLUMNS = [
+    "tx_guid",
+    "currency_guid",
+    "tx_num",
+    "enter_date",
+    "description",
+    "post_date",
+]
+SPLIT_COLUMNS = [
+    "split_action",
+    "split_guid",
+    "reconcile_date",
+    "reconcile_state",
+    "memo",
+]
+GUID_COLUMNS = [
+    "account_guid",
+    "parent_guid",
+    "commodity_guid",
+    "tx_guid",
+    "currency_guid",
+    "split_guid",
+]
+# largest common denominator amounts are normalized to exactly
+MAX_SCALE = 10**9
+
+
+def to_common_denominator(num: np.ndarray, denom: np.ndarray) -> tuple:
+    """Converts GnuCash numerator/denominator pairs to int64 units of one
+    common denominator (the least common multiple of the denominators, so
+    cents for a book kept in dollars) using integer math only
+
+    Args:
+        num (np.ndarray): int64 numerators
+        denom (np.ndarray): int64 denominators
+
+    Returns:
+        tuple: (units, scale), amount = units / scale
+    """
+    valid = denom > 0
+    if not valid.all():
+        log.warning(f"{(~valid).sum()} amounts without a denominator read as 0")
+    denominators = np.unique(denom[valid])
+    scale = int(np.lcm.reduce(denominators)) if len(denominators) else 1
+    units = np.zeros(len(num), dtype=np.int64)
+    if scale > MAX_SCALE:
+        log.warning(f"Common denominator {scale} is too large, rounding to 1/{MAX_SCALE}")
+        scale = MAX_SCALE
+        units[valid] = np.round(num[valid] / denom[valid] * scale).astype(np.int64)
+    else:
+        units[valid] = num[valid] * (scale // denom[valid])
+    return units, scale
+
+
+def to_units(amounts: pd.Series, scale: int = 100) -> np.ndarray:
+    """Display amounts back to int64 units, exact for amounts that came
+    from units of the same scale, e.g. the amt column of a ledger view
+
+    Args:
+        amounts (pd.Series): float amounts
+        scale (int, optional): units per 1. Defaults to 100 (cents).
+
+    Returns:
+        np.ndarray: int64 units
+    """
+    return np.round(amounts.to_numpy(dtype=float) * scale).astype(np.int64)
+
+
+# account columns repeated for the source account of transactions_master.sql
+SOURCE_COLUMNS = {
+    "account_guid": "src_guid",
+    "account_code": "src_code",
+    "account_type": "src_type",
+    "account_name": "src_name",
+}
+
+
+class Ledger:
+    """Every split in the book held in memory, the reports are views over it
+    instead of each running its own query.
+
+    Accounts and transactions are stored once and referenced from the splits
+    by integer keys. Values and quantities are int64 units of a common
+    denominator, sums over them are exact and only become floats when a
+    view or balance is handed to a report.
+    """
+
+    def __init__(self, split_detail: pd.DataFrame, guid_codes: GuidCodes = None):
+        """
+        Args:
+            split_detail (pd.DataFrame): one row per split with the columns of
+            sql/ledger.sql, e.g. BookSnapshot.get_split_detail()
+            guid_codes (GuidCodes, optional): session GUID dictionary, the
+            GUID columns of every view are then int32 coded categoricals.
+            Defaults to None (strings).
+        """
+        account_key, account_guids = pd.factorize(split_detail["account_guid"])
+        tx_key, _ = pd.factorize(split_detail["tx_guid"])
+        self.account_index = pd.Index(account_guids)
+        # first split of each key, factorize numbers keys in order of appearance
+        self.accounts = (
+            split_detail[ACCOUNT_COLUMNS]
+            .iloc[np.unique(account_key, return_index=True)[1]]
+            .reset_index(drop=True)
+        )
+        self.transactions = (
+            split_detail[TRANSACTION_COLUMNS]
+            .iloc[np.unique(tx_key, return_index=True)[1]]
+            .reset_index(drop=True)
+        )
+        self.account_key = account_key.astype(np.int32)
+        self.tx_key = tx_key.astype(np.int32)
+        self.value, self.value_scale = to_common_denominator(
+            split_detail["value_num"].to_numpy(dtype=np.int64),
+            split_detail["value_denom"].to_numpy(dtype=np.int64),
+        )
+        self.quantity, self.quantity_scale = to_common_denominator(
+            split_detail["quantity_num"].to_numpy(dtype=np.int64),
+            split_detail["quantity_denom"].to_numpy(dtype=np.int64),
+        )
+        self.splits = split_detail[SPLIT_COLUMNS].reset_index(drop=True)
+        if guid_codes is not None:
+            guid_codes.encode_frames(
+                [self.accounts, self.transactions, self.splits], GUID_COLUMNS
+            )
+        self.balance_index = None
+        log.info(
+            f"Ledger: {len(self.splits)} splits, {len(self.transactions)} "
+            f"transactions, {len(self.accounts)} accounts"
+        )
+
+    def __len__(self) -> int:
+        return len(self.splits)
+
+    def get_account_keys(self, guids: list) -> np.ndarray:
+        keys = self.account_index.get_indexer(list(guids))
+        return keys[keys >= 0]
+
+    def get_period_mask(self, start: datetime = None, end: datetime = None):
+        """Splits whose transaction was posted in [start, end)"""
+        mask = np.ones(len(self), dtype=bool)
+        if start is None and end is None:
+            return mask
+        post_date = self.transactions["post_date"].to_numpy()[self.tx_key]
+        if start is not None:
+            mask &= post_date >= np.datetime64(start)
+        if end is not None:
+            mask &= post_date < np.datetime64(end)
+        return mask
+
+    def build_view(
+        self, rows: np.ndarray, sources: np.ndarray = None, multiplier: int = 1
+    ) -> pd.DataFrame:
+        """Materializes the selected splits with their account and transaction
+        columns, in the column order of the sql files
+
+        Args:
+            rows (np.ndarray): positions of the splits to include
+            sources (np.ndarray, optional): source account key for each row,
+            adds the src_* columns of transactions_master.sql. Defaults to None.
+            multiplier (int, optional): 1 or -1. Defaults to 1.
+
+        Returns:
+            pd.DataFrame: one row per selected split
+        """
+        parts = [self.accounts.take(self.account_key[rows]).reset_index(drop=True)]
+        if sources is not None:
+            parts.append(
+                self.accounts[list(SOURCE_COLUMNS)]
+                .take(sources)
+                .rename(columns=SOURCE_COLUMNS)
+                .reset_index(drop=True)
+            )
+        parts.append(self.transactions.take(self.tx_key[rows]).reset_index(drop=True))
+        splits = self.splits.take(rows).reset_index(drop=True)
+        splits.insert(2, "amt", self.value[rows] / self.value_scale * multiplier)
+        splits.insert(
+            3, "qty", self.quantity[rows] / self.quantity_scale * multiplier
+        )
+        parts.append(splits)
+        return pd.concat(parts, axis=1)
+
+    def get_split_detail(self) -> pd.DataFrame:
+        """All splits, laid out like sql/all_transactions.sql"""
+        return self.build_view(np.arange(len(self)))
+
+    def get_transactions(
+        self,
+        account_guids: list,
+        inverse_multiplier: bool = True,
+        start: datetime = None,
+        end: datetime = None,
+    ) -> pd.DataFrame:
+        """Same rows as sql/transactions_master.sql: every split of a
+        transaction paired with each account of the transaction it isn't
+        posted to (the source account)
+
+        Args:
+            account_guids (list): accounts to fetch
+            inverse_multiplier (bool, optional): True pairs every split with
+            the requested accounts as source accounts and inverts the amounts
+            for cash accounting, False returns the splits of the requested
+            accounts themselves. Defaults to True.
+            start (datetime, optional): first post date. Defaults to None.
+            end (datetime, optional): post dates before this. Defaults to None.
+
+        Returns:
+            pd.DataFrame: transactions with src_* columns
+        """
+        in_period = self.get_period_mask(start, end)
+        in_set = np.isin(self.account_key, self.get_account_keys(account_guids))
+        if inverse_multiplier is True:
+            source_mask, split_mask, multiplier = in_period & in_set, in_period, -1
+        else:
+            source_mask, split_mask, multiplier = in_period, in_period & in_set, 1
+        sources = pd.DataFrame(
+            {"tx": self.tx_key[source_mask], "src": self.account_key[source_mask]}
+        ).drop_duplicates()
+        rows = np.flatnonzero(split_mask)
+        pairs = pd.DataFrame({"row": rows, "tx": self.tx_key[rows]}).merge(
+            sources, on="tx"
+        )
+        pairs = pairs[self.account_key[pairs["row"].to_numpy()] != pairs["src"]]
+        return self.build_view(
+            pairs["row"].to_numpy(), pairs["src"].to_numpy(), multiplier
+        )
+
+    def get_balance_index(self) -> "BalanceIndex":
+        """Balance index over the ledger, built on first use"""
+        if self.balance_index is None:
+            self.balance_index = BalanceIndex(self)
+        return self.balance_index
+
+
+class BalanceIndex:
+    """Running balances of every account for as-of-date queries.
+
+    Splits are sorted by account and post date with int64 cumulative sums
+    of amount and quantity units, so the balance of an account at any date is a
+    binary search and the difference of two cumulative sums, no matter
+    how many dates are asked for.
+    """
+
+    def __init__(self, ledger: Ledger):
+        self.ledger = ledger
+        post_date = ledger.transactions["post_date"].to_numpy(
+            dtype="datetime64[ns]"
+        )[ledger.tx_key]
+        # splits without a usable post date are in no reporting period
+        rows = np.flatnonzero(~pd.isna(post_date))
+        self.dates = np.unique(post_date[rows])
+        date_rank = np.searchsorted(self.dates, post_date[rows])
+        # account in the high bits, date rank in the low bits, sorting the
+        # keys orders splits by account, then date
+        keys = (ledger.account_key[rows].astype(np.int64) << 32) | date_rank
+        order = np.argsort(keys, kind="stable")
+        rows = rows[order]
+        self.keys = keys[order]
+        self.value = np.concatenate(([0], np.cumsum(ledger.value[rows])))
+        self.quantity = np.concatenate(([0], np.cumsum(ledger.quantity[rows])))
+
+    def get_positions(self, account_keys: np.ndarray, dates: np.ndarray) -> tuple:
+        """Bounds of the splits of each account posted before each date
+
+        Args:
+            account_keys (np.ndarray): ledger account keys
+            dates (np.ndarray): datetime64 dates, same length as account_keys
+
+        Returns:
+            tuple: (first, stop) positions into the cumulative sums
+        """
+        date_rank = np.searchsorted(self.dates, dates, side="left")
+        account_start = account_keys.astype(np.int64) << 32
+        first = np.searchsorted(self.keys, account_start, side="left")
+        stop = np.searchsorted(self.keys, account_start | date_rank, side="left")
+        return first, stop
+
+    def get_balances(
+        self, account_guids: list, as_of: list, units: bool = False
+    ) -> pd.DataFrame:
+        """Balance of each account at each date
+
+        Args:
+            account_guids (list): accounts, unknown guids are left out
+            as_of (list): dates, balances include splits posted before them
+            units (bool, optional): return amt and qty as exact int64 units
+            of the ledger's value_scale and quantity_scale. Defaults to False.
+
+        Returns:
+            pd.DataFrame: as_of, account_guid, amt and qty. One row per
+            account and date
+        """
+        account_keys = self.ledger.get_account_keys(account_guids)
+        dates = pd.to_datetime(pd.Series(as_of)).to_numpy(dtype="datetime64[ns]")
+        account_keys, dates = (
+            np.tile(account_keys, len(dates)),
+            np.repeat(dates, len(account_keys)),
+        )
+        first, stop = self.get_positions(account_keys, dates)
+        balances = pd.DataFrame(
+            {
+                "as_of": dates,
+                "account_guid": self.ledger.accounts["account_guid"]
+                .to_numpy()[account_keys],
+                "amt": self.value[stop] - self.value[first],
+                "qty": self.quantity[stop] - self.quantity[first],
+            }
+        )
+        if not units:
+            balances["amt"] = balances["amt"] / self.ledger.value_scale
+            balances["qty"] = balances["qty"] / self.ledger.quantity_scale
+        return balances
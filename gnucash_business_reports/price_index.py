@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from .logger import log
+
+LOOKUPS = ("nearest", "as_of", "previous")
+
+
+class PriceIndex:
+    """The GnuCash price database sorted by commodity, price type and date
+    so prices at arbitrary dates are found by binary search.
+
+    Lookups take arrays of commodities and dates and are answered with one
+    searchsorted per commodity in the batch, thousands of loads or
+    inventory snapshots are priced in a single call.
+    """
+
+    def __init__(self, prices: pd.DataFrame):
+        """
+        Args:
+            prices (pd.DataFrame): rows of sql/prices.sql, date parsed
+        """
+        prices = prices.loc[:, ~prices.columns.duplicated()]
+        prices = prices[prices["date"].notna() & (prices["value_denom"] != 0)]
+        prices = prices.sort_values(
+            ["commodity_guid", "type", "date"], kind="stable"
+        ).reset_index(drop=True)
+        self.dates = prices["date"].to_numpy(dtype="datetime64[ns]")
+        self.values = (prices["value_num"] / prices["value_denom"]).to_numpy(
+            dtype=float
+        )
+        self.currencies = prices["currency_guid"].to_numpy(dtype=object)
+        # (commodity_guid, type) -> (first, stop) positions in dates/values
+        self.groups = {
+            key: (rows[0], rows[-1] + 1)
+            for key, rows in prices.groupby(["commodity_guid", "type"]).indices.items()
+        }
+        self.names = (
+            prices.drop_duplicates("commodity_guid")
+            .set_index("commodity_guid")["fullname"]
+            .dropna()
+        )
+        log.info(f"Price index: {len(self.dates)} prices, {len(self.groups)} series")
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def resolve(self, commodity: str) -> str:
+        """commodity guid for a guid or a (leading part of a) commodity
+        name such as "corn", None if nothing matches
+        """
+        if commodity in self.names.index:
+            return commodity
+        matches = self.names[self.names.str.startswith(str(commodity).title())]
+        return matches.index[0] if len(matches) else None
+
+    def lookup(
+        self,
+        commodities,
+        dates,
+        how: str = "nearest",
+        price_type: str = "bid",
+    ) -> pd.DataFrame:
+        """Prices of many (commodity, date) pairs at once
+
+        Args:
+            commodities (array-like): commodity guids or names, one per date,
+            or a single commodity for all of them
+            dates (array-like): dates to price
+            how (str, optional): "nearest" (either side, the earlier on
+            a tie), "as_of" (last price on or before the date) or "previous"
+            (last price strictly before it). Defaults to "nearest".
+            price_type (str, optional): GnuCash price type. Defaults to "bid".
+
+        Returns:
+            pd.DataFrame: commodity_guid, currency_guid, price_date and price
+            per pair in the order passed, NaT/NaN where there's no price.
+            Commodities not in the price database are logged as a warning
+        """
+        if how not in LOOKUPS:
+            raise ValueError(f"how must be one of {LOOKUPS}")
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+        if isinstance(commodities, str):
+            commodities = [commodities] * len(dates)
+        commodities = pd.Series(commodities, dtype=object)
+        positions = np.full(len(dates), -1, dtype=np.int64)
+        guids = np.full(len(dates), None, dtype=object)
+        unresolved = []
+        for commodity, rows in commodities.groupby(commodities).indices.items():
+            guids[rows] = self.resolve(commodity)
+            if guids[rows[0]] is None:
+                unresolved.append(commodity)
+                continue
+            first, stop = self.groups.get((guids[rows[0]], price_type), (0, 0))
+            if first == stop:
+                continue
+            found = self.search(self.dates[first:stop], dates[rows], how)
+            positions[rows] = np.where(found >= 0, first + found, -1)
+        if unresolved:
+            log.warning(
+                f"{len(unresolved)} commodities not in the price database, "
+                f"no prices for {unresolved}"
+            )
+        found = (positions >= 0) & ~np.isnat(dates)
+        price_dates = np.full(len(dates), np.datetime64("NaT", "ns"))
+        price_dates[found] = self.dates[positions[found]]
+        prices = np.full(len(dates), np.nan)
+        prices[found] = self.values[positions[found]]
+        currencies = np.full(len(dates), None, dtype=object)
+        currencies[found] = self.currencies[positions[found]]
+        return pd.DataFrame(
+            {
+                "commodity_guid": guids,
+                "currency_guid": currencies,
+                "price_date": price_dates,
+                "price": prices,
+            }
+        )
+
+    def search(self, series: np.ndarray, dates: np.ndarray, how: str) -> np.ndarray:
+        """Positions in one sorted date series, -1 where there's no price"""
+        side = "left" if how == "previous" else "right"
+        before = np.searchsorted(series, dates, side=side) - 1
+        if how != "nearest":
+            return before
+        after = np.minimum(before + 1, len(series) - 1)
+        # the earlier price wins a tie, and there's always one of the two
+        use_after = (before < 0) | (
+            (series[after] - dates) < (dates - series[np.maximum(before, 0)])
+        )
+        return np.where(use_after, after, before)
+
+    def get_price(
+        self, commodity: str, date, how: str = "nearest", price_type: str = "bid"
+    ) -> float:
+        """Single lookup, see lookup"""
+        return self.lookup([commodity], [date], how, price_type)["price"].iloc[0]
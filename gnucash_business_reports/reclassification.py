@@ -0,0 +1,167 @@
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import tomllib
+
+from .logger import log
+
+
+class RuleSet:
+    """Account reclassification rules, compiled into a lookup table over
+    account codes.
+
+    Rules are tested once per distinct account code, never per row: the
+    table holds, for every code seen so far, whether its rows are dropped
+    and the values the rules set. Transactions pick their row of the table
+    up with a single indexed join, so applying the rules costs the same
+    however many of them there are.
+    """
+
+    def __init__(self, name: str, rules: list):
+        """
+        Args:
+            name (str): rule set name, the TOML array of tables it came from
+            rules (list): rule dicts, see templates/reclassification.toml
+        """
+        self.name = name
+        self.rules = []
+        for rule in rules:
+            # codes and prefixes select accounts, the other keys are
+            # columns to set
+            rule = dict(rule)
+            codes = rule.pop("codes", [])
+            prefixes = rule.pop("prefixes", [])
+            if not codes and not prefixes:
+                raise ValueError(f"{name} rule {rule} matches no accounts")
+            drop = rule.pop("drop", False)
+            self.rules.append((codes, tuple(prefixes), drop, rule))
+        # columns the rules set, in the order they first appear
+        self.columns = list(
+            dict.fromkeys(column for *_, values in self.rules for column in values)
+        )
+        self.table = self.evaluate(pd.Index([], dtype=object))
+
+    def evaluate(self, codes: pd.Index) -> pd.DataFrame:
+        """Runs every rule over the given account codes"""
+        as_text = pd.Series(codes.to_numpy(), dtype=object)
+        drop = np.zeros(len(codes), dtype=bool)
+        values = {
+            column: np.full(len(codes), None, dtype=object) for column in self.columns
+        }
+        for codes_in, prefixes, drop_rows, rule_values in self.rules:
+            matched = as_text.isin(codes_in).to_numpy()
+            if prefixes:
+                matched |= as_text.str.startswith(prefixes, na=False).to_numpy(
+                    dtype=bool
+                )
+            if drop_rows:
+                drop |= matched
+            # later rules win where several set the same column
+            for column, value in rule_values.items():
+                values[column][matched] = value
+        return pd.DataFrame({"drop": drop, **values}, index=codes)
+
+    def compile(self, codes) -> pd.DataFrame:
+        """Lookup table for the account codes, only codes not seen before
+        are run through the rules
+
+        Args:
+            codes (array-like): account codes, repeats and missing values
+            allowed
+
+        Returns:
+            pd.DataFrame: indexed by account code with a drop column and
+            the columns the rules set, None where no rule sets them
+        """
+        codes = pd.Index(pd.unique(np.asarray(codes, dtype=object)))
+        codes = codes[~codes.isna()]
+        new = codes.difference(self.table.index)
+        if len(new):
+            self.table = pd.concat([self.table, self.evaluate(new)])
+        return self.table.loc[codes]
+
+    def lookup(self, codes: pd.Series) -> pd.DataFrame:
+        """Row of the lookup table for each account code
+
+        Args:
+            codes (pd.Series): account codes
+
+        Returns:
+            pd.DataFrame: drop and rule columns aligned to codes, no match
+            for codes the rules don't cover
+        """
+        values = np.asarray(codes, dtype=object)
+        table = self.compile(values)
+        positions = table.index.get_indexer(values)
+        found = positions >= 0
+        columns = {"drop": np.zeros(len(values), dtype=bool)}
+        columns.update(
+            {
+                column: np.full(len(values), None, dtype=object)
+                for column in self.columns
+            }
+        )
+        for column, column_values in columns.items():
+            column_values[found] = table[column].to_numpy()[positions[found]]
+        return pd.DataFrame(columns, index=codes.index)
+
+    def apply(self, df: pd.DataFrame, column: str = "account_code") -> pd.DataFrame:
+        """Drops and reclassifies the rows of df the rules match
+
+        Args:
+            df (pd.DataFrame): frame with account codes
+            column (str, optional): account code column. Defaults to
+            "account_code".
+
+        Returns:
+            pd.DataFrame: rows not dropped, with the rule columns set
+        """
+        looked_up = self.lookup(df[column])
+        keep = ~looked_up["drop"].to_numpy()
+        df, looked_up = df[keep].copy(), looked_up[keep]
+        for rule_column in self.columns:
+            values = looked_up[rule_column].to_numpy()
+            if rule_column in df.columns:
+                df[rule_column] = df[rule_column].mask(pd.notna(values), values)
+            else:
+                df[rule_column] = values
+        return df
+
+
+@lru_cache(maxsize=8)
+def read_rules(path: Path, modified: int) -> dict:
+    """Rule sets of a rules file, cached until the file is modified"""
+    with open(path, "rb") as f:
+        rules = tomllib.load(f)
+    log.info(f"Loaded reclassification rules {', '.join(rules)} from {path}")
+    return {name: RuleSet(name, rule_list) for name, rule_list in rules.items()}
+
+
+def load_rules(path) -> dict:
+    """
+    Args:
+        path (str | Path): TOML rules file, see templates/reclassification.toml
+
+    Returns:
+        dict: rule set name -> RuleSet, edits to the file are picked up on
+        the next call
+    """
+    path = Path(path)
+    return read_rules(path, path.stat().st_mtime_ns)
+
+
+def get_rules_version(path) -> int:
+    """Modified time of a rules file, what load_rules keys its cache on
+
+    Args:
+        path (str | Path): TOML rules file
+
+    Returns:
+        int: st_mtime_ns, None if the file doesn't exist
+    """
+    try:
+        return Path(path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
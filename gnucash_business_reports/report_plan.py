@@ -0,0 +1,158 @@
+from collections import OrderedDict
+
+from .cache import get_file_version
+from .logger import log
+
+# datasets shared between reports, name -> function building it from a
+# GnuCash_Data_Analysis instance
+DATASETS = {
+    "cash_transactions": lambda gda: gda.fetch_cash_transactions(None),
+    "cash_transactions_to_date": lambda gda: gda.fetch_cash_transactions(True),
+    "period_cash_transactions": lambda gda: gda.fetch_cash_transactions(False),
+    "farm_cash_transactions": lambda gda: gda.build_farm_cash_transactions(),
+}
+# datasets over the whole book, the same whatever the reporting period.
+# Built as for year 0 and kept under their name alone
+PERIOD_INDEPENDENT = {"cash_transactions"}
+# get_all_cash_transactions' all_years_plus_specified -> dataset
+CASH_DATASETS = {
+    None: "cash_transactions",
+    True: "cash_transactions_to_date",
+    False: "period_cash_transactions",
+}
+
+
+def uses(*datasets):
+    """Declares the DATASETS a report function reads, so ReportPlan.prepare
+    can evaluate the ones several reports share up front
+
+    Args:
+        datasets (str): names from DATASETS
+    """
+    unknown = set(datasets) - set(DATASETS)
+    if unknown:
+        raise ValueError(f"Unknown datasets {sorted(unknown)}")
+
+    def decorator(func):
+        func.datasets = datasets
+        return func
+
+    return decorator
+
+
+class ReportPlan:
+    """Evaluates each shared dataset once per book version and reporting
+    period. Every report asking for the same dataset afterwards gets a copy
+    of the result instead of re-running the queries and reclassification
+    behind it.
+
+    Results for other periods are kept (trend reports go through several
+    years) up to max_bytes and max_entries, least recently used first out
+    like QueryCache. All of them are dropped once the book or the
+    reclassification rules file changes.
+    """
+
+    def __init__(self, gda, max_bytes: int = 1024**3, max_entries: int = 16):
+        """
+        Args:
+            gda (GnuCash_Data_Analysis): instance the datasets are built from
+            max_bytes (int, optional): memory kept in results. Defaults to 1 GiB.
+            max_entries (int, optional): results kept. Defaults to 16.
+        """
+        self.gda = gda
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # (dataset, period bounds), or the name of a PERIOD_INDEPENDENT
+        # dataset -> DataFrame, least recently used first
+        self.results = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, dataset: str):
+        version = (
+            get_file_version(self.gda.pdw.connect_string),
+            self.gda.get_reclassification_rules_version(),
+        )
+        if version != self.version:
+            if self.results:
+                log.info("Book or rules changed, clearing the report plan")
+            self.clear()
+            self.version = version
+        if dataset in PERIOD_INDEPENDENT:
+            return dataset
+        return (dataset, self.gda.get_period_bounds())
+
+    def build(self, dataset: str):
+        if dataset not in PERIOD_INDEPENDENT:
+            return DATASETS[dataset](self.gda)
+        # invoice quantities follow the reporting period, open it up so the
+        # result is the same whichever period asked first
+        year, trend_years = self.gda.year, self.gda.trend_years
+        self.gda.year, self.gda.trend_years = 0, None
+        try:
+            return DATASETS[dataset](self.gda)
+        finally:
+            self.gda.year, self.gda.trend_years = year, trend_years
+
+    def get(self, dataset: str):
+        """
+        Args:
+            dataset (str): name from DATASETS
+
+        Returns:
+            pd.DataFrame: the dataset for the current reporting period,
+            a copy callers are free to modify
+        """
+        return self.evaluate(dataset).copy()
+
+    def evaluate(self, dataset: str):
+        """Result shared by every report, not to be modified, see get"""
+        key = self.get_key(dataset)
+        if key not in self.results:
+            self.misses += 1
+            self.put(key, self.build(dataset))
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return self.results[key]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        self.results[key] = df
+        self.sizes[key] = size
+        self.total_bytes += size
+        # the result just built always stays, whatever its size
+        while len(self.results) > 1 and (
+            self.total_bytes > self.max_bytes or len(self.results) > self.max_entries
+        ):
+            self.evict(next(iter(self.results)))
+
+    def evict(self, key):
+        del self.results[key]
+        self.total_bytes -= self.sizes.pop(key)
+
+    def prepare(self, *reports):
+        """Evaluates the datasets declared with uses by any of the reports
+
+        Args:
+            reports (Callable): report functions or methods
+        """
+        # one copy of the books for the whole run with [Reporting] immutable
+        self.gda.connections.refresh_reporting()
+        datasets = dict.fromkeys(
+            dataset for report in reports for dataset in getattr(report, "datasets", ())
+        )
+        log.info(
+            f"Report plan: {len(datasets)} datasets for {len(reports)} reports"
+        )
+        for dataset in datasets:
+            self.evaluate(dataset)
+
+    def clear(self):
+        self.results.clear()
+        self.sizes.clear()
+        self.total_bytes = 0
+        self.version = None
@@ -5,8 +5,10 @@ from jinja2 import Environment, FileSystemLoader
 from .builder import GnuCash_Data_Analysis, pd
 from .config import get_config
 from .helpers import column_filler, column_type_changer
+from .report_plan import uses
 
 
+@uses("farm_cash_transactions")
 def build_report(gda):
     tx = gda.get_farm_cash_transactions(include_depreciation=False)
     account_codes = tx["account_code"].unique()
@@ -158,6 +160,8 @@ def grain_invoices(gda):
 gda = GnuCash_Data_Analysis()
 gda.year = 2024
 
+# shared datasets are evaluated once for every report below
+gda.report_plan.prepare(build_report, grain_invoices, gda.sanity_checker)
 build_report(gda)
 # production_data(gda)
 grain_invoices(gda)
@@ -0,0 +1,166 @@
+import sqlite3
+from pathlib import Path
+
+from .cache import get_file_version
+from .logger import log
+
+
+class AnalyticsSidecar:
+    """SQLite database next to the config (we can't add tables or indexes
+    to the GnuCash file) holding materialized, indexed versions of the
+    joins the reports keep re-running. The reporting connection ATTACHes
+    it as "analytics".
+
+    Tables are brought up to date in place: only the rows that differ from
+    the book are deleted and re-inserted, so the indexes never get rebuilt
+    for an edit. Nothing is read when the book file itself hasn't changed.
+    """
+
+    # table -> (select, key column, book table, indexes). With a book
+    # table, rows are matched by key alone: the book only ever inserts and
+    # deletes its rows, under ever growing keys. GnuCash rewrites all of an
+    # object's slots on every save, so edited slots come back under new
+    # AUTOINCREMENT ids. Otherwise the select's rows are compared with the
+    # stored ones, for tables GnuCash updates in place
+    tables = {
+        "slot_values": (
+            """SELECT id, obj_guid, name, string_val, timespec_val, int64_val
+            FROM book.slots""",
+            "id",
+            "book.slots",
+            # covering: lookups by name and guid never touch the table
+            ["name, obj_guid, string_val, timespec_val, int64_val"],
+        ),
+        "invoice_entries": (
+            "sql/analytics_invoice_entries.sql",
+            "entry_guid",
+            None,
+            ["date_posted", "post_txn", "inv_guid", "account_guid"],
+        ),
+    }
+
+    def __init__(self, book: Path, path: Path):
+        """
+        Args:
+            book (Path): GnuCash SQLite file
+            path (Path): sidecar database file
+        """
+        self.book = Path(book)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.version = None
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "ATTACH DATABASE ? AS book", (f"file:{self.book.resolve()}?mode=ro",)
+        )
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS refresh_state (
+                source TEXT PRIMARY KEY, fingerprint)"""
+        )
+        return conn
+
+    def get_select(self, select: str) -> str:
+        if select.endswith(".sql"):
+            return Path(select).read_text(encoding="utf-8")
+        return select
+
+    def get_columns(self, conn: sqlite3.Connection, select: str) -> list:
+        return [
+            column[0]
+            for column in conn.execute(f"SELECT * FROM ({select}) LIMIT 0").description
+        ]
+
+    def rebuild(self, conn: sqlite3.Connection, table: str):
+        select, key, _, indexes = self.tables[table]
+        log.info(f"Analytics sidecar: rebuilding {table}")
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE {table} AS {self.get_select(select)}")
+        conn.execute(f"CREATE INDEX {table}_key ON {table} ({key})")
+        for i, columns in enumerate(indexes):
+            conn.execute(f"CREATE INDEX {table}_{i} ON {table} ({columns})")
+
+    def update(self, conn: sqlite3.Connection, table: str):
+        """Deletes the rows of table no longer in the book and inserts the
+        new ones, see tables"""
+        select, key, source, _ = self.tables[table]
+        select = self.get_select(select)
+        if source is not None:
+            conn.execute(
+                f"""DELETE FROM main.{table}
+                WHERE {key} NOT IN (SELECT {key} FROM {source})"""
+            )
+            conn.execute(
+                f"""INSERT INTO main.{table} SELECT * FROM ({select})
+                WHERE {key} > (SELECT coalesce(max({key}), -1) FROM main.{table})"""
+            )
+            return
+        conn.execute(f"CREATE TEMP TABLE book_rows AS {select}")
+        conn.execute(
+            f"""CREATE TEMP TABLE changed_rows AS
+            SELECT * FROM temp.book_rows EXCEPT SELECT * FROM main.{table}"""
+        )
+        conn.execute(
+            f"""DELETE FROM main.{table}
+            WHERE {key} IN (SELECT {key} FROM temp.changed_rows)
+            OR {key} NOT IN (SELECT {key} FROM temp.book_rows)"""
+        )
+        conn.execute(f"INSERT INTO main.{table} SELECT * FROM temp.changed_rows")
+        conn.execute("DROP TABLE temp.book_rows")
+        conn.execute("DROP TABLE temp.changed_rows")
+
+    def refresh(self, force: bool = False) -> dict:
+        """Brings the tables up to date with the book
+
+        Args:
+            force (bool, optional): rebuild everything. Defaults to False.
+
+        Returns:
+            dict: table -> rows deleted or inserted, tables rebuilt from
+            scratch count all their rows. Empty when the book hasn't
+            changed since the last refresh
+        """
+        version = get_file_version(f"sqlite:///{self.book}")
+        if not force and version == self.version:
+            return {}
+        conn = self.connect()
+        changes = {}
+        try:
+            stored = dict(conn.execute("SELECT source, fingerprint FROM refresh_state"))
+            # book untouched since the last refresh, possibly by another process
+            if not force and stored.get("book_version") == repr(version):
+                self.version = version
+                return {}
+            for table, (select, *_) in self.tables.items():
+                exists = conn.execute(
+                    "SELECT count(*) FROM main.sqlite_master WHERE name = ?",
+                    (table,),
+                ).fetchone()[0]
+                # tables of an older layout, or a select that was edited
+                current = exists and self.get_columns(
+                    conn, f"SELECT * FROM main.{table}"
+                ) == self.get_columns(conn, self.get_select(select))
+                before = conn.total_changes
+                with conn:
+                    if force or not current:
+                        self.rebuild(conn, table)
+                        changes[table] = conn.execute(
+                            f"SELECT count(*) FROM main.{table}"
+                        ).fetchone()[0]
+                        continue
+                    self.update(conn, table)
+                changes[table] = conn.total_changes - before
+                if changes[table]:
+                    log.info(
+                        f"Analytics sidecar: {changes[table]} rows of {table} updated"
+                    )
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO refresh_state VALUES (?, ?)",
+                    ("book_version", repr(version)),
+                )
+        finally:
+            conn.close()
+        self.version = version
+        return changes
@@ -0,0 +1,247 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.sql import text
+
+from .cache import get_file_version
+from .logger import log
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# every column of the older splits and transactions the reports read,
+# hashed per row, see BookSnapshot.get_checksum
+CHECKSUM_SQL = """
+SELECT
+    s.account_guid,
+    s.guid,
+    s.tx_guid,
+    s.memo,
+    s.action,
+    s.reconcile_state,
+    s.reconcile_date,
+    s.value_num,
+    s.value_denom,
+    s.quantity_num,
+    s.quantity_denom,
+    t.currency_guid,
+    t.num,
+    t.post_date,
+    t.description
+FROM
+    splits AS s
+    JOIN transactions AS t ON t.guid = s.tx_guid
+WHERE
+    t.enter_date <= :watermark
+"""
+
+
+class BookSnapshot:
+    """Columnar copy of the GnuCash tables the reports are built from,
+    kept as uncompressed Arrow IPC files in the data directory so a new
+    process can memory-map them instead of re-reading the book.
+
+    Transactions and splits are refreshed incrementally: only rows with an
+    enter_date newer than the stored watermark are pulled. Before doing so
+    a per-account checksum (split count and a hash of every column the
+    reports read, text included) of the older rows is compared with the one
+    stored at the last refresh. GnuCash keeps enter_date when an entry is
+    edited, so edits or deletions of existing entries trigger a full
+    rebuild.
+    The small tables are re-read whenever the book changes.
+    """
+
+    # table name -> date columns parsed into datetimes
+    tables = {
+        "accounts": [],
+        "commodities": [],
+        "transactions": ["post_date", "enter_date"],
+        "splits": ["reconcile_date"],
+        "prices": ["date"],
+        "invoices": ["date_opened", "date_posted"],
+    }
+    incremental_tables = ("transactions", "splits")
+
+    def __init__(self, pdw, snapshot_dir: Path, dtype_backend: str = "numpy"):
+        self.pdw = pdw
+        # "pyarrow" keeps the memory mapped Arrow columns as ArrowDtype
+        self.dtype_backend = dtype_backend
+        self.snapshot_dir = Path(snapshot_dir)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.meta_file = self.snapshot_dir / "snapshot.json"
+        self.data = {}
+        self.version = None
+
+    def read_sql(self, sql: str, params: dict = None) -> pd.DataFrame:
+        with self.pdw.engine.connect() as conn:
+            return pd.read_sql(text(sql), con=conn, params=params)
+
+    def parse_dates(self, df: pd.DataFrame, table: str) -> pd.DataFrame:
+        for column in self.tables[table]:
+            df[column] = pd.to_datetime(
+                df[column], format=DATE_FORMAT, errors="coerce", exact=False
+            )
+        return df
+
+    def get_watermark(self) -> str:
+        watermark = self.read_sql("SELECT max(enter_date) AS wm FROM transactions")
+        return watermark["wm"].iloc[0] or ""
+
+    def get_checksum(self, watermark: str) -> dict:
+        """account guid -> [splits, hash] of the rows entered up to the
+        watermark, the row hashes are summed so row order doesn't matter"""
+        rows = self.read_sql(CHECKSUM_SQL, {"watermark": watermark})
+        hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+        # int64 sums wrap around, which is fine for a checksum
+        checksum = (
+            pd.Series(hashes.view(np.int64))
+            .groupby(rows["account_guid"].to_numpy())
+            .agg(["count", "sum"])
+        )
+        return {
+            account: [int(splits), int(total)]
+            for account, splits, total in checksum.itertuples()
+        }
+
+    def get_path(self, table: str) -> Path:
+        return self.snapshot_dir / f"{table}.arrow"
+
+    def read_meta(self) -> dict:
+        try:
+            meta = json.loads(self.meta_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if meta.get("connect_string") != self.pdw.connect_string or not all(
+            self.get_path(table).exists() for table in self.tables
+        ):
+            return {}
+        return meta
+
+    def load_files(self):
+        from pyarrow import feather
+
+        types_mapper = pd.ArrowDtype if self.dtype_backend == "pyarrow" else None
+        for table in self.tables:
+            self.data[table] = feather.read_table(
+                self.get_path(table), memory_map=True
+            ).to_pandas(types_mapper=types_mapper)
+
+    def write_files(self, meta: dict):
+        from pyarrow import feather
+
+        for table, df in self.data.items():
+            feather.write_feather(
+                df.reset_index(drop=True),
+                self.get_path(table),
+                compression="uncompressed",
+            )
+        self.meta_file.write_text(json.dumps(meta), encoding="utf-8")
+
+    def pull_table(self, table: str) -> pd.DataFrame:
+        return self.parse_dates(self.read_sql(f"SELECT * FROM {table}"), table)
+
+    def pull_new_rows(self, watermark: str):
+        """Appends transactions and splits entered after the watermark"""
+        new_rows = {
+            "transactions": self.read_sql(
+                "SELECT * FROM transactions WHERE enter_date > :watermark",
+                {"watermark": watermark},
+            ),
+            "splits": self.read_sql(
+                """SELECT splits.* FROM splits
+                JOIN transactions ON transactions.guid = splits.tx_guid
+                WHERE transactions.enter_date > :watermark""",
+                {"watermark": watermark},
+            ),
+        }
+        for table, df in new_rows.items():
+            log.info(f"Snapshot: {len(df)} new rows in {table}")
+            if len(df) > 0:
+                self.data[table] = pd.concat(
+                    [self.data[table], self.parse_dates(df, table)],
+                    ignore_index=True,
+                )
+
+    def refresh(self, full: bool = False, load: bool = True) -> dict:
+        """Brings the snapshot up to date with the book
+
+        Args:
+            full (bool, optional): rebuild every table from the book.
+            Defaults to False.
+            load (bool, optional): read the files into data when the book
+            is unchanged, off for callers that scan the files themselves.
+            Defaults to True.
+
+        Returns:
+            dict: table name -> DataFrame
+        """
+        # json round trip so versions compare equal to the stored ones
+        version = json.loads(json.dumps(get_file_version(self.pdw.connect_string)))
+        if not full and self.data and version is not None and version == self.version:
+            return self.data
+        meta = {} if full else self.read_meta()
+        if meta and version is not None and meta["version"] == version:
+            if load:
+                log.info("Snapshot: book unchanged, loading columnar files")
+                self.load_files()
+        else:
+            watermark = self.get_watermark()
+            if meta and self.get_checksum(meta["watermark"]) == meta["checksum"]:
+                log.info(f"Snapshot: incremental refresh after {meta['watermark']}")
+                self.load_files()
+                for table in self.tables:
+                    if table not in self.incremental_tables:
+                        self.data[table] = self.pull_table(table)
+                self.pull_new_rows(meta["watermark"])
+            else:
+                log.info("Snapshot: full rebuild")
+                for table in self.tables:
+                    self.data[table] = self.pull_table(table)
+            self.write_files(
+                {
+                    "connect_string": self.pdw.connect_string,
+                    "version": version,
+                    "watermark": watermark,
+                    "checksum": self.get_checksum(watermark),
+                }
+            )
+        self.version = version
+        return self.data
+
+    def get_split_detail(self) -> pd.DataFrame:
+        """splits joined to their transactions and accounts, named the same
+        as the columns of sql/all_transactions.sql with the raw value and
+        quantity numerators/denominators kept alongside
+
+        Returns:
+            pd.DataFrame: one row per split
+        """
+        self.refresh()
+        accounts = self.data["accounts"][
+            [
+                "guid",
+                "account_type",
+                "description",
+                "parent_guid",
+                "commodity_guid",
+                "name",
+                "code",
+            ]
+        ].rename(
+            columns={
+                "guid": "account_guid",
+                "description": "account_desc",
+                "name": "account_name",
+                "code": "account_code",
+            }
+        )
+        transactions = self.data["transactions"].rename(
+            columns={"guid": "tx_guid", "num": "tx_num"}
+        )
+        splits = self.data["splits"].rename(
+            columns={"guid": "split_guid", "action": "split_action"}
+        )
+        return splits.merge(accounts, on="account_guid").merge(
+            transactions, on="tx_guid"
+        )
@@ -22,3 +22,4 @@ FROM
     JOIN accounts ON accounts.guid = entries.b_acct
 WHERE
     vendors.notes LIKE '%1099%'
+    AND {period_filter}
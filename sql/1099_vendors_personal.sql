@@ -10,3 +10,4 @@ FROM
 WHERE
     accounts.name LIKE '%Interest%'
     AND accounts.account_type = 'EXPENSE'
+    AND {period_filter}
@@ -10,6 +10,7 @@ FROM
     JOIN accounts ON splits.account_guid = accounts.guid
 WHERE
     accounts.code = '510'
+    AND {period_filter}
 GROUP BY
     name,
     post_date
\ No newline at end of file
@@ -0,0 +1,55 @@
+/*
+ 2026-10-17
+ invoices_master.sql served by the analytics sidecar:
+ the materialized entries plus indexed slot lookups
+ Reporting period predicate on date_posted
+ injected dynamically, use 1 = 1 for all years
+ */
+/*pandas*
+timezone = "America/Chicago"
+[parse_dates]
+date_posted = {format = "%Y-%m-%d %H:%M:%S", errors = "coerce", exact = false}
+date_opened = "%Y-%m-%d %H:%M:%S"
+entry_date = "%Y-%m-%d %H:%M:%S"
+due_date = "%Y-%m-%d %H:%M:%S"
+[dtype]
+inv_type = "string"
+inv_guid = "string"
+inv_id = "string"
+billing_id = "string"
+notes = "string"
+post_txn = "string"
+post_lot = "string"
+operation_id = "string"
+operation = "string"
+org_name = "string"
+org_notes = "string"
+account_guid = "string"
+account_code = "string"
+account_name = "string"
+entry_guid = "string"
+inv_acct = "string"
+description = "string"
+quantity_type = "string"
+paytype = "string"
+disc_how = "string"
+disc_type = "string"
+taxable = "string"
+taxincluded = "string"
+taxtable = "string"
+entry_type = "string"
+linked_document = "string"
+*pandas*/
+
+select invoices.*,
+	tx_due.timespec_val as due_date,
+	assoc_uri.string_val as linked_document
+from analytics.invoice_entries as invoices
+left join analytics.slot_values as tx_due on
+	tx_due.name = 'trans-date-due'
+	and tx_due.obj_guid = invoices.post_txn
+left join analytics.slot_values as assoc_uri on
+	assoc_uri.name = 'assoc_uri'
+	and assoc_uri.obj_guid = invoices.inv_guid
+where
+	{period_filter}
@@ -2,6 +2,9 @@
  ~ 2015 = initial creation of SQL
  2024-01-13
  Added due date from the slots table
+ 2026-10-17
+ Reporting period predicate on date_posted
+ injected dynamically, use 1 = 1 for all years
  */
 /*pandas*
 timezone = "America/Chicago"
@@ -122,6 +125,8 @@ left join (
 	WHERE
 		slots.name = 'assoc_uri') as assoc_uri on
 	assoc_uri.obj_guid = invoices.guid
+where
+	{period_filter}
 union select
 	/* invoices */
 	'INVOICE' as inv_type,
@@ -196,4 +201,6 @@ left join (
 		slots
 	WHERE
 		slots.name = 'assoc_uri') as assoc_uri on
-	assoc_uri.obj_guid = invoices.guid
\ No newline at end of file
+	assoc_uri.obj_guid = invoices.guid
+where
+	{period_filter}
\ No newline at end of file
@@ -0,0 +1,38 @@
+/* 
+ 2026-10-17
+ Every split with its transaction and account,
+ loaded once per session as the in-memory ledger.
+ Values and quantities are kept as the raw
+ integer numerators and denominators.
+ 
+ */
+SELECT
+	/* accounts */
+	a.account_type,
+	a.description AS account_desc,
+	a.parent_guid,
+	a.commodity_guid,
+	a.name AS account_name,
+	a.code AS account_code,
+	a.guid AS account_guid,
+	/* transactions */
+	t.guid AS tx_guid,
+	t.currency_guid,
+	t.num AS tx_num,
+	t.enter_date,
+	t.description,
+	t.post_date,
+	/* splits */
+	s."action" AS split_action,
+	s.guid AS split_guid,
+	s.value_num,
+	s.value_denom,
+	s.quantity_num,
+	s.quantity_denom,
+	s.reconcile_date,
+	s.reconcile_state,
+	s.memo AS memo
+FROM
+	accounts AS a
+	JOIN splits AS s ON s.account_guid = a.guid
+	JOIN transactions AS t ON t.guid = s.tx_guid
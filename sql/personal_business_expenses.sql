@@ -14,5 +14,6 @@ FROM transactions
         or string_val = 'true'
     )
 WHERE accounts.account_type = 'EXPENSE'
+    AND {period_filter}
 ORDER BY Acct,
     Post_Date
\ No newline at end of file
@@ -3,3 +3,5 @@ SELECT
 FROM
     prices
     JOIN commodities ON commodities.guid = prices.commodity_guid
+WHERE
+    {period_filter}
@@ -16,6 +16,14 @@
  Added src_guid
  Sorted
  Added addtl columns
+ 2026-10-17
+ Reference only, the reports build these rows
+ from the in-memory ledger (Ledger.get_transactions),
+ tests/test_ledger.py checks them against this query.
+ {0} limits the source accounts, {1} adds
+ predicates to the main query (AND ...),
+ {2} is the amount multiplier. Each source
+ account is kept out of its own rows.
  
  To make this work in a SQL Editor, replace 
  characters in brackets w/valid account guid.
@@ -82,5 +90,7 @@ FROM
 			JOIN accounts ON accounts.guid = splits.account_guid
 		{0}
 	) AS src ON src.tx = t.guid
-/* WHERE CLAUSE injected dynamically */
-{1}
+WHERE
+	a.guid <> src.src_guid
+	/* further predicates injected dynamically */
+	{1}
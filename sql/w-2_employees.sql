@@ -15,3 +15,4 @@ FROM
     JOIN accounts ON splits.account_guid = accounts.guid
 WHERE
     accounts.code LIKE '54%'
+    AND {period_filter}
@@ -0,0 +1,485 @@
+"""Small GnuCash SQLite book and application directory for the tests."""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+SCHEMA = """
+CREATE TABLE gnclock (Hostname varchar(255), PID int);
+CREATE TABLE accounts(guid text(32) PRIMARY KEY NOT NULL, name text(2048) NOT NULL,
+    account_type text(2048) NOT NULL, commodity_guid text(32),
+    commodity_scu integer NOT NULL, non_std_scu integer NOT NULL,
+    parent_guid text(32), code text(2048), description text(2048),
+    hidden integer, placeholder integer);
+CREATE TABLE transactions(guid text(32) PRIMARY KEY NOT NULL,
+    currency_guid text(32) NOT NULL, num text(2048) NOT NULL,
+    post_date text(19), enter_date text(19), description text(2048));
+CREATE TABLE splits(guid text(32) PRIMARY KEY NOT NULL, tx_guid text(32) NOT NULL,
+    account_guid text(32) NOT NULL, memo text(2048) NOT NULL,
+    action text(2048) NOT NULL, reconcile_state text(1) NOT NULL,
+    reconcile_date text(19), value_num bigint NOT NULL,
+    value_denom bigint NOT NULL, quantity_num bigint NOT NULL,
+    quantity_denom bigint NOT NULL, lot_guid text(32));
+CREATE INDEX splits_tx_guid_index ON splits(tx_guid);
+CREATE INDEX splits_account_guid_index ON splits(account_guid);
+CREATE TABLE slots(id integer PRIMARY KEY AUTOINCREMENT NOT NULL,
+    obj_guid text(32) NOT NULL, name text(4096) NOT NULL,
+    slot_type integer NOT NULL, int64_val bigint, string_val text(4096),
+    double_val float8, timespec_val text(19), guid_val text(32),
+    numeric_val_num bigint, numeric_val_denom bigint, gdate_val text(8));
+CREATE TABLE commodities(guid text(32) PRIMARY KEY NOT NULL,
+    namespace text(2048) NOT NULL, mnemonic text(2048) NOT NULL,
+    fullname text(2048), cusip text(2048), fraction integer NOT NULL,
+    quote_flag integer NOT NULL, quote_source text(2048), quote_tz text(2048));
+CREATE TABLE prices(guid text(32) PRIMARY KEY NOT NULL,
+    commodity_guid text(32) NOT NULL, currency_guid text(32) NOT NULL,
+    date text(19) NOT NULL, source text(2048), type text(2048),
+    value_num bigint NOT NULL, value_denom bigint NOT NULL);
+CREATE TABLE invoices(guid text(32) PRIMARY KEY NOT NULL, id text(2048) NOT NULL,
+    date_opened text(19), date_posted text(19), notes text(2048) NOT NULL,
+    active integer NOT NULL, currency text(32) NOT NULL, owner_type integer,
+    owner_guid text(32), terms text(32), billing_id text(2048),
+    post_txn text(32), post_lot text(32), post_acc text(32),
+    billto_type integer, billto_guid text(32), charge_amt_num bigint,
+    charge_amt_denom bigint);
+CREATE TABLE entries(guid text(32) PRIMARY KEY NOT NULL, date text(19) NOT NULL,
+    date_entered text(19), description text(2048), action text(2048),
+    notes text(2048), quantity_num bigint, quantity_denom bigint,
+    i_acct text(32), i_price_num bigint, i_price_denom bigint,
+    i_discount_num bigint, i_discount_denom bigint, invoice text(32),
+    i_disc_type text(2048), i_disc_how text(2048), i_taxable integer,
+    i_taxincluded integer, i_taxtable text(32), b_acct text(32),
+    b_price_num bigint, b_price_denom bigint, bill text(32),
+    b_taxable integer, b_taxincluded integer, b_taxtable text(32),
+    b_paytype integer, billable integer, billto_type integer,
+    billto_guid text(32), order_guid text(32));
+CREATE TABLE jobs(guid text(32) PRIMARY KEY NOT NULL, id text(2048) NOT NULL,
+    name text(2048) NOT NULL, reference text(2048) NOT NULL,
+    active integer NOT NULL, owner_type integer, owner_guid text(32));
+CREATE TABLE vendors(guid text(32) PRIMARY KEY NOT NULL, name text(2048) NOT NULL,
+    id text(2048) NOT NULL, notes text(2048) NOT NULL, currency text(32) NOT NULL,
+    active integer NOT NULL, tax_override integer NOT NULL,
+    addr_name text(1024), addr_addr1 text(1024), addr_addr2 text(1024),
+    addr_addr3 text(1024), addr_addr4 text(1024), addr_phone text(128),
+    addr_fax text(128), addr_email text(256), terms text(32),
+    tax_inc text(2048), tax_table text(32));
+CREATE TABLE customers(guid text(32) PRIMARY KEY NOT NULL, name text(2048) NOT NULL,
+    id text(2048) NOT NULL, notes text(2048) NOT NULL, active integer NOT NULL,
+    discount_num bigint NOT NULL, discount_denom bigint NOT NULL,
+    credit_num bigint NOT NULL, credit_denom bigint NOT NULL,
+    currency text(32) NOT NULL, tax_override integer NOT NULL,
+    addr_name text(1024), addr_addr1 text(1024), addr_addr2 text(1024),
+    addr_addr3 text(1024), addr_addr4 text(1024), addr_phone text(128),
+    addr_fax text(128), addr_email text(256), shipaddr_name text(1024),
+    shipaddr_addr1 text(1024), shipaddr_addr2 text(1024),
+    shipaddr_addr3 text(1024), shipaddr_addr4 text(1024),
+    shipaddr_phone text(128), shipaddr_fax text(128), shipaddr_email text(256),
+    terms text(32), tax_included integer, taxtable text(32));
+CREATE TABLE employees(guid text(32) PRIMARY KEY NOT NULL,
+    username text(2048) NOT NULL, id text(2048) NOT NULL,
+    language text(2048) NOT NULL, acl text(2048) NOT NULL,
+    active integer NOT NULL, currency text(32) NOT NULL, ccard_guid text(32),
+    workday_num bigint NOT NULL, workday_denom bigint NOT NULL,
+    rate_num bigint NOT NULL, rate_denom bigint NOT NULL,
+    addr_name text(1024), addr_addr1 text(1024), addr_addr2 text(1024),
+    addr_addr3 text(1024), addr_addr4 text(1024), addr_phone text(128),
+    addr_fax text(128), addr_email text(256));
+"""
+
+DEPRECIATION_NOTES = (
+    "[Depreciation]\nCost = {cost}\nSec_179 = {sec_179}\n"
+    'Depreciation_Type = "Other"\nMethod = "{method}"\nYears = {years}\n'
+    "Date_in_Service = {in_service}T08:00:00.000000-06:00\n"
+)
+
+CONFIG = """
+[Organization]
+business_name = "Test Farm"
+
+[GNUCash]
+business_path = "{book}"
+personal_path = "{book}"
+
+[Reporting]
+{reporting}
+
+[header]
+bold = true
+
+[currency]
+num_format = "$#,##0.00"
+"""
+
+
+def timestamp(date: datetime) -> str:
+    return date.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class BookWriter:
+    """Writes a GnuCash book with the account tree and kinds of entries
+    the reports expect: cash purchases and sales, transfers, bill payments,
+    grain inventory, depreciable assets, land rent bills and grain contract
+    invoices, 2022 through 2024.
+    """
+
+    def __init__(self, path: Path, seed: int = 7):
+        self.random = random.Random(seed)
+        self.con = sqlite3.connect(path)
+        self.con.executescript(SCHEMA)
+        self.accounts = {}
+        self.usd = self.commodity("CURRENCY", "USD", "US Dollar")
+        self.corn = self.commodity("GRAIN", "CORN", "Yellow Corn")
+        self.beans = self.commodity("GRAIN", "BEANS", "Soybeans")
+
+    def guid(self) -> str:
+        return uuid.UUID(int=self.random.getrandbits(128)).hex
+
+    def commodity(self, namespace: str, mnemonic: str, fullname: str) -> str:
+        guid = self.guid()
+        self.con.execute(
+            "INSERT INTO commodities VALUES (?,?,?,?,?,?,?,?,?)",
+            (guid, namespace, mnemonic, fullname, "", 100, 0, "", ""),
+        )
+        return guid
+
+    def account(self, key, name, account_type, parent, code="", notes=None):
+        guid = self.guid()
+        self.accounts[key] = guid
+        self.con.execute(
+            "INSERT INTO accounts VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                guid,
+                name,
+                account_type,
+                self.usd,
+                100,
+                0,
+                self.accounts.get(parent),
+                code,
+                name,
+                0,
+                0,
+            ),
+        )
+        if notes:
+            self.con.execute(
+                "INSERT INTO slots(obj_guid,name,slot_type,string_val) "
+                "VALUES (?,?,?,?)",
+                (guid, "notes", 4, notes),
+            )
+        return guid
+
+    def transaction(self, date: datetime, description: str, splits: list) -> str:
+        """splits: (account key, cents, action) tuples"""
+        tx_guid = self.guid()
+        self.con.execute(
+            "INSERT INTO transactions VALUES (?,?,?,?,?,?)",
+            (
+                tx_guid,
+                self.usd,
+                "",
+                timestamp(date),
+                timestamp(date + timedelta(hours=3)),
+                description,
+            ),
+        )
+        for key, cents, action in splits:
+            self.con.execute(
+                "INSERT INTO splits VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                (
+                    self.guid(),
+                    tx_guid,
+                    self.accounts[key],
+                    f"memo {description}",
+                    action,
+                    "n",
+                    "1970-01-01 00:00:00",
+                    cents,
+                    100,
+                    cents,
+                    100,
+                    None,
+                ),
+            )
+        return tx_guid
+
+    def invoice(self, prefix, date, owner, post_txn, post_acc, entry, bill=False):
+        guid = self.guid()
+        self.con.execute(
+            "INSERT INTO invoices VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                guid,
+                f"{prefix}{post_txn[:5]}",
+                timestamp(date),
+                timestamp(date),
+                "",
+                1,
+                self.usd,
+                4 if bill else 2,
+                owner,
+                None,
+                "",
+                post_txn,
+                self.guid(),
+                self.accounts[post_acc],
+                0,
+                None,
+                0,
+                1,
+            ),
+        )
+        description, action, quantity, account, price = entry
+        side = "b" if bill else "i"
+        self.con.execute(
+            f"INSERT INTO entries(guid,date,description,action,quantity_num,"
+            f"quantity_denom,{side}_acct,{side}_price_num,{side}_price_denom,"
+            f"{'bill' if bill else 'invoice'}) VALUES (?,?,?,?,?,?,?,?,?,?)",
+            (
+                self.guid(),
+                timestamp(date),
+                description,
+                action,
+                quantity * 100,
+                100,
+                self.accounts[account],
+                price,
+                100,
+                guid,
+            ),
+        )
+
+    def write(self):
+        account = self.account
+        account("root", "Root Account", "ROOT", None)
+        account("assets", "Assets", "ASSET", "root")
+        account("current", "Current Assets", "ASSET", "assets")
+        account("checking", "Checking", "BANK", "current", "100")
+        account("petty", "Petty Cash", "CASH", "current", "101")
+        account("ar", "Accounts Receivable", "RECEIVABLE", "current", "120")
+        account("inventory", "Inventory", "ASSET", "current", "130")
+        account("corn_inv", "Corn Inventory", "ASSET", "inventory", "133")
+        account("beans_inv", "Soybeans Inventory", "ASSET", "inventory", "134")
+        account("prepaid", "Prepaid Seed", "ASSET", "current", "146")
+        account("fixed", "Fixed Assets", "ASSET", "assets", "150")
+        account(
+            "tractor",
+            "Tractor",
+            "ASSET",
+            "fixed",
+            "151",
+            DEPRECIATION_NOTES.format(
+                cost=42000.0,
+                sec_179=5000.0,
+                method="MO S/L",
+                years=5,
+                in_service="2020-12-27",
+            ),
+        )
+        account(
+            "combine",
+            "Combine",
+            "ASSET",
+            "fixed",
+            "152",
+            DEPRECIATION_NOTES.format(
+                cost=90000.0,
+                sec_179=0.0,
+                method="HY 200DB",
+                years=7,
+                in_service="2021-05-01",
+            ),
+        )
+        account("liabilities", "Liabilities", "LIABILITY", "root")
+        account("ap", "Accounts Payable", "PAYABLE", "liabilities", "200")
+        account("card", "Credit Card", "CREDIT", "liabilities", "210")
+        account("loan", "Operating Loan", "LIABILITY", "liabilities", "250")
+        account("income", "Income", "INCOME", "root")
+        account("farm_income", "Farm Income", "INCOME", "income")
+        account("corn_sales", "Corn Sales", "INCOME", "farm_income", "301c")
+        account("beans_sales", "Soybeans Sales", "INCOME", "farm_income", "303b")
+        account("custom", "Custom Work", "INCOME", "farm_income", "310")
+        account("expenses", "Expenses", "EXPENSE", "root")
+        account("farm_expenses", "Farm Expenses", "EXPENSE", "expenses")
+        account("seed", "Seed", "EXPENSE", "farm_expenses", "410")
+        account("fuel", "Fuel", "EXPENSE", "farm_expenses", "415")
+        account("corn_rent", "Corn Rent", "EXPENSE", "farm_expenses", "424b")
+        account("beans_rent", "Soybeans Rent", "EXPENSE", "farm_expenses", "424c")
+        account("draw", "Personal Draw", "EXPENSE", "expenses", "901")
+        account("equity", "Equity", "EQUITY", "root", "300")
+
+        rand = self.random
+        expenses = ["seed", "fuel", "draw", "prepaid"]
+        start = datetime(2022, 1, 1, 10, 59)
+        for i in range(240):
+            date = start + timedelta(days=rand.randint(0, 3 * 365 - 1))
+            cents = rand.randint(1000, 200000)
+            kind = rand.random()
+            if kind < 0.45:
+                source = rand.choice(["checking", "checking", "card", "petty"])
+                splits = [(rand.choice(expenses), cents, ""), (source, -cents, "")]
+                self.transaction(date, f"Purchase {i}", splits)
+            elif kind < 0.65:
+                income = rand.choice(["custom", "corn_inv", "beans_inv"])
+                splits = [("checking", cents, "Deposit"), (income, -cents, "")]
+                self.transaction(date, f"Sale {i}", splits)
+            elif kind < 0.75:
+                splits = [("checking", -cents, ""), ("card", cents, "")]
+                self.transaction(date, f"Transfer {i}", splits)
+            elif kind < 0.85:
+                splits = [("checking", -cents, "Payment"), ("ap", cents, "Payment")]
+                self.transaction(date, f"Bill payment {i}", splits)
+            elif kind < 0.92:
+                splits = [("checking", cents, ""), ("loan", -cents, "")]
+                self.transaction(date, f"Loan {i}", splits)
+            else:
+                half = cents // 2
+                splits = [
+                    ("seed", half, ""),
+                    ("fuel", cents - half, ""),
+                    ("checking", -cents, ""),
+                ]
+                self.transaction(date, f"Split purchase {i}", splits)
+
+        landlord = self.guid()
+        self.con.execute(
+            "INSERT INTO vendors(guid,name,id,notes,currency,active,tax_override,"
+            "addr_name) VALUES (?,?,?,?,?,?,?,?)",
+            (landlord, "Landlord", "V001", "", self.usd, 1, 0, "Landlord"),
+        )
+        elevator = self.guid()
+        self.con.execute(
+            "INSERT INTO customers(guid,name,id,notes,active,discount_num,"
+            "discount_denom,credit_num,credit_denom,currency,tax_override) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            (elevator, "Farmers Coop", "C001", "", 1, 0, 1, 0, 1, self.usd, 0),
+        )
+        field, contracts = self.guid(), self.guid()
+        self.con.execute(
+            "INSERT INTO jobs VALUES (?,?,?,?,?,?,?)",
+            (field, "F01", "Field 1", "", 1, 2, landlord),
+        )
+        self.con.execute(
+            "INSERT INTO jobs VALUES (?,?,?,?,?,?,?)",
+            (contracts, "J900", "Contracts", "", 1, 1, elevator),
+        )
+        for year in (2022, 2023, 2024):
+            crop = "Corn" if year % 2 else "Soybeans"
+            rent_account = "corn_rent" if crop == "Corn" else "beans_rent"
+            date = datetime(year, 3, 1, 10, 59)
+            acres, rate = 80, 25000
+            tx_guid = self.transaction(
+                date,
+                f"Rent {year}",
+                [(rent_account, acres * rate, ""), ("ap", -acres * rate, "")],
+            )
+            entry = (f"{crop} rent", "Project", acres, rent_account, rate)
+            self.invoice("B", date, field, tx_guid, "ap", entry, bill=True)
+            for crop, inventory in (("Corn", "corn_inv"), ("Soybeans", "beans_inv")):
+                date = datetime(year, 6, 1, 10, 59)
+                bushels, price = rand.randint(1000, 5000), rand.randint(380, 520)
+                tx_guid = self.transaction(
+                    date,
+                    f"Contract {year} {crop}",
+                    [("ar", bushels * price, ""), (inventory, -bushels * price, "")],
+                )
+                entry = (f"{crop} contract", "Material", bushels, inventory, price)
+                self.invoice("G", date, contracts, tx_guid, "ar", entry)
+                self.transaction(
+                    date + timedelta(days=100),
+                    f"Contract payment {year} {crop}",
+                    [
+                        ("ar", -bushels * price, "Payment"),
+                        ("checking", bushels * price, "Payment"),
+                    ],
+                )
+
+        for day in range(0, 3 * 365, 7):
+            date = datetime(2022, 1, 3, 16) + timedelta(days=day)
+            for commodity, base in ((self.corn, 400), (self.beans, 1000)):
+                self.con.execute(
+                    "INSERT INTO prices VALUES (?,?,?,?,?,?,?,?)",
+                    (
+                        self.guid(),
+                        commodity,
+                        self.usd,
+                        timestamp(date),
+                        "user:price",
+                        rand.choice(["bid", "bid", "last"]),
+                        base + rand.randint(-80, 120),
+                        100,
+                    ),
+                )
+        self.con.commit()
+        self.con.close()
+
+
+def make_book(path: Path, seed: int = 7) -> dict:
+    """Writes the test book to path
+
+    Returns:
+        dict: account key -> guid
+    """
+    writer = BookWriter(Path(path), seed)
+    writer.write()
+    return writer.accounts
+
+
+class BookTestCase(unittest.TestCase):
+    """Runs the tests of a class against a fresh copy of the test book,
+    with its own application directory and config.toml, from the
+    repository root so the sql/ and templates/ paths resolve
+    """
+
+    # lines added to the [Reporting] section of config.toml
+    reporting = 'sidecar = false\nreclassification_rules = "{rules}"'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp(prefix="gnucash_reports_test_")
+        cls.book_path = Path(cls.tmp) / "books.gnucash"
+        cls.accounts = make_book(cls.book_path)
+        cls.data_home = Path(cls.tmp) / "data"
+        cls.data_dir = cls.data_home / "gnucash_business_reports"
+        cls.data_dir.mkdir(parents=True)
+        cls.write_config()
+        cls.saved_env = os.environ.get("XDG_DATA_HOME")
+        os.environ["XDG_DATA_HOME"] = str(cls.data_home)
+        cls.saved_cwd = os.getcwd()
+        os.chdir(REPO_DIR)
+
+    @classmethod
+    def write_config(cls, reporting: str = None):
+        reporting = cls.reporting if reporting is None else reporting
+        (cls.data_dir / "config.toml").write_text(
+            CONFIG.format(
+                book=cls.book_path,
+                reporting=reporting.format(
+                    rules=REPO_DIR / "templates" / "reclassification.toml"
+                ),
+            ),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.saved_cwd)
+        if cls.saved_env is None:
+            os.environ.pop("XDG_DATA_HOME", None)
+        else:
+            os.environ["XDG_DATA_HOME"] = cls.saved_env
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def make_gda(self, year: int = 2024):
+        from gnucash_business_reports.builder import GnuCash_Data_Analysis
+
+        gda = GnuCash_Data_Analysis()
+        gda.year = year
+        return gda
@@ -0,0 +1,61 @@
+"""Balance sheet components fetched in one grouped pass against the
+per-component fetches they replaced."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from tests.book import BookTestCase
+
+
+class TestBalances(BookTestCase):
+    def setUp(self):
+        self.gda = self.make_gda()
+
+    def get_components(self) -> dict:
+        """get_balance_sheet_details before the grouped pass, one
+        fetch_transactions per category"""
+        return {
+            "Assets": self.gda.get_assets(),
+            "Cash": self.gda.get_cash(),
+            "Liabilities": self.gda.get_liabilities(),
+        }
+
+    def test_details_match_components(self):
+        details = self.gda.get_balance_sheet_details()
+        for category, expected in self.get_components().items():
+            rows = details[details["balance_sheet_category"] == category]
+            with self.subTest(category=category):
+                self.assertGreater(len(expected), 0)
+                pd.testing.assert_frame_equal(
+                    rows.drop(columns="balance_sheet_category").sort_index(),
+                    expected.sort_index(),
+                )
+
+    def test_history_matches_components(self):
+        history = self.gda.get_balance_sheet_history(months=36)
+        self.assertEqual(len(history), 36)
+        for category, tx in self.get_components().items():
+            # month end balances: everything posted before the next month
+            next_months = history.index + pd.Timedelta(days=1)
+            expected = [
+                tx.loc[tx["post_date"] < date, "amt"].sum() for date in next_months
+            ]
+            with self.subTest(category=category):
+                np.testing.assert_allclose(history[category], expected, atol=1e-6)
+
+    def test_account_balances_in_units(self):
+        as_of = pd.date_range("2023-01-01", periods=6, freq="QS")
+        cash = self.gda.balance_sheet_accounts["Cash"]
+        balances = self.gda.get_account_balances(cash, as_of)
+        units = self.gda.get_account_balances(cash, as_of, units=True)
+        self.assertTrue(set(balances["account_type"]) <= set(cash))
+        self.assertEqual(units["amt"].dtype, np.int64)
+        np.testing.assert_allclose(
+            units["amt"] / self.gda.get_ledger().value_scale, balances["amt"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Read-only reporting connections to the books."""
+
+import os
+import sqlite3
+import unittest
+from unittest import mock
+
+from tests.book import BookTestCase
+
+COUNT_SQL = "SELECT count(*) AS n FROM transactions"
+
+
+class TestImmutableCopy(BookTestCase):
+    reporting = 'immutable = true\nsidecar = false\nreclassification_rules = "{rules}"'
+
+    def add_transaction(self):
+        con = sqlite3.connect(self.book_path)
+        with con:
+            con.execute(
+                "INSERT INTO transactions VALUES ('feedfeed', '', '', "
+                "'2024-12-30 10:59:00', '2024-12-30 10:59:00', 'Late')"
+            )
+        con.close()
+        # same-tick writes, make sure the file version moves
+        modified = self.book_path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(self.book_path, ns=(modified, modified))
+
+    def test_copy_refreshed_once_per_run(self):
+        gda = self.make_gda()
+        self.assertIn("immutable=1", gda.pdw.connect_string)
+        connections = gda.connections
+        with mock.patch.object(
+            connections, "refresh_copy", wraps=connections.refresh_copy
+        ) as refresh_copy:
+            before = gda.df_fetch(COUNT_SQL)["n"].iloc[0]
+            self.add_transaction()
+            # mid-run, every query keeps reading the same copy
+            for sql in (COUNT_SQL, f"{COUNT_SQL} WHERE 1 = 1"):
+                self.assertEqual(gda.df_fetch(sql)["n"].iloc[0], before)
+            gda.get_ledger()
+            self.assertEqual(refresh_copy.call_count, 0)
+
+            gda.report_plan.prepare()
+            self.assertEqual(refresh_copy.call_count, 1)
+            self.assertEqual(gda.df_fetch(COUNT_SQL)["n"].iloc[0], before + 1)
+            # unchanged books, no new copy
+            copied = connections.get_copy_path(self.book_path).stat().st_mtime_ns
+            gda.report_plan.prepare()
+            self.assertEqual(refresh_copy.call_count, 2)
+            self.assertEqual(
+                connections.get_copy_path(self.book_path).stat().st_mtime_ns, copied
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""Vectorized depreciation schedules against the per-asset loop they
+replaced."""
+
+import unittest
+from datetime import datetime
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from gnucash_business_reports.depreciation import (
+    SCHEDULE_COLUMNS,
+    DepreciationSchedules,
+    compute_schedules,
+)
+
+
+def build_depreciation_schedule(
+    account, amount, sec_179, method, term, date_in_service
+) -> pd.DataFrame:
+    """build_depreciation_dataframe's schedule of one asset before the
+    vectorized engine"""
+
+    def get_deduction_month_frequency(method):
+        if method in ("MO S/L",):
+            return 6
+        else:
+            return 12
+
+    def get_amount_per_term(method: str):
+        if method == "MO S/L":
+            depreciation = basis / (term * 2)
+        elif method == "HY 200DB":
+            if loop_counter == (term):
+                depreciation = amount_left
+            elif loop_counter == 1:
+                depreciation_rate = ((basis / (term * 2)) / basis) * 2
+                depreciation = depreciation_rate * amount_left
+            else:
+                depreciation_rate = ((basis / (term)) / basis) * 2
+                depreciation = depreciation_rate * amount_left
+        else:
+            depreciation = round(basis / term, 2)
+        return depreciation
+
+    basis = amount - sec_179
+    depreciation_codes = []
+    accounts = []
+    dates = []
+    amounts = []
+    descriptions = []
+    date_in_service = datetime(date_in_service.year, 12, 31)
+    amount_left = basis
+    deduction_month_frequency = get_deduction_month_frequency(method)
+    loop_counter = 0
+    if sec_179 > 0:
+        depreciation_codes.append("801")
+        accounts.append(account)
+        dates.append(date_in_service)
+        amounts.append(sec_179 * -1)
+        descriptions.append("Section 179")
+    while amount_left > 0.5:
+        loop_counter += 1
+        if amount_left == basis:
+            dates.append(date_in_service)
+            new_date = date_in_service
+        else:
+            new_date = new_date + relativedelta(months=deduction_month_frequency)
+            dates.append(new_date)
+        depreciation_codes.append("800")
+        accounts.append(account)
+        descriptions.append("Regular Depreciation")
+        amount_per_term = get_amount_per_term(method)
+        amounts.append(amount_per_term * -1)
+        amount_left -= amount_per_term
+    depreciation_dict = {
+        "depreciation_codes": depreciation_codes,
+        "account_guid": accounts,
+        "post_date": dates,
+        "amt": amounts,
+        "description": descriptions,
+    }
+    df = pd.DataFrame.from_dict(depreciation_dict)
+    df["post_date"] = df["post_date"].astype("datetime64[ns]")
+    return df
+
+
+def get_assets() -> pd.DataFrame:
+    rows = [
+        # guid, Cost, Sec_179, Method, Years, Date_in_Service
+        ("tractor", 42000.0, 5000.0, "MO S/L", 5, "2020-12-27"),
+        ("combine", 90000.0, 0.0, "HY 200DB", 7, "2021-05-01"),
+        ("bin", 10000.0, 0.0, "S/L", 3, "2019-02-28"),
+        ("shed", 25000.0, 1000.0, "S/L", 7, "2024-02-29"),
+        ("planter", 33333.33, 0.0, "MO S/L", 3, "2022-07-15"),
+        ("truck", 48000.0, 0.0, "HY 200DB", 5, "2023-01-02"),
+        # all of it expensed, only the Section 179 row
+        ("mower", 3000.0, 3000.0, "MO S/L", 5, "2023-06-01"),
+    ]
+    assets = pd.DataFrame(
+        rows,
+        columns=["guid", "Cost", "Sec_179", "Method", "Years", "Date_in_Service"],
+    ).set_index("guid")
+    assets["Date_in_Service"] = pd.to_datetime(assets["Date_in_Service"])
+    return assets
+
+
+class TestDepreciation(unittest.TestCase):
+    def test_matches_loop(self):
+        assets = get_assets()
+        schedules = compute_schedules(assets)
+        for guid, asset in assets.iterrows():
+            expected = build_depreciation_schedule(
+                guid,
+                asset["Cost"],
+                asset["Sec_179"],
+                asset["Method"],
+                asset["Years"],
+                asset["Date_in_Service"],
+            )
+            with self.subTest(asset=guid):
+                self.assertGreater(len(expected), 0)
+                pd.testing.assert_frame_equal(
+                    schedules[schedules["account_guid"] == guid],
+                    expected,
+                    check_exact=True,
+                )
+
+    def test_semi_annual_dates(self):
+        schedule = compute_schedules(get_assets().loc[["tractor"]])
+        dates = schedule["post_date"].dt.strftime("%Y-%m-%d").to_list()
+        # Section 179 and the first period on December 31, then every 6
+        # months from there: June 30 and December 30
+        self.assertEqual(
+            dates[:6],
+            [
+                "2020-12-31",
+                "2020-12-31",
+                "2021-06-30",
+                "2021-12-30",
+                "2022-06-30",
+                "2022-12-30",
+            ],
+        )
+        self.assertEqual(len(schedule), 1 + 5 * 2)
+        self.assertAlmostEqual(schedule["amt"].sum(), -42000.0, places=6)
+
+    def test_yearly_dates(self):
+        schedule = compute_schedules(get_assets().loc[["combine"]])
+        self.assertTrue((schedule["post_date"].dt.strftime("%m-%d") == "12-31").all())
+        self.assertEqual(
+            schedule["post_date"].dt.year.to_list(), list(range(2021, 2028))
+        )
+        self.assertAlmostEqual(schedule["amt"].sum(), -90000.0, places=6)
+
+    def test_schedules_kept_between_calls(self):
+        assets = get_assets()
+        assets["notes"] = [f"notes {guid}" for guid in assets.index]
+        cache = DepreciationSchedules()
+        first = cache.get_schedules(assets, "notes")
+        self.assertEqual(list(first.columns), SCHEDULE_COLUMNS)
+        pd.testing.assert_frame_equal(cache.get_schedules(assets, "notes"), first)
+
+        assets.loc["bin", ["Years", "notes"]] = [5, "notes bin, 5 years"]
+        edited = cache.get_schedules(assets, "notes")
+        self.assertEqual((edited["account_guid"] == "bin").sum(), 5)
+        pd.testing.assert_frame_equal(
+            edited[edited["account_guid"] != "bin"],
+            first[first["account_guid"] != "bin"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Background writes of the intermediate frames."""
+
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from gnucash_business_reports.export import ExportSink
+from tests.book import REPO_DIR, BookTestCase
+
+
+def get_frame(rows: int = 5) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"guid": [f"g{i}" for i in range(rows)], "amt": range(rows)}
+    ).set_index("guid")
+
+
+class TestExportSink(BookTestCase):
+    def setUp(self):
+        self.path = Path(self.tmp) / self._testMethodName / "accounts.csv"
+
+    def export(self, sink: ExportSink, df: pd.DataFrame) -> int:
+        """Exports and flushes, the number of files written"""
+        with mock.patch.object(
+            pd.DataFrame, "to_csv", autospec=True, side_effect=pd.DataFrame.to_csv
+        ) as to_csv:
+            sink.export("accounts", df, self.path)
+            sink.flush()
+        return to_csv.call_count
+
+    def test_disabled_dataset(self):
+        sink = ExportSink(datasets=["prices"])
+        sink.export("accounts", get_frame(), self.path)
+        sink.flush()
+        self.assertIsNone(sink.writer)
+        self.assertFalse(self.path.exists())
+
+    def test_written_once(self):
+        sink = ExportSink(datasets=["accounts"])
+        df = get_frame()
+        self.assertEqual(self.export(sink, df), 1)
+        # same data, in a new frame
+        self.assertEqual(self.export(sink, df.copy()), 0)
+        changed = df.copy()
+        changed.loc["g0", "amt"] = 100
+        self.assertEqual(self.export(sink, changed), 1)
+        self.assertEqual(pd.read_csv(self.path)["amt"].iloc[0], 100)
+        # deleted since, written again
+        self.path.unlink()
+        self.assertEqual(self.export(sink, changed), 1)
+        self.assertTrue(self.path.exists())
+
+    def test_frame_copied_when_queued(self):
+        sink = ExportSink(datasets=["accounts"])
+        df = get_frame()
+        write, release = sink.write, threading.Event()
+
+        def held_write(*args):
+            # hold the writer until the frame has been changed
+            release.wait(10)
+            write(*args)
+
+        with mock.patch.object(sink, "write", side_effect=held_write):
+            sink.export("accounts", df, self.path)
+            df["amt"] = -1
+            release.set()
+            sink.flush()
+        self.assertEqual(pd.read_csv(self.path)["amt"].to_list(), list(range(5)))
+
+    def test_parquet_suffix_and_columns(self):
+        sink = ExportSink(datasets=["accounts"], format="parquet")
+        df = pd.DataFrame([["a", "b", 1]], columns=["guid", "guid", "amt"])
+        sink.export("accounts", df, self.path, index=False)
+        sink.flush()
+        written = pd.read_parquet(self.path.with_suffix(".parquet"))
+        self.assertEqual(list(written.columns), ["guid", "guid_1", "amt"])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ExportSink(datasets=["accounts"], format="xlsx")
+
+    def test_flushed_at_exit(self):
+        # the queue is left for the interpreter exit to drain
+        script = (
+            "import pandas as pd\n"
+            "from gnucash_business_reports.export import ExportSink\n"
+            "sink = ExportSink(datasets=['accounts'])\n"
+            "df = pd.DataFrame({'amt': range(200000)})\n"
+            f"sink.export('accounts', df, {str(self.path)!r}, index=False)\n"
+        )
+        subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=REPO_DIR,
+            env={**os.environ, "PYTHONPATH": str(REPO_DIR)},
+            check=True,
+            capture_output=True,
+        )
+        self.assertEqual(len(pd.read_csv(self.path)), 200000)
+
+
+class TestExportConfig(BookTestCase):
+    reporting = BookTestCase.reporting + '\n\n[Exports]\ndatasets = ["prices"]'
+
+    def test_enabled_in_config(self):
+        gda = self.make_gda()
+        self.assertTrue(gda.exports.is_enabled("prices"))
+        self.assertFalse(gda.exports.is_enabled("accounts"))
+        prices = gda.get_commodity_prices()
+        gda.exports.flush()
+        written = pd.read_csv(gda.data_directory / "PRICES.csv")
+        self.assertEqual(len(written), len(prices))
+
+
+if __name__ == "__main__":
+    unittest.main()
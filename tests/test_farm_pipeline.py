@@ -0,0 +1,86 @@
+"""The polars farm cash plan against the pandas reports."""
+
+import unittest
+
+import pandas as pd
+
+from tests.book import BookTestCase
+
+
+class TestFarmPipeline(BookTestCase):
+    def setUp(self):
+        self.gda = self.make_gda()
+
+    def run_engines(self, report) -> tuple:
+        results = []
+        for engine in ("pandas", "polars"):
+            self.gda.frame_engine = engine
+            results.append(report().reset_index(drop=True))
+        return tuple(results)
+
+    def assert_engines_match(self, report):
+        for year in (2023, 2024, 0):
+            self.gda.year = year
+            with self.subTest(year=year):
+                pandas_result, polars_result = self.run_engines(report)
+                self.assertGreater(len(pandas_result), 0)
+                pd.testing.assert_frame_equal(
+                    pandas_result, polars_result, check_dtype=False, rtol=1e-9
+                )
+
+    def test_summary_matches_pandas(self):
+        self.assert_engines_match(
+            lambda: self.gda.get_summary(["account_type", "account_code"])
+        )
+
+    def test_summary_by_account_matches_pandas(self):
+        self.assert_engines_match(self.gda.get_summary_by_account)
+        self.assert_engines_match(lambda: self.gda.get_summary_by_account(True))
+
+    def test_summary_by_finpack_account_matches_pandas(self):
+        self.assert_engines_match(
+            lambda: self.gda.get_summary_by_finpack_account(True)
+        )
+
+    def test_executive_summary_matches_pandas(self):
+        self.assert_engines_match(self.gda.get_executive_summary)
+        self.assert_engines_match(lambda: self.gda.get_executive_summary(True))
+
+    def test_single_pass_trend_matches_pandas(self):
+        self.assert_engines_match(
+            lambda: self.gda.get_multi_year_data(self.gda.get_summary_by_account, 3)
+        )
+
+    def test_multi_year_executive_summary(self):
+        pandas_result, polars_result = self.run_engines(
+            lambda: self.gda.get_multi_year_data(self.gda.get_executive_summary, 3)
+        )
+        pd.testing.assert_frame_equal(
+            pandas_result, polars_result, check_dtype=False, rtol=1e-9
+        )
+        self.assertEqual(sorted(polars_result["year"].unique()), [2022, 2023, 2024])
+        for year, summary in polars_result.groupby("year"):
+            # one OIBDA per year, INCOME + EXPENSE of that year
+            amounts = summary.set_index("Account")["Amount"]
+            self.assertAlmostEqual(
+                amounts["OIBDA"], amounts["INCOME"] + amounts["EXPENSE"]
+            )
+
+    def test_executive_summary_ignores_trend_years(self):
+        self.gda.trend_years = (2022, 2024)
+        pandas_result, polars_result = self.run_engines(
+            self.gda.get_executive_summary
+        )
+        pd.testing.assert_frame_equal(
+            pandas_result, polars_result, check_dtype=False, rtol=1e-9
+        )
+        self.assertFalse(polars_result["Account"].duplicated().any())
+
+    def test_unknown_groupby_column(self):
+        self.gda.frame_engine = "polars"
+        with self.assertRaises(ValueError):
+            self.gda.get_summary(["src_code"])
+
+
+if __name__ == "__main__":
+    unittest.main()
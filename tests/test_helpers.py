@@ -0,0 +1,45 @@
+"""Account hierarchy built from the parent guids."""
+
+import unittest
+
+from gnucash_business_reports.helpers import build_account_hierarchy
+
+
+class TestAccountHierarchy(unittest.TestCase):
+    def test_ancestry(self):
+        accounts = [
+            # guid, parent guid, name
+            ("root", None, "Root Account"),
+            ("expenses", "root", "Expenses"),
+            ("unnamed", "expenses", None),
+            ("fuel", "unnamed", "Fuel>Oil"),
+            ("diesel", "fuel", "Diesel"),
+            ("orphan", "gone", "Orphan"),
+        ]
+        hierarchy = build_account_hierarchy(*zip(*accounts))
+        self.assertEqual(
+            hierarchy["parent_accounts"].to_dict(),
+            {
+                "root": "",
+                "expenses": "Root Account",
+                "unnamed": "Expenses>Root Account",
+                "fuel": "Expenses>Root Account",
+                "diesel": "Fuel>Oil>Expenses>Root Account",
+                "orphan": "",
+            },
+        )
+        self.assertEqual(hierarchy["depth"].to_list(), [0, 1, 2, 2, 3, 0])
+        self.assertEqual(
+            hierarchy.loc["diesel", ["account_level_1", "account_level_3"]].to_list(),
+            ["Root Account", "Fuel>Oil"],
+        )
+        self.assertEqual(hierarchy.loc["expenses", "account_level_2"], "")
+
+    def test_no_accounts(self):
+        hierarchy = build_account_hierarchy([], [], [])
+        self.assertEqual(len(hierarchy), 0)
+        self.assertIn("parent_accounts", hierarchy.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""The in-memory ledger against the sql it replaces."""
+
+import sqlite3
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pd_db_wrangler
+
+from gnucash_business_reports.ledger import MAX_SCALE, Ledger, to_common_denominator
+from tests.book import BookTestCase
+
+DATES = ["post_date", "enter_date", "reconcile_date"]
+
+
+class TestLedger(BookTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pdw = pd_db_wrangler.Pandas_DB_Wrangler(
+            connect_string=f"sqlite:///{cls.book_path}"
+        )
+        cls.split_detail = cls.read_sql(cls.pdw.read_sql_file("sql/ledger.sql"))
+        cls.ledger = Ledger(cls.split_detail)
+
+    @classmethod
+    def read_sql(cls, sql: str) -> pd.DataFrame:
+        con = sqlite3.connect(cls.book_path)
+        try:
+            return pd.read_sql(sql, con, parse_dates=DATES)
+        finally:
+            con.close()
+
+    def read_transactions_master(self, guids, inverse, start=None, end=None):
+        """sql/transactions_master.sql formatted the way the builder did
+        before the ledger served it"""
+        in_list = ", ".join(f"'{guid}'" for guid in guids)
+        predicates = []
+        if start is not None:
+            predicates.append(f"AND t.post_date >= '{start:%Y-%m-%d %H:%M:%S}'")
+        if end is not None:
+            predicates.append(f"AND t.post_date < '{end:%Y-%m-%d %H:%M:%S}'")
+        if inverse:
+            sources, multiplier = f"where accounts.guid in ({in_list})", "* -1"
+        else:
+            sources, multiplier = "", "* 1"
+            predicates.append(f"AND a.guid in ({in_list})")
+        sql = self.pdw.read_sql_file("sql/transactions_master.sql")
+        return self.read_sql(sql.format(sources, " ".join(predicates), multiplier))
+
+    def assert_same_rows(self, ledger_rows: pd.DataFrame, sql_rows: pd.DataFrame):
+        self.assertEqual(list(ledger_rows.columns), list(sql_rows.columns))
+        self.assertGreater(len(sql_rows), 0)
+        key = ["split_guid", "src_guid"]
+        pd.testing.assert_frame_equal(
+            ledger_rows.sort_values(key).reset_index(drop=True),
+            sql_rows.sort_values(key).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    def test_transactions_match_sql(self):
+        cash = [self.accounts[key] for key in ("checking", "petty", "card")]
+        periods = [
+            (None, None),
+            (datetime(2023, 1, 1), datetime(2024, 1, 1)),
+            (None, datetime(2024, 1, 1)),
+        ]
+        for inverse in (True, False):
+            for start, end in periods:
+                with self.subTest(inverse=inverse, start=start, end=end):
+                    self.assert_same_rows(
+                        self.ledger.get_transactions(cash, inverse, start, end),
+                        self.read_transactions_master(cash, inverse, start, end),
+                    )
+
+    def get_expected_balance(self, account: str, as_of) -> float:
+        detail = self.split_detail
+        splits = detail[
+            (detail["account_guid"] == self.accounts[account])
+            & (detail["post_date"] < as_of)
+        ]
+        return (splits["value_num"] / splits["value_denom"]).sum()
+
+    def test_balances(self):
+        index = self.ledger.get_balance_index()
+        checking = self.split_detail[
+            self.split_detail["account_guid"] == self.accounts["checking"]
+        ]
+        posted = checking["post_date"].sort_values()
+        as_of = [
+            # before the first split, at a post date (excluded), between two
+            # post dates, after the last split
+            posted.iloc[0] - pd.Timedelta(days=1),
+            posted.iloc[10],
+            posted.iloc[10] + pd.Timedelta(seconds=1),
+            posted.iloc[-1] + pd.Timedelta(days=1),
+        ]
+        accounts = ["checking", "card", "seed"]
+        balances = index.get_balances([self.accounts[a] for a in accounts], as_of)
+        self.assertEqual(len(balances), len(as_of) * len(accounts))
+        for row in balances.itertuples():
+            account = next(a for a in accounts if self.accounts[a] == row.account_guid)
+            with self.subTest(account=account, as_of=row.as_of):
+                self.assertAlmostEqual(
+                    row.amt, self.get_expected_balance(account, row.as_of), places=6
+                )
+        checking_balances = balances[
+            balances["account_guid"] == self.accounts["checking"]
+        ]["amt"].to_list()
+        self.assertEqual(checking_balances[0], 0)
+        self.assertAlmostEqual(
+            checking_balances[-1],
+            (checking["value_num"] / checking["value_denom"]).sum(),
+            places=6,
+        )
+
+    def test_balances_in_units(self):
+        index = self.ledger.get_balance_index()
+        balances = index.get_balances(
+            [self.accounts["checking"], "unknown"], [datetime(2030, 1, 1)], True
+        )
+        self.assertEqual(len(balances), 1)
+        checking = self.split_detail[
+            self.split_detail["account_guid"] == self.accounts["checking"]
+        ]
+        # cents in the test book
+        self.assertEqual(self.ledger.value_scale, 100)
+        self.assertEqual(balances["amt"].iloc[0], checking["value_num"].sum())
+
+
+class TestCommonDenominator(unittest.TestCase):
+    def test_least_common_multiple(self):
+        units, scale = to_common_denominator(
+            np.array([125, 7, 3, 5]), np.array([100, 1, 1000, 0])
+        )
+        self.assertEqual(scale, 1000)
+        self.assertEqual(units.tolist(), [1250, 7000, 3, 0])
+
+    def test_at_max_scale(self):
+        units, scale = to_common_denominator(
+            np.array([1, 123456789]), np.array([MAX_SCALE, MAX_SCALE // 1000])
+        )
+        self.assertEqual(scale, MAX_SCALE)
+        self.assertEqual(units.tolist(), [1, 123456789000])
+
+    def test_above_max_scale(self):
+        # lcm of 10**9 and a prime is far above the cap
+        num = np.array([1, 999_999_999, 2, -5])
+        denom = np.array([MAX_SCALE, MAX_SCALE, 999_983, 3])
+        with self.assertLogs(level="WARNING"):
+            units, scale = to_common_denominator(num, denom)
+        self.assertEqual(scale, MAX_SCALE)
+        self.assertEqual(units.dtype, np.int64)
+        self.assertEqual(units[:2].tolist(), [1, 999_999_999])
+        np.testing.assert_allclose(units / scale, num / denom, atol=1 / MAX_SCALE)
+
+
+if __name__ == "__main__":
+    unittest.main()
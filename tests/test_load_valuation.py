@@ -0,0 +1,90 @@
+"""Elevator loads valued at the bid in effect on their post date."""
+
+import sqlite3
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from tests.book import BookTestCase
+
+# commodity full names in the test book
+CROPS = ("Yellow Corn", "Soybeans")
+
+
+class TestLoadValuation(BookTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        con = sqlite3.connect(cls.book_path)
+        try:
+            cls.bids = pd.read_sql(
+                "SELECT c.fullname AS crop, p.date, "
+                "CAST(p.value_num AS REAL) / p.value_denom AS price "
+                "FROM prices p JOIN commodities c ON c.guid = p.commodity_guid "
+                "WHERE p.type = 'bid'",
+                con,
+                parse_dates={"date": "%Y-%m-%d %H:%M:%S"},
+            )
+        finally:
+            con.close()
+
+    def setUp(self):
+        self.gda = self.make_gda()
+
+    def get_expected(self, crop: str, post_date) -> float:
+        """last bid on or before the post date, the slow way"""
+        bids = self.bids[
+            (self.bids["crop"] == crop) & (self.bids["date"] <= post_date)
+        ]
+        if bids.empty:
+            return np.nan
+        return bids.loc[bids["date"].idxmax(), "price"]
+
+    def get_loads(self) -> pd.DataFrame:
+        rows = []
+        for crop in CROPS:
+            dates = self.bids.loc[self.bids["crop"] == crop, "date"].sort_values()
+            for date in dates.iloc[[3, 20, 50, -1]]:
+                # on the bid date, just before it and between two bids
+                rows += [
+                    (crop, date),
+                    (crop, date - pd.Timedelta(seconds=1)),
+                    (crop, date + pd.Timedelta(days=2)),
+                ]
+        return pd.DataFrame(rows, columns=["crop", "post_date"])
+
+    def test_bid_on_or_before_post_date(self):
+        loads = self.gda.value_loads_as_of(self.get_loads())
+        expected = [
+            self.get_expected(crop, post_date)
+            for crop, post_date in zip(loads["crop"], loads["post_date"])
+        ]
+        np.testing.assert_allclose(loads["cash"], expected)
+        self.assertTrue((loads["bid_date"] <= loads["post_date"]).all())
+        self.assertFalse(loads["cash"].isna().any())
+        # a load on a bid date gets that bid, not the one before
+        on_bid_date = loads.iloc[::3]
+        pd.testing.assert_series_equal(
+            on_bid_date["bid_date"], on_bid_date["post_date"], check_names=False
+        )
+
+    def test_load_before_first_bid(self):
+        first = self.bids.loc[self.bids["crop"] == "Soybeans", "date"].min()
+        loads = pd.DataFrame(
+            {
+                "crop": ["Soybeans", "Soybeans"],
+                "post_date": [first - pd.Timedelta(days=30), first],
+            },
+            index=[10, 11],
+        )
+        with self.assertLogs(level="WARNING") as logs:
+            loads = self.gda.value_loads_as_of(loads)
+        self.assertIn("1 loads", logs.output[0])
+        self.assertTrue(np.isnan(loads.loc[10, "cash"]))
+        self.assertTrue(pd.isna(loads.loc[10, "bid_date"]))
+        self.assertEqual(loads.loc[11, "cash"], self.get_expected("Soybeans", first))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""lookup_records on SQLite and through the chunked fallback."""
+
+import sqlite3
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from gnucash_business_reports import builder
+from tests.book import BookTestCase
+
+
+class TestLookupRecords(BookTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        con = sqlite3.connect(cls.book_path)
+        try:
+            cls.splits = pd.read_sql("SELECT * FROM splits", con)
+        finally:
+            con.close()
+
+    def setUp(self):
+        self.gda = self.make_gda()
+        # real split guids among more than two chunks of unknown ones
+        self.guids = self.splits["guid"].iloc[::3].to_list()
+        self.identifiers = self.guids + [
+            f"missing{i}" for i in range(2 * builder.LOOKUP_CHUNK_SIZE + 1)
+        ]
+
+    def assert_found(self, df: pd.DataFrame):
+        expected = self.splits[self.splits["guid"].isin(self.guids)]
+        pd.testing.assert_frame_equal(
+            df.sort_values("guid").reset_index(drop=True),
+            expected.sort_values("guid").reset_index(drop=True),
+        )
+
+    def test_json_each(self):
+        with mock.patch.object(builder.pd, "read_sql", wraps=pd.read_sql) as read_sql:
+            df = self.gda.lookup_records(self.identifiers, "SPLITS", "GUID")
+        self.assertEqual(read_sql.call_count, 1)
+        self.assertIn("json_each", str(read_sql.call_args.args[0]))
+        self.assert_found(df)
+
+    def test_chunked_fallback(self):
+        dialect = self.gda.pdw.engine.dialect
+        with (
+            mock.patch.object(dialect, "name", "postgresql"),
+            mock.patch.object(builder.pd, "read_sql", wraps=pd.read_sql) as read_sql,
+        ):
+            df = self.gda.lookup_records(self.identifiers, "splits", "guid")
+        chunks = [
+            len(call.kwargs["params"]["identifiers"])
+            for call in read_sql.call_args_list
+        ]
+        self.assertEqual(sum(chunks), len(set(self.identifiers)))
+        self.assertEqual(max(chunks), builder.LOOKUP_CHUNK_SIZE)
+        self.assertGreater(len(chunks), 2)
+        self.assert_found(df)
+
+    def test_select_columns(self):
+        df = self.gda.lookup_records(
+            self.guids, "splits", "guid", select="guid AS split_guid, tx_guid"
+        )
+        self.assertEqual(list(df.columns), ["split_guid", "tx_guid"])
+        self.assertEqual(sorted(df["split_guid"]), sorted(self.guids))
+
+    def test_names_checked_against_schema(self):
+        cases = {
+            "table": ("splits; DROP TABLE splits", "guid", "*"),
+            "column": ("splits", "guid IN ('x') OR 1 = 1 OR guid", "*"),
+            "select": ("splits", "guid", "guid, (SELECT sql FROM sqlite_master)"),
+            "select column": ("splits", "guid", "guid, password"),
+        }
+        for case, (table, column, select) in cases.items():
+            with self.subTest(case=case), self.assertRaises(ValueError):
+                self.gda.lookup_records(self.guids, table, column, select)
+        # still there
+        df = self.gda.lookup_records(self.guids, "splits", "guid")
+        self.assertEqual(len(df), len(self.guids))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""The {period_filter} predicate pushed into the sql files against the
+pandas filter_by_year it replaced."""
+
+import sqlite3
+import unittest
+
+import pandas as pd
+
+from tests.book import BookTestCase
+
+# posted right at and around the year boundaries
+BOUNDARY_DATES = [
+    "2022-12-31 23:59:59",
+    "2023-01-01 00:00:00",
+    "2023-12-31 23:59:59",
+    "2024-01-01 00:00:00",
+    "2024-01-01 10:59:00",
+    "2024-12-31 23:59:59",
+    "2025-01-01 00:00:00",
+]
+
+
+class TestPeriodFilter(BookTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        con = sqlite3.connect(cls.book_path)
+        with con:
+            con.executemany(
+                "INSERT INTO transactions VALUES (?, '', '', ?, ?, 'Boundary')",
+                [(f"edge{i:04d}", date, date) for i, date in enumerate(BOUNDARY_DATES)],
+            )
+        con.close()
+
+    def setUp(self):
+        self.gda = self.make_gda()
+
+    def read_transactions(self, predicate: str = "1 = 1") -> pd.DataFrame:
+        con = sqlite3.connect(self.book_path)
+        try:
+            return pd.read_sql(
+                f"SELECT guid, post_date FROM transactions WHERE {predicate}",
+                con,
+                parse_dates={"post_date": self.gda.date_format},
+            )
+        finally:
+            con.close()
+
+    def test_matches_filter_by_year(self):
+        everything = self.read_transactions()
+        posted = set(everything["post_date"].astype(str))
+        self.assertTrue(set(BOUNDARY_DATES) <= posted)
+        periods = [
+            (2024, None),
+            (2023, None),
+            (2025, None),
+            (0, None),
+            (2024, [2023, 2024]),
+        ]
+        for year, trend_years in periods:
+            for all_years_plus_specified in (False, True):
+                self.gda.year, self.gda.trend_years = year, trend_years
+                predicate = self.gda.get_period_filter(
+                    "post_date", all_years_plus_specified
+                )
+                expected = self.gda.filter_by_year(
+                    everything, "post_date", all_years_plus_specified
+                )
+                with self.subTest(
+                    year=year,
+                    trend_years=trend_years,
+                    all_years_plus_specified=all_years_plus_specified,
+                ):
+                    pulled = self.read_transactions(predicate)
+                    self.assertEqual(set(pulled["guid"]), set(expected["guid"]))
+                    self.assertGreater(len(pulled), 0)
+                    if year == 0:
+                        self.assertEqual(predicate, "1 = 1")
+                        self.assertEqual(len(pulled), len(everything))
+
+    def test_bounds(self):
+        self.gda.year, self.gda.trend_years = 2024, [2022, 2023, 2024]
+        start, end = self.gda.get_period_bounds()
+        self.assertEqual(
+            (start.isoformat(), end.isoformat()),
+            ("2022-01-01T00:00:00", "2025-01-01T00:00:00"),
+        )
+        self.assertIsNone(self.gda.get_period_bounds(True)[0])
+        self.gda.year = 0
+        self.assertEqual(self.gda.get_period_bounds(), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
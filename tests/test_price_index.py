@@ -0,0 +1,110 @@
+"""PriceIndex lookups around the dates prices were recorded."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from gnucash_business_reports.price_index import PriceIndex
+from tests.book import BookTestCase
+
+CORN, BEANS, USD = "c0c0", "b0b0", "d0d0"
+
+
+def get_prices() -> pd.DataFrame:
+    rows = [
+        # commodity, type, date, cents, denominator
+        (CORN, "bid", "2024-01-20", 500, 100),
+        (CORN, "bid", "2024-01-10", 400, 100),
+        (CORN, "bid", "2024-01-30", 600, 100),
+        (CORN, "last", "2024-01-15", 999, 100),
+        # no denominator, never a price
+        (CORN, "bid", "2024-01-25", 700, 0),
+        (BEANS, "bid", "2024-01-05", 1200, 100),
+    ]
+    prices = pd.DataFrame(
+        rows, columns=["commodity_guid", "type", "date", "value_num", "value_denom"]
+    )
+    prices["date"] = pd.to_datetime(prices["date"])
+    prices["currency_guid"] = USD
+    prices["fullname"] = prices["commodity_guid"].map(
+        {CORN: "Yellow Corn", BEANS: "Soybeans"}
+    )
+    return prices
+
+
+class TestPriceIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = PriceIndex(get_prices())
+
+    def test_lookups(self):
+        cases = {
+            # date: (nearest, as_of, previous)
+            "2024-01-20": (5.0, 5.0, 4.0),
+            "2024-01-10": (4.0, 4.0, np.nan),
+            # between, closer to the earlier and to the later price
+            "2024-01-12": (4.0, 4.0, 4.0),
+            "2024-01-17": (5.0, 4.0, 4.0),
+            # halfway, the earlier price wins
+            "2024-01-15": (4.0, 4.0, 4.0),
+            # before the first price
+            "2024-01-01": (4.0, np.nan, np.nan),
+            # after the last
+            "2024-03-01": (6.0, 6.0, 6.0),
+            "2024-01-30": (6.0, 6.0, 5.0),
+        }
+        for how_index, how in enumerate(("nearest", "as_of", "previous")):
+            dates = list(cases)
+            prices = self.index.lookup(CORN, dates, how)
+            expected = [cases[date][how_index] for date in dates]
+            with self.subTest(how=how):
+                np.testing.assert_array_equal(prices["price"].to_numpy(), expected)
+                self.assertTrue(
+                    (prices["price_date"].isna() == np.isnan(expected)).all()
+                )
+
+    def test_price_dates_and_currency(self):
+        prices = self.index.lookup(CORN, ["2024-01-17", "2024-01-01"], "as_of")
+        self.assertEqual(prices["price_date"].iloc[0], pd.Timestamp("2024-01-10"))
+        self.assertEqual(prices["currency_guid"].to_list(), [USD, None])
+        self.assertEqual(prices["commodity_guid"].to_list(), [CORN, CORN])
+
+    def test_batch_of_commodities(self):
+        with self.assertLogs(level="WARNING") as logs:
+            prices = self.index.lookup(
+                ["yellow", BEANS, "wheat", CORN, CORN],
+                ["2024-01-20", "2024-02-01", "2024-01-20", None, "2024-01-20"],
+            )
+        self.assertIn("'wheat'", logs.output[0])
+        np.testing.assert_array_equal(
+            prices["price"].to_numpy(), [5.0, 12.0, np.nan, np.nan, 5.0]
+        )
+        self.assertEqual(
+            prices["commodity_guid"].to_list(), [CORN, BEANS, None, CORN, CORN]
+        )
+
+    def test_price_types_kept_apart(self):
+        get_price = self.index.get_price
+        self.assertEqual(get_price(CORN, "2024-01-16", "as_of", "last"), 9.99)
+        self.assertTrue(np.isnan(get_price(BEANS, "2024-01-16", "as_of", "last")))
+
+    def test_known_commodities_quiet(self):
+        with self.assertNoLogs(level="WARNING"):
+            self.index.lookup([CORN, "soy"], ["2024-01-20", "2024-01-20"])
+
+    def test_unknown_lookup(self):
+        with self.assertRaises(ValueError):
+            self.index.lookup(CORN, ["2024-01-20"], "after")
+
+
+class TestNearestCommodityBid(BookTestCase):
+    def test_unknown_commodity(self):
+        gda = self.make_gda()
+        self.assertGreater(gda.get_nearest_commodity_bid("yellow", "2024-06-01"), 0)
+        with self.assertRaises(KeyError):
+            gda.get_nearest_commodity_bid("wheat", "2024-06-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""Session query cache keys in GnuCash_Data_Analysis.df_fetch."""
+
+import unittest
+
+import pandas as pd
+
+from tests.book import BookTestCase
+
+RAW_SQL = "SELECT guid, post_date FROM transactions ORDER BY guid"
+
+
+class TestQueryCache(BookTestCase):
+    def setUp(self):
+        self.gda = self.make_gda()
+        self.cache = self.gda.query_cache
+
+    def test_raw_query_independent_of_last_file_read(self):
+        first = self.gda.df_fetch(RAW_SQL)
+        misses = self.cache.misses
+        # leaves its /*pandas* header options on the shared wrangler
+        self.gda.pdw.read_sql_file("sql/all_transactions.sql")
+        again = self.gda.df_fetch(RAW_SQL)
+        self.assertEqual(self.cache.misses, misses)
+        pd.testing.assert_frame_equal(again, first)
+        self.assertNotIsInstance(first["post_date"].dtype, pd.DatetimeTZDtype)
+
+    def test_file_options_applied_to_their_query(self):
+        sql, options = self.gda.read_sql_file("sql/all_transactions.sql")
+        self.assertEqual(options["timezone"], "America/Chicago")
+        # another file read in between resets the wrangler's options
+        self.gda.pdw.read_sql_file("sql/prices.sql")
+        df = self.gda.df_fetch(sql, options=options)
+        self.assertEqual(str(df["post_date"].dt.tz), "America/Chicago")
+        self.assertEqual(options["timezone"], "America/Chicago")
+        # same sql without the header options is a different entry
+        misses = self.cache.misses
+        plain = self.gda.df_fetch(sql)
+        self.assertEqual(self.cache.misses, misses + 1)
+        self.assertNotIsInstance(plain["post_date"].dtype, pd.DatetimeTZDtype)
+
+
+if __name__ == "__main__":
+    unittest.main()
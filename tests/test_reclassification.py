@@ -0,0 +1,105 @@
+"""The reclassification rules file against the rules it replaced."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from gnucash_business_reports.reclassification import load_rules
+from tests.book import REPO_DIR
+
+RULES = REPO_DIR / "templates" / "reclassification.toml"
+
+
+def reclassify_hard_coded(tx: pd.DataFrame) -> pd.DataFrame:
+    """filter_and_reclassify_farm_transactions before the rules file"""
+    account_mask = tx["account_code"].isin(["301c", "303b"]) == False
+    tx = tx[account_mask].copy()
+    tx.loc[tx["account_code"].str.startswith("133"), "account_name"] = "Corn"
+    tx.loc[tx["account_code"].str.startswith("134"), "account_name"] = "Soybeans"
+    tx.loc[tx["account_code"].str.match("133|134"), "account_type"] = "INCOME"
+    tx.loc[tx["account_code"].str.startswith("133"), "account_code"] = "301c"
+    tx.loc[tx["account_code"].str.startswith("134"), "account_code"] = "303b"
+    tx.loc[tx["account_code"].str.match("146|147"), "account_type"] = "EXPENSE"
+    tx.loc[tx["account_code"].str.startswith("9"), "account_type"] = "NF EXPENSE"
+    return tx
+
+
+def get_frame() -> pd.DataFrame:
+    codes = [
+        "301c", "303b", "301", "133", "1331", "134", "134b", "1134", "146",
+        "1471", "148", "9", "901", "410", "424b", "424c", "4240", "",
+    ]  # fmt: skip
+    return pd.DataFrame(
+        {
+            "account_code": codes * 2,
+            "account_name": [f"Account {code}" for code in codes] * 2,
+            "account_type": ["ASSET", "EXPENSE"] * len(codes),
+            "amt": range(2 * len(codes)),
+        },
+        index=range(100, 100 + 2 * len(codes)),
+    )
+
+
+class TestRules(unittest.TestCase):
+    def test_farm_cash_matches_hard_coded(self):
+        tx = get_frame()
+        expected = reclassify_hard_coded(tx)
+        rules = load_rules(RULES)["farm_cash"]
+        pd.testing.assert_frame_equal(rules.apply(tx), expected)
+        # again from the compiled lookup table
+        pd.testing.assert_frame_equal(rules.apply(tx), expected)
+
+    def test_account_groups_match_hard_coded(self):
+        codes = get_frame()["account_code"]
+        groups = load_rules(RULES)["account_groups"].lookup(codes)["account_group"]
+        pd.testing.assert_series_equal(
+            groups == "cash_rent",
+            codes.isin(["424b", "424c"]),
+            check_names=False,
+        )
+        pd.testing.assert_series_equal(
+            groups == "grain", codes.str.match("133|134"), check_names=False
+        )
+
+    def test_rule_without_accounts(self):
+        path = Path(tempfile.mkdtemp()) / "rules.toml"
+        self.addCleanup(shutil.rmtree, path.parent)
+        path.write_text("[[farm_cash]]\ndrop = true\n", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            load_rules(path)
+
+
+class TestRulesFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = self.tmp / "reclassification.toml"
+        shutil.copy(RULES, self.path)
+
+    def touch(self):
+        # same-tick writes, make sure the modified time moves
+        modified = self.path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(self.path, ns=(modified, modified))
+
+    def test_unchanged_file_is_cached(self):
+        self.assertIs(load_rules(self.path), load_rules(self.path))
+
+    def test_edit_picked_up(self):
+        tx = get_frame()
+        before = load_rules(self.path)["farm_cash"]
+        self.assertIn("410", set(before.apply(tx)["account_code"]))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('\n[[farm_cash]]\ncodes = ["410"]\ndrop = true\n')
+        self.touch()
+        after = load_rules(self.path)["farm_cash"]
+        self.assertIsNot(after, before)
+        self.assertNotIn("410", set(after.apply(tx)["account_code"]))
+        self.assertEqual(len(after.apply(tx)), len(before.apply(tx)) - 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
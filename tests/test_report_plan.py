@@ -0,0 +1,100 @@
+"""ReportPlan keys and invalidation."""
+
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from tests.book import REPO_DIR, BookTestCase
+
+
+class TestReportPlan(BookTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rules_path = Path(cls.tmp) / "reclassification.toml"
+        cls.write_config(
+            cls.reporting.replace("{rules}", cls.rules_path.as_posix())
+        )
+
+    def setUp(self):
+        shutil.copy(REPO_DIR / "templates" / "reclassification.toml", self.rules_path)
+        self.gda = self.make_gda()
+        self.plan = self.gda.report_plan
+
+    def farm_keys(self) -> list:
+        return [key for key in self.plan.results if key[0] == "farm_cash_transactions"]
+
+    def test_period_dataset_keyed_on_period(self):
+        self.plan.get("farm_cash_transactions")
+        self.gda.year = 2023
+        self.plan.get("farm_cash_transactions")
+        misses = self.plan.misses
+        self.gda.year = 2024
+        self.plan.get("farm_cash_transactions")
+        self.assertEqual(self.plan.misses, misses)
+        self.assertEqual(
+            sorted(bounds[0].year for _, bounds in self.farm_keys()), [2023, 2024]
+        )
+
+    def test_full_history_shared_between_periods(self):
+        first = self.plan.get("cash_transactions")
+        for year in (2023, 0):
+            self.gda.year = year
+            pd.testing.assert_frame_equal(self.plan.get("cash_transactions"), first)
+        self.assertEqual((self.plan.misses, self.plan.hits), (1, 2))
+        # the same rows whichever period asked first
+        self.plan.clear()
+        self.gda.year = 0
+        pd.testing.assert_frame_equal(self.plan.get("cash_transactions"), first)
+        self.assertEqual(self.gda.year, 0)
+
+    def test_results_bounded(self):
+        self.plan.max_entries = 3
+        for year in (2021, 2022, 2023, 2024):
+            self.gda.year = year
+            self.plan.get("farm_cash_transactions")
+            self.assertLessEqual(len(self.plan.results), 3)
+        # the least recently used periods went first
+        self.assertEqual(
+            [bounds[0].year for _, bounds in self.farm_keys()][-2:], [2023, 2024]
+        )
+        self.assertNotIn(2021, [bounds[0].year for _, bounds in self.farm_keys()])
+        sizes = [self.plan.sizes[key] for key in self.plan.results]
+        self.assertEqual(self.plan.total_bytes, sum(sizes))
+        misses = self.plan.misses
+        self.gda.year = 2023
+        self.plan.get("farm_cash_transactions")
+        self.assertEqual(self.plan.misses, misses)
+
+        # over max_bytes, only the last result is kept
+        self.plan.max_bytes = 1
+        self.gda.year = 2022
+        farm = self.plan.get("farm_cash_transactions")
+        key = ("farm_cash_transactions", self.gda.get_period_bounds())
+        self.assertEqual(list(self.plan.results), [key])
+        self.assertGreater(len(farm), 0)
+
+    def test_rules_edit_clears_plan(self):
+        seed_code = "410"
+        farm = self.plan.get("farm_cash_transactions")
+        self.assertIn(seed_code, set(farm["account_code"]))
+        misses = self.plan.misses
+        self.plan.get("farm_cash_transactions")
+        self.assertEqual(self.plan.misses, misses)
+
+        with open(self.rules_path, "a", encoding="utf-8") as f:
+            f.write(f'\n[[farm_cash]]\ncodes = ["{seed_code}"]\ndrop = true\n')
+        # same second filesystems, make sure the modified time moves
+        modified = self.rules_path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(self.rules_path, ns=(modified, modified))
+
+        farm = self.plan.get("farm_cash_transactions")
+        self.assertGreater(self.plan.misses, misses)
+        self.assertNotIn(seed_code, set(farm["account_code"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
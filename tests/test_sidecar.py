@@ -0,0 +1,152 @@
+"""Which analytics sidecar tables a book edit touches."""
+
+import os
+import shutil
+import sqlite3
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gnucash_business_reports.connections import get_reporting_config
+from gnucash_business_reports.sidecar import AnalyticsSidecar
+from tests.book import BookTestCase
+
+
+class TestAnalyticsSidecar(BookTestCase):
+    def setUp(self):
+        # every test edits its own copy of the book
+        self.book = Path(self.tmp) / f"{self._testMethodName}.gnucash"
+        shutil.copy(self.book_path, self.book)
+        self.sidecar = AnalyticsSidecar(self.book, self.book.with_suffix(".sqlite"))
+        self.sidecar.refresh()
+
+    def edit(self, *statements):
+        con = sqlite3.connect(self.book)
+        with con:
+            for statement in statements:
+                con.execute(statement)
+        con.close()
+        # same-tick writes, make sure the file version moves
+        modified = self.book.stat().st_mtime_ns + 1_000_000_000
+        os.utime(self.book, ns=(modified, modified))
+
+    def read(self, path: Path, table: str) -> list:
+        con = sqlite3.connect(path)
+        rows = sorted(con.execute(f"SELECT * FROM {table}").fetchall(), key=repr)
+        con.close()
+        return rows
+
+    def assert_matches_rebuild(self):
+        fresh = AnalyticsSidecar(self.book, self.book.with_suffix(".fresh.sqlite"))
+        fresh.refresh()
+        for table in AnalyticsSidecar.tables:
+            with self.subTest(table=table):
+                self.assertEqual(
+                    self.read(self.sidecar.path, table), self.read(fresh.path, table)
+                )
+
+    def test_first_refresh_builds_everything(self):
+        self.assertEqual(
+            self.sidecar.refresh(force=True),
+            {"slot_values": 2, "invoice_entries": 6},
+        )
+
+    def test_unchanged_book_reads_nothing(self):
+        self.assertEqual(
+            self.sidecar.refresh(), {}
+        )
+        # another process already brought the sidecar up to date
+        other = AnalyticsSidecar(self.book, self.sidecar.path)
+        self.assertEqual(other.refresh(), {})
+
+    def test_unrelated_edit(self):
+        self.edit("UPDATE accounts SET description = 'Diesel' WHERE code = '415'")
+        self.assertEqual(
+            self.sidecar.refresh(), {"slot_values": 0, "invoice_entries": 0}
+        )
+
+    def test_slot_edit(self):
+        # GnuCash saves an object's slots by deleting and re-inserting them
+        self.edit(
+            "DELETE FROM slots WHERE id = (SELECT min(id) FROM slots)",
+            "INSERT INTO slots(obj_guid, name, slot_type, string_val) "
+            "SELECT obj_guid, 'notes', 4, 'replaced' FROM slots LIMIT 1",
+        )
+        self.assertEqual(
+            self.sidecar.refresh(), {"slot_values": 2, "invoice_entries": 0}
+        )
+        self.assert_matches_rebuild()
+
+    def test_entry_edit(self):
+        con = sqlite3.connect(self.sidecar.path)
+        entry = con.execute("SELECT min(entry_guid) FROM invoice_entries").fetchone()
+        con.close()
+        self.edit(
+            "UPDATE entries SET quantity_num = quantity_num + 100 "
+            f"WHERE guid = '{entry[0]}'"
+        )
+        # the old row out, the new one in
+        self.assertEqual(
+            self.sidecar.refresh(), {"slot_values": 0, "invoice_entries": 2}
+        )
+        self.assert_matches_rebuild()
+
+    def test_invoice_deleted(self):
+        self.edit(
+            "DELETE FROM entries WHERE invoice = "
+            "(SELECT min(invoice) FROM entries WHERE invoice IS NOT NULL)"
+        )
+        self.assertEqual(
+            self.sidecar.refresh(), {"slot_values": 0, "invoice_entries": 1}
+        )
+        self.assert_matches_rebuild()
+
+    def test_old_layout_rebuilt(self):
+        con = sqlite3.connect(self.sidecar.path)
+        with con:
+            con.execute("DROP INDEX slot_values_key")
+            con.execute("ALTER TABLE slot_values DROP COLUMN id")
+            con.execute("DELETE FROM refresh_state")
+        con.close()
+        self.sidecar.version = None
+        self.assertEqual(
+            self.sidecar.refresh(), {"slot_values": 2, "invoice_entries": 0}
+        )
+        self.assert_matches_rebuild()
+
+
+class TestSidecarReports(BookTestCase):
+    reporting = 'sidecar = true\nreclassification_rules = "{rules}"'
+
+    def test_off_by_default(self):
+        self.write_config('reclassification_rules = "{rules}"')
+        self.addCleanup(self.write_config)
+        self.assertFalse(get_reporting_config()["sidecar"])
+        self.assertIsNone(self.make_gda().connections.sidecar)
+
+    def test_refreshed_once_per_book_version(self):
+        gda = self.make_gda()
+        sidecar = gda.connections.sidecar
+        self.assertIsNotNone(sidecar)
+        with mock.patch.object(sidecar, "refresh", wraps=sidecar.refresh) as refresh:
+            for _ in range(3):
+                gda.get_invoices()
+                gda.df_fetch("SELECT count(*) FROM splits")
+            self.assertEqual(refresh.call_count, 1)
+
+            con = sqlite3.connect(self.book_path)
+            with con:
+                con.execute("UPDATE entries SET description = 'Edited'")
+            con.close()
+            modified = self.book_path.stat().st_mtime_ns + 1_000_000_000
+            os.utime(self.book_path, ns=(modified, modified))
+
+            for _ in range(3):
+                invoices = gda.get_invoices()
+                gda.df_fetch("SELECT count(*) FROM splits")
+            self.assertEqual(refresh.call_count, 2)
+        self.assertEqual(set(invoices["description"]), {"Edited"})
+
+
+if __name__ == "__main__":
+    unittest.main()
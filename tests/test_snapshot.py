@@ -0,0 +1,146 @@
+"""Incremental and full refreshes of the book snapshot."""
+
+import os
+import shutil
+import sqlite3
+import unittest
+from pathlib import Path
+
+import pandas as pd
+import pd_db_wrangler
+
+from gnucash_business_reports.snapshot import BookSnapshot
+from tests.book import BookTestCase
+
+
+class TestBookSnapshot(BookTestCase):
+    def setUp(self):
+        # every test edits its own copy of the book
+        self.book = Path(self.tmp) / f"{self._testMethodName}.gnucash"
+        shutil.copy(self.book_path, self.book)
+        self.pdw = pd_db_wrangler.Pandas_DB_Wrangler(
+            connect_string=f"sqlite:///{self.book}"
+        )
+        self.snapshot_dir = self.book.with_suffix(".snapshot")
+        self.refresh()
+
+    def refresh(self, snapshot_dir: Path = None, full: bool = False) -> list:
+        """Refreshes a new BookSnapshot, as a new process would
+
+        Returns:
+            list: the snapshot's log messages
+        """
+        snapshot = BookSnapshot(self.pdw, snapshot_dir or self.snapshot_dir)
+        with self.assertLogs(level="INFO") as logs:
+            self.data = snapshot.refresh(full)
+        return [record.getMessage() for record in logs.records]
+
+    def edit(self, *statements):
+        con = sqlite3.connect(self.book)
+        with con:
+            for statement in statements:
+                con.execute(statement)
+        con.close()
+        # same-tick writes, make sure the file version moves
+        modified = self.book.stat().st_mtime_ns + 1_000_000_000
+        os.utime(self.book, ns=(modified, modified))
+
+    def add_transaction(self, enter_date: str, cents: int = 12345):
+        self.edit(
+            "INSERT INTO transactions VALUES "
+            f"('feedfeed', '', '', '2024-12-30 10:59:00', '{enter_date}', 'Late')",
+            *(
+                "INSERT INTO splits VALUES "
+                f"('{guid}', 'feedfeed', '{account}', '', '', 'n', "
+                f"'1970-01-01 00:00:00', {value}, 100, {value}, 100, NULL)"
+                for guid, account, value in (
+                    ("feed0001", self.accounts["fuel"], cents),
+                    ("feed0002", self.accounts["checking"], -cents),
+                )
+            ),
+        )
+
+    def assert_matches_rebuild(self):
+        data = self.data
+        self.refresh(self.book.with_suffix(".fresh"), full=True)
+        for table, df in self.data.items():
+            with self.subTest(table=table):
+                pd.testing.assert_frame_equal(
+                    data[table].sort_values("guid").reset_index(drop=True),
+                    df.sort_values("guid").reset_index(drop=True),
+                    check_dtype=False,
+                )
+
+    def test_first_refresh_is_full(self):
+        messages = self.refresh(self.book.with_suffix(".other"))
+        self.assertIn("Snapshot: full rebuild", messages)
+
+    def test_unchanged_book_loads_files(self):
+        messages = self.refresh()
+        self.assertIn("Snapshot: book unchanged, loading columnar files", messages)
+        self.assert_matches_rebuild()
+
+    def test_new_transactions_pulled_after_watermark(self):
+        self.add_transaction("2099-01-01 00:00:00")
+        messages = self.refresh()
+        self.assertTrue(
+            any(m.startswith("Snapshot: incremental refresh") for m in messages)
+        )
+        self.assertIn("Snapshot: 2 new rows in splits", messages)
+        self.assertIn("feedfeed", set(self.data["transactions"]["guid"]))
+        self.assert_matches_rebuild()
+
+    def test_edited_split_rebuilds(self):
+        self.edit(
+            "UPDATE splits SET value_num = value_num + 1 "
+            "WHERE guid = (SELECT min(guid) FROM splits)"
+        )
+        messages = self.refresh()
+        self.assertIn("Snapshot: full rebuild", messages)
+        self.assert_matches_rebuild()
+
+    def test_edited_text_rebuilds(self):
+        # same counts and amounts, only what the reports filter on changes
+        edits = {
+            "memo": "UPDATE splits SET memo = 'edited' "
+            "WHERE guid = (SELECT min(guid) FROM splits)",
+            "action": "UPDATE splits SET action = 'Payment' "
+            "WHERE guid = (SELECT min(guid) FROM splits WHERE action = '')",
+            "value_denom": "UPDATE splits SET value_num = value_num * 10, "
+            "value_denom = 1000 WHERE guid = (SELECT max(guid) FROM splits)",
+            "description": "UPDATE transactions SET description = 'edited' "
+            "WHERE guid = (SELECT min(guid) FROM transactions)",
+        }
+        for column, statement in edits.items():
+            with self.subTest(column=column):
+                self.edit(statement)
+                messages = self.refresh()
+                self.assertIn("Snapshot: full rebuild", messages)
+                self.assert_matches_rebuild()
+
+    def test_deleted_transaction_rebuilds(self):
+        self.edit(
+            "DELETE FROM splits WHERE tx_guid = (SELECT min(guid) FROM transactions)"
+        )
+        messages = self.refresh()
+        self.assertIn("Snapshot: full rebuild", messages)
+        self.assert_matches_rebuild()
+
+    def test_backdated_entry_rebuilds(self):
+        # entered before the watermark, the incremental pull would miss it
+        self.add_transaction("2000-01-01 00:00:00")
+        messages = self.refresh()
+        self.assertIn("Snapshot: full rebuild", messages)
+        self.assert_matches_rebuild()
+
+    def test_small_tables_reread(self):
+        self.edit("UPDATE accounts SET name = 'Diesel' WHERE code = '415'")
+        self.add_transaction("2099-01-01 00:00:00")
+        self.refresh()
+        accounts = self.data["accounts"].set_index("code")
+        self.assertEqual(accounts.loc["415", "name"], "Diesel")
+        self.assert_matches_rebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()